@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vdgsa_backend.import_time import measure_startup, totals_by_package
+
+
+class Command(BaseCommand):
+    help = (
+        'Start the app in a new process with "python -X importtime" and print the modules '
+        '(or, with --packages, the top-level packages) that took longest to import.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=30)
+        parser.add_argument(
+            '--sort',
+            choices=['self', 'cumulative'],
+            default='cumulative',
+            help='"self" excludes the time spent importing other modules.'
+        )
+        parser.add_argument(
+            '--packages',
+            action='store_true',
+            help="Add up each top-level package's self times instead of listing modules."
+        )
+
+    def handle(self, *args, **options):
+        if options['top'] < 1:
+            raise CommandError('--top must be at least 1')
+        try:
+            profile = measure_startup()
+        except RuntimeError as e:
+            raise CommandError(e)
+
+        modules = profile['modules']
+        if options['packages']:
+            self.stdout.write(f'{"self (ms)":>10}  package')
+            for package, self_us in list(totals_by_package(modules).items())[:options['top']]:
+                self.stdout.write(f'{self_us / 1000:>10.1f}  {package}')
+        else:
+            key = 'self_us' if options['sort'] == 'self' else 'cumulative_us'
+            self.stdout.write(f'{"self (ms)":>10} {"cumul. (ms)":>12}  module')
+            for module in sorted(modules, key=lambda module: module[key], reverse=True)[
+                    :options['top']]:
+                self.stdout.write(
+                    f'{module["self_us"] / 1000:>10.1f} {module["cumulative_us"] / 1000:>12.1f}'
+                    f'  {module["module"]}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {len(modules)} modules; startup took {profile["wall_time_s"]:.2f}s'))
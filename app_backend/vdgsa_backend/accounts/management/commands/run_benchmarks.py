@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vdgsa_backend.benchmarks import run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the busiest pages against the data from seed_benchmark_data and print the '
+        'wall time, query count, and peak memory of each as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--only',
+            nargs='+',
+            metavar='NAME',
+            help='Only run the benchmarks with these names.'
+        )
+        parser.add_argument(
+            '--output',
+            help='Write the results to this file instead of stdout.'
+        )
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be at least 1')
+        try:
+            results = run_benchmarks(options['repeat'], options['only'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        report = json.dumps(results, indent=2)
+        if options['output'] is None:
+            self.stdout.write(report)
+            return
+
+        with open(options['output'], 'w') as f:
+            f.write(report + '\n')
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {len(results)} benchmark results to {options["output"]}'))
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vdgsa_backend.benchmarks import clear_benchmark_data, has_benchmark_data, seed_benchmark_data
+
+
+class Command(BaseCommand):
+    help = (
+        'Fill the database with synthetic users, Conclave registrations, and rental '
+        'inventory for the run_benchmarks command. For development databases only.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument(
+            '--registrations',
+            type=int,
+            default=None,
+            help='How many of the users register for Conclave. Defaults to 1 in 10.'
+        )
+        parser.add_argument('--viols', type=int, default=300)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Delete previously seeded benchmark data first.'
+        )
+
+    def handle(self, *args, **options):
+        num_registrations = options['registrations']
+        if num_registrations is None:
+            num_registrations = options['users'] // 10
+
+        if has_benchmark_data():
+            if not options['clear']:
+                raise CommandError('Benchmark data already exists. Use --clear to replace it.')
+            clear_benchmark_data()
+            self.stdout.write('Deleted the previous benchmark data')
+
+        start = time.perf_counter()
+        try:
+            counts = seed_benchmark_data(
+                options['users'], num_registrations, options['viols'], seed=options['seed'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        self.stdout.write(', '.join(f'{count} {name}' for name, count in counts.items()))
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded benchmark data in {time.perf_counter() - start:.1f}s'))
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:00
+
+from django.db import migrations
+
+# Case-insensitive prefix indexes for the user typeahead. Django
+# compiles __istartswith to UPPER(column::text) LIKE UPPER('abc%'),
+# which can only use an index on that same expression, and only if
+# the index uses text_pattern_ops.
+_INDEXED_COLUMNS = ['first_name', 'last_name', 'username']
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0025_auto_20231227_1939'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql=(
+                f'CREATE INDEX accounts_user_{column}_upper_prefix '
+                f'ON accounts_user (UPPER({column}::text) text_pattern_ops);'
+            ),
+            reverse_sql=f'DROP INDEX accounts_user_{column}_upper_prefix;',
+        )
+        for column in _INDEXED_COLUMNS
+    ]
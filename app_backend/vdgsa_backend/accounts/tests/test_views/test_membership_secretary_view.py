@@ -12,6 +12,7 @@ from selenium.webdriver.remote.webelement import WebElement  # type: ignore
 from selenium.webdriver.support.ui import WebDriverWait  # type: ignore
 
 from vdgsa_backend.accounts.models import MembershipSubscription, MembershipType, User
+from vdgsa_backend.query_budget import QueryBudgetTestMixin
 from vdgsa_backend.templatetags.filters import format_datetime_impl
 
 from .selenium_test_base import SeleniumTestCaseBase
@@ -374,6 +375,33 @@ class MembershipSecretaryDashboardUITestCase(SeleniumTestCaseBase):
         self.assertIn('Forbidden', self.selenium.find_element_by_css_selector('body').text)
 
 
+class MembershipSecretaryQueryBudgetTestCase(QueryBudgetTestMixin, TestCase):
+    users: List[User]
+    num_users: int
+    num_active_users: int
+    membership_secretary: User
+
+    user0_expired_subscription: MembershipSubscription
+    user4_current_subscription: MembershipSubscription
+    user7_lifetime_subscription: MembershipSubscription
+
+    def setUp(self) -> None:
+        super().setUp()
+        _test_data_init(self)
+        self.client.force_login(self.membership_secretary)
+
+    def test_all_users_list(self) -> None:
+        with self.assertQueryBudget(6):
+            response = self.client.get(reverse('membership-secretary') + '?all_users=true')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.num_users, len(response.context['users']))
+
+    def test_all_users_csv(self) -> None:
+        with self.assertQueryBudget(5):
+            response = self.client.get(reverse('all-users-csv') + '?all_users=true')
+        self.assertEqual(200, response.status_code)
+
+
 class DownloadMembersSpreadsheetTestCase(TestCase):
     users: List[User]
     num_users: int
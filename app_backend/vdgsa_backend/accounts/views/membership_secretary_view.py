@@ -18,7 +18,8 @@ from django.views.generic.list import ListView
 
 from vdgsa_backend.accounts.views.permissions import is_membership_secretary
 from vdgsa_backend.templatetags.filters import format_datetime_impl
-from vdgsa_backend.accounts.views.utils import LocationAddress
+from vdgsa_backend.accounts.views.utils import LocationAddress, country_choices
+from vdgsa_backend.db_routing import ReadFromReplicaMixin
 
 from ..models import User
 
@@ -43,13 +44,12 @@ class AddUserForm(forms.ModelForm):
             'address_state': Select(
                 
             ),
-            'address_country': Select(
-                choices=[(c.name, c.name) for c in LocationAddress.getCountries()]
-            ),
+            'address_country': Select(),
         }
 
     def __init__(self, *args: Any, **kwargs: Any):
         super().__init__(*args, **kwargs)
+        self.fields['address_country'].widget.choices = country_choices()
 
         self.fields['first_name'].required = True
         self.fields['last_name'].required = True
@@ -113,7 +113,9 @@ class MembershipSecretaryView(LoginRequiredMixin, UserPassesTestMixin, ListView)
                 or self.request.user.has_perm('accounts.board_member'))
 
 
-class AllUsersSpreadsheetView(LoginRequiredMixin, UserPassesTestMixin, View):
+class AllUsersSpreadsheetView(
+    LoginRequiredMixin, UserPassesTestMixin, ReadFromReplicaMixin, View
+):
     def get(self, *args: Any, **kwargs: Any) -> HttpResponse:
         user_query: QuerySet[User] = User.objects.all().select_related(
             'subscription_is_family_member_for', 'owned_subscription')
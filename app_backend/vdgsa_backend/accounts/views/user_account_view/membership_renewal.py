@@ -6,7 +6,6 @@ purchasing and renewing membership subscriptions.
 import json
 from typing import Any, Dict, Final, List, Sequence, cast
 
-import stripe  # type: ignore
 from django import forms
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
@@ -30,18 +29,22 @@ from vdgsa_backend.accounts.views.permissions import (
     is_membership_secretary, is_requested_user_or_membership_secretary
 )
 from vdgsa_backend.accounts.views.utils import get_ajax_form_response
+from vdgsa_backend.metrics import STRIPE_WEBHOOK_EVENTS
+from vdgsa_backend.stripe_client import get_stripe
 from vdgsa_backend.templatetags.filters import show_name, show_name_and_email
 
 
 # See https://stripe.com/docs/webhooks/build#example-code
 @csrf_exempt
 def stripe_webhook_view(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+    stripe = get_stripe()
     try:
         request_data = json.loads(request.body)
         event = stripe.Event.construct_from(
             request_data, stripe.api_key
         )
     except (ValueError, stripe.error.SignatureVerificationError) as e:
+        STRIPE_WEBHOOK_EVENTS.labels('membership', '', 'invalid').inc()
         return HttpResponse(str(e), status=400)
 
     transaction_type = event.data.object.metadata.get("transaction_type", None)
@@ -52,6 +55,8 @@ def stripe_webhook_view(request: HttpRequest, *args: Any, **kwargs: Any) -> Http
                 stripe_payment_intent_id=event.data.object.payment_intent
             )
             if pending_purchase.is_completed:
+                STRIPE_WEBHOOK_EVENTS.labels(
+                    'membership', event.type, 'already_completed').inc()
                 return HttpResponse('Purchase already completed')
             create_or_renew_subscription(
                 pending_purchase.user, pending_purchase.membership_type)
@@ -64,8 +69,10 @@ def stripe_webhook_view(request: HttpRequest, *args: Any, **kwargs: Any) -> Http
             message=f'{show_name_and_email(pending_purchase.user)} '
                     f'has renewed their {pending_purchase.membership_type} membership'
         )
+        STRIPE_WEBHOOK_EVENTS.labels('membership', event.type, 'completed').inc()
         return HttpResponse('Purchase completed')
 
+    STRIPE_WEBHOOK_EVENTS.labels('membership', event.type, 'ignored').inc()
     return HttpResponse(
         f'No action taken for "{event.type}" event with transaction type "{transaction_type}"'
     )
@@ -146,7 +153,7 @@ class PurchaseSubscriptionView(LoginRequiredMixin, UserPassesTestMixin, View):
         line_items = self._get_stripe_line_items(form)
         redirect_url = request.build_absolute_uri(
             reverse('user-account', kwargs={'pk': self.requested_user.pk}))
-        session = stripe.checkout.Session.create(
+        session = get_stripe().checkout.Session.create(
             payment_method_types=['card'],
             line_items=line_items,
             mode='payment',
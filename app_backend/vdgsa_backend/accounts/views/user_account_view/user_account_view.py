@@ -20,7 +20,9 @@ from django.views.generic.edit import UpdateView
 
 from vdgsa_backend.accounts.models import MembershipType, User
 from vdgsa_backend.accounts.views.permissions import is_requested_user_or_membership_secretary, is_membership_secretary
-from vdgsa_backend.accounts.views.utils import get_ajax_form_response, LocationAddress
+from vdgsa_backend.accounts.views.utils import (
+    LocationAddress, country_choices, get_ajax_form_response
+)
 from .change_email import ChangeEmailForm
 from .membership_renewal import AddFamilyMemberForm, PurchaseSubscriptionForm
 from .user_profile import UserProfileForm
@@ -101,7 +103,7 @@ class UserAccountView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
 
 class LocationForm(Form):
     country = ChoiceField(
-        choices=([('', 'Select a Country')] + LocationAddress.getCountries()),
+        choices=lambda: [('', 'Select a Country')] + country_choices(),
         widget=Select(attrs={'id_country': 'id_country'})
     )
     subdivision = ChoiceField(
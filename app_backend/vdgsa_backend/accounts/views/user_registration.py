@@ -2,6 +2,8 @@
 Contains forms and views involved in user account creation.
 """
 
+from typing import Any
+
 from django import forms
 from django.contrib.auth.forms import PasswordResetForm
 from django.http.request import HttpRequest
@@ -12,7 +14,7 @@ from django_recaptcha.fields import ReCaptchaField
 from django_recaptcha.widgets import ReCaptchaV2Checkbox
 
 from vdgsa_backend.accounts.models import User
-from vdgsa_backend.accounts.views.utils import LocationAddress
+from vdgsa_backend.accounts.views.utils import country_choices, subdivision_choices
 
 
 class UserRegistrationForm(PasswordResetForm):
@@ -23,18 +25,22 @@ class UserRegistrationForm(PasswordResetForm):
     address_city = forms.CharField(label='City')
     address_state = forms.Field(
             label="State/Province",
-            widget=forms.Select(choices=[('','Select State/Province')]+[(c.code.split('-')[1], c.name) for c in LocationAddress.getSubdivisions('United States')],
-            )
+            widget=forms.Select()
         )
     address_postal_code = forms.CharField(label='ZIP/Postal Code')
     address_country = forms.ChoiceField(
-            choices=[(c.name, c.name) for c in LocationAddress.getCountries()],
+            choices=country_choices,
             label="Select a Country",
             initial='United States'
         )
 
     captcha = ReCaptchaField(widget=ReCaptchaV2Checkbox)
 
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.fields['address_state'].widget.choices = (
+            [('', 'Select State/Province')] + subdivision_choices('United States'))
+
 
 class UserRegistrationView(View):
 
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Literal, Optional, TypedDict
-import pycountry
+from typing import Any, Dict, List, Literal, Optional, Tuple, TypedDict
+
 from django.forms.forms import BaseForm
 from django.http.response import JsonResponse
 from django.template.loader import render_to_string
@@ -65,6 +65,10 @@ class LocationAddress():
     # Venezuela: VE, VEN
 
     def getCountries(filter_to_users: bool = False) -> List[Dict[str, object]]:
+        # pycountry is imported here and in getSubdivisions so that it
+        # isn't loaded until a page actually lists countries.
+        import pycountry
+
         # Get the iterable collection of country objects and convert it to a list
         countries_list = list(pycountry.countries)
         return countries_list
@@ -125,6 +129,8 @@ class LocationAddress():
         if country_name not in LocationAddress.COUNTRY_SUBDIVISION_WHITELIST:
             return
 
+        import pycountry
+
         country = pycountry.countries.lookup(country_name)
         subdivisions = [s for s in pycountry.subdivisions if s.country_code == country.alpha_2]
     
@@ -175,3 +181,22 @@ class LocationAddress():
         # Default: return all subdivisions sorted by name
         sorted_subdivisions = sorted(subdivisions, key=lambda state: state.name)
         return sorted_subdivisions
+
+
+# Form fields and widgets should get their choices from these inside a
+# form's __init__ (or pass them as a callable to ChoiceField), rather
+# than when the form class is defined, so that importing the form
+# doesn't load pycountry's data.
+def country_choices() -> List[Tuple[str, str]]:
+    return [(c.name, c.name) for c in LocationAddress.getCountries()]
+
+
+def subdivision_choices(country_name: str) -> List[Tuple[str, str]]:
+    """
+    (code, name) pairs for country_name's subdivisions, with the country
+    prefix removed from the codes (e.g. "NY" rather than "US-NY").
+    """
+    return [
+        (c.code.split('-')[1], c.name)
+        for c in LocationAddress.getSubdivisions(country_name) or []
+    ]
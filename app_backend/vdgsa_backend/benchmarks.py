@@ -0,0 +1,713 @@
+"""
+Contains tools for measuring the site's busiest pages against a
+realistically sized database:
+    - seed_benchmark_data fills the database with synthetic users,
+      membership subscriptions, a Conclave with classes and finalized
+      registrations (every part of the registration filled in), and a
+      rental inventory with history. Rows are inserted with
+      bulk_create, so tens of thousands of users take seconds.
+    - run_benchmarks requests each page from get_endpoint_benchmarks
+      with the Django test client and reports its wall time, query count, and
+      peak memory.
+Use them through the seed_benchmark_data and run_benchmarks commands.
+
+Everything seeded is marked (users by their email domain, the
+Conclave by its year, rental items by their maker) so that
+clear_benchmark_data can remove it again. Don't run these against
+production.
+"""
+
+from __future__ import annotations
+
+import datetime
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Final, Literal, TypedDict
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Permission
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from vdgsa_backend.accounts.models import MembershipSubscription, MembershipType, User
+from vdgsa_backend.conclave_registration.models import (
+    TSHIRT_SIZES, AdditionalRegistrationInfo, AdvancedProjectsInfo, BeginnerInstrumentInfo, Class,
+    Clef, ConclaveRegistrationConfig, EarlyArrivalChoices, Housing, HousingRoomType,
+    InstrumentBringing, InstrumentChoices, InstrumentPurpose, Level, PaymentInfo, Period, Program,
+    RegistrationEntry, RegistrationPhase, RegularProgramClassChoices, RelativeInstrumentLevel,
+    SelfRatingInfo, TShirts, WorkStudyApplication, WorkStudyJob, YesNo, YesNoMaybe
+)
+from vdgsa_backend.query_budget import QueryStats
+from vdgsa_backend.rental_viols.inventory_summary import invalidate_inventory_summary
+from vdgsa_backend.rental_viols.managers.InstrumentManager import ViolSize
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent, RentalState
+from vdgsa_backend.rental_viols.models import (
+    Bow, Case, CurrentRental, RentalHistory, RentalProgram, Viol, WaitingList
+)
+
+BENCHMARK_EMAIL_DOMAIN: Final = 'benchmark.invalid'
+BENCHMARK_STAFF_USERNAME: Final = f'staff@{BENCHMARK_EMAIL_DOMAIN}'
+# Far enough in the future not to collide with a real Conclave.
+BENCHMARK_CONCLAVE_YEAR: Final = 2999
+BENCHMARK_MAKER: Final = 'Benchmark Workshop'
+
+# The staff user is given these so it can load every benchmarked page.
+_STAFF_PERMISSIONS: Final = ['membership_secretary', 'conclave_team', 'rental_viewer']
+
+_BATCH_SIZE: Final = 2000
+_CLASSES_PER_PERIOD: Final = 12
+
+_FIRST_NAMES: Final = [
+    'Alice', 'Benjamin', 'Clara', 'Daniel', 'Eleanor', 'Francis', 'Grace', 'Henry', 'Iris',
+    'James', 'Katherine', 'Lucas', 'Margaret', 'Nathan', 'Olivia', 'Peter', 'Ruth', 'Samuel',
+    'Theresa', 'Walter',
+]
+_LAST_NAMES: Final = [
+    'Anderson', 'Baker', 'Campbell', 'Dowland', 'Evans', 'Ferrabosco', 'Gibbons', 'Hume',
+    'Jenkins', 'Lawes', 'Marais', 'Nelson', 'Ortiz', 'Purcell', 'Quinn', 'Robinson',
+    'Simpson', 'Tye', 'Walker', 'Young',
+]
+_LOCATIONS: Final = [
+    ('Boston', 'MA', 'United States'),
+    ('Chicago', 'IL', 'United States'),
+    ('Denver', 'CO', 'United States'),
+    ('Portland', 'OR', 'United States'),
+    ('Austin', 'TX', 'United States'),
+    ('Toronto', 'ON', 'Canada'),
+    ('Vancouver', 'BC', 'Canada'),
+    ('London', '', 'United Kingdom'),
+]
+_ARRIVAL_DATE_OPTIONS: Final = ['Sunday July 14', 'Monday July 15']
+_EARLY_ARRIVAL_DATE_OPTIONS: Final = ['Saturday July 13']
+_DEPARTURE_DATE_OPTIONS: Final = ['Saturday July 20', 'Sunday July 21']
+_BANQUET_FOOD_OPTIONS: Final = ['Chicken', 'Fish', 'Vegetarian']
+
+# Relative frequencies of each program among the seeded registrants.
+_PROGRAM_WEIGHTS: Final = {
+    Program.regular: 60,
+    Program.part_time: 10,
+    Program.consort_coop: 10,
+    Program.seasoned_players: 5,
+    Program.beginners: 5,
+    Program.faculty_guest_other: 5,
+    Program.non_playing_attendee: 3,
+    Program.vendor: 2,
+}
+
+
+class SeededCounts(TypedDict):
+    users: int
+    subscriptions: int
+    classes: int
+    registration_entries: int
+    viols: int
+    rental_history: int
+
+
+def has_benchmark_data() -> bool:
+    return (
+        User.objects.filter(username__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}').exists()
+        or ConclaveRegistrationConfig.objects.filter(year=BENCHMARK_CONCLAVE_YEAR).exists()
+        or Viol.objects.filter(maker=BENCHMARK_MAKER).exists()
+    )
+
+
+def clear_benchmark_data() -> None:
+    """Deletes everything that seed_benchmark_data created."""
+    with transaction.atomic():
+        # The rental history and waiting list managers' delete() only
+        # marks rows as deleted.
+        RentalHistory.objects.filter(viol_num__maker=BENCHMARK_MAKER).hard_delete()
+        RentalHistory.objects.filter(bow_num__maker=BENCHMARK_MAKER).hard_delete()
+        RentalHistory.objects.filter(case_num__maker=BENCHMARK_MAKER).hard_delete()
+        WaitingList.objects.filter(
+            renter_num__username__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}').hard_delete()
+        Bow.objects.filter(maker=BENCHMARK_MAKER).delete()
+        Case.objects.filter(maker=BENCHMARK_MAKER).delete()
+        Viol.objects.filter(maker=BENCHMARK_MAKER).delete()
+        ConclaveRegistrationConfig.objects.filter(year=BENCHMARK_CONCLAVE_YEAR).delete()
+        User.objects.filter(username__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}').delete()
+    invalidate_inventory_summary()
+
+
+def seed_benchmark_data(
+    num_users: int,
+    num_registrations: int,
+    num_viols: int,
+    *,
+    seed: int = 0,
+) -> SeededCounts:
+    """
+    Inserts the synthetic data described in the module docstring.
+    The same seed always produces the same data. Raises ValueError if
+    benchmark data is already present (see clear_benchmark_data) or if
+    there are more registrations than users.
+    """
+    if num_registrations > num_users:
+        raise ValueError('There must be at least as many users as registrations.')
+    if has_benchmark_data():
+        raise ValueError('Benchmark data already exists.')
+
+    rng = random.Random(seed)
+    with transaction.atomic():
+        users, num_subscriptions = _seed_users(rng, num_users)
+        conclave_config = ConclaveRegistrationConfig.objects.create(
+            year=BENCHMARK_CONCLAVE_YEAR,
+            phase=RegistrationPhase.open,
+            early_arrival_date_options='\n'.join(_EARLY_ARRIVAL_DATE_OPTIONS),
+            arrival_date_options='\n'.join(_ARRIVAL_DATE_OPTIONS),
+            departure_date_options='\n'.join(_DEPARTURE_DATE_OPTIONS),
+            banquet_food_options='\n'.join(_BANQUET_FOOD_OPTIONS),
+            regular_tuition=895,
+            part_time_tuition=595,
+            consort_coop_tuition=895,
+            seasoned_players_tuition=695,
+            workshop_fee=300,
+            prorated_workshop_fee=50,
+            single_room_full_week_cost=1200,
+            double_room_full_week_cost=900,
+            single_room_per_night_cost=200,
+            double_room_per_night_cost=150,
+            single_room_early_arrival_per_night_cost=100,
+            double_room_early_arrival_per_night_cost=75,
+            banquet_guest_fee=60,
+        )
+        classes_by_period = _seed_classes(rng, conclave_config)
+        entries = _seed_registrations(
+            rng, conclave_config, classes_by_period, rng.sample(users, num_registrations))
+        viols, num_history_entries = _seed_rentals(rng, users, num_viols)
+
+    # bulk_create doesn't send the post_save signals that usually
+    # take care of this. (The Conclave's "who's coming" list is
+    # refreshed when the transaction above commits.)
+    invalidate_inventory_summary()
+    return {
+        'users': len(users),
+        'subscriptions': num_subscriptions,
+        'classes': sum(len(classes) for classes in classes_by_period.values()),
+        'registration_entries': len(entries),
+        'viols': len(viols),
+        'rental_history': num_history_entries,
+    }
+
+
+def _seed_users(rng: random.Random, num_users: int) -> tuple[list[User], int]:
+    # Hashing a password for every user would take minutes, and the
+    # benchmarks log in with force_login anyway.
+    password = make_password(None)
+
+    def make_user(index: int) -> User:
+        first_name = rng.choice(_FIRST_NAMES)
+        last_name = rng.choice(_LAST_NAMES)
+        city, state, country = rng.choice(_LOCATIONS)
+        username = f'{first_name}.{last_name}.{index}@{BENCHMARK_EMAIL_DOMAIN}'.lower()
+        return User(
+            username=username,
+            # User.save() normally copies the username into email.
+            email=username,
+            password=password,
+            first_name=first_name,
+            last_name=last_name,
+            address_line_1=f'{rng.randint(1, 9999)} Main St',
+            address_city=city,
+            address_state=state,
+            address_postal_code=f'{rng.randint(10000, 99999)}',
+            address_country=country,
+            phone1=f'555-{rng.randint(1000, 9999)}',
+            is_teacher=rng.random() < 0.1,
+            is_remote_teacher=rng.random() < 0.05,
+            is_instrument_maker=rng.random() < 0.02,
+        )
+
+    staff = User.objects.create_user(
+        BENCHMARK_STAFF_USERNAME, first_name='Benchmark', last_name='Staff')
+    staff.user_permissions.add(*Permission.objects.filter(codename__in=_STAFF_PERMISSIONS))
+    MembershipSubscription.objects.create(
+        owner=staff, membership_type=MembershipType.lifetime,
+        years_renewed=[timezone.now().year])
+
+    # Family members need their primary holder's subscription to exist
+    # first, so they're inserted last.
+    num_family_members = num_users // 10
+    users = User.objects.bulk_create(
+        [make_user(index) for index in range(num_users - num_family_members)],
+        batch_size=_BATCH_SIZE)
+
+    now = timezone.now()
+    subscriptions = []
+    for user in users:
+        roll = rng.random()
+        if roll < 0.05:
+            membership_type = MembershipType.lifetime
+            valid_until = None
+        elif roll < 0.85:
+            membership_type = rng.choice(
+                [MembershipType.regular, MembershipType.student, MembershipType.international])
+            # Some of these have expired.
+            valid_until = now + datetime.timedelta(days=rng.randint(-400, 365))
+        else:
+            continue
+        subscriptions.append(MembershipSubscription(
+            owner=user,
+            membership_type=membership_type,
+            valid_until=valid_until,
+            # The membership CSV expects at least the year they joined.
+            years_renewed=sorted(rng.sample(range(now.year - 10, now.year), rng.randint(1, 5))),
+        ))
+    MembershipSubscription.objects.bulk_create(subscriptions, batch_size=_BATCH_SIZE)
+
+    family_members = []
+    for index in range(num_users - num_family_members, num_users):
+        user = make_user(index)
+        if subscriptions:
+            user.subscription_is_family_member_for = rng.choice(subscriptions)
+        family_members.append(user)
+    users += User.objects.bulk_create(family_members, batch_size=_BATCH_SIZE)
+
+    return users, len(subscriptions) + 1
+
+
+def _seed_classes(
+    rng: random.Random, conclave_config: ConclaveRegistrationConfig
+) -> dict[int, list[Class]]:
+    levels = [level.value for level in Level if level != Level.any]
+    classes = []
+    for period in Period:
+        for index in range(_CLASSES_PER_PERIOD):
+            classes.append(Class(
+                conclave_config=conclave_config,
+                name=f'Class {period}-{index + 1}',
+                period=period,
+                level='-'.join(sorted(rng.sample(levels, 2), key=levels.index)),
+                instructor=f'{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}',
+                description='Music for viols in four, five, and six parts.',
+                offer_to_beginners=index == 0,
+                is_freebie=period == Period.fourth and index == 1,
+                capacity=rng.choice([None, 12, 16, 20]),
+                # bulk_create doesn't fill in order_with_respect_to's
+                # column.
+                _order=len(classes),
+            ))
+    Class.objects.bulk_create(classes)
+
+    by_period: dict[int, list[Class]] = {period: [] for period in Period}
+    for class_ in classes:
+        by_period[class_.period].append(class_)
+    return by_period
+
+
+def _seed_registrations(
+    rng: random.Random,
+    conclave_config: ConclaveRegistrationConfig,
+    classes_by_period: dict[int, list[Class]],
+    users: list[User],
+) -> list[RegistrationEntry]:
+    entries = RegistrationEntry.objects.bulk_create(
+        [
+            RegistrationEntry(
+                conclave_config=conclave_config,
+                user=user,
+                program=rng.choices(
+                    list(_PROGRAM_WEIGHTS), weights=list(_PROGRAM_WEIGHTS.values()))[0],
+            )
+            for user in users
+        ],
+        batch_size=_BATCH_SIZE,
+    )
+
+    levels = [level.value for level in Level if level != Level.any]
+    instruments = []
+    instruments_by_entry: dict[int, list[InstrumentBringing]] = {}
+    for entry in entries:
+        for order in range(rng.randint(1, 2)):
+            instrument = InstrumentBringing(
+                registration_entry=entry,
+                size=rng.choice(
+                    [InstrumentChoices.treble, InstrumentChoices.tenor, InstrumentChoices.bass]),
+                relative_level=RelativeInstrumentLevel.at_level,
+                level=rng.choice(levels),
+                clefs=rng.sample([clef.value for clef in Clef], 2),
+                purpose=InstrumentPurpose.bringing_for_self,
+                _order=order,
+            )
+            instruments.append(instrument)
+            instruments_by_entry.setdefault(entry.pk, []).append(instrument)
+    InstrumentBringing.objects.bulk_create(instruments, batch_size=_BATCH_SIZE)
+
+    parts: dict[type, list[object]] = {
+        AdditionalRegistrationInfo: [],
+        WorkStudyApplication: [],
+        SelfRatingInfo: [],
+        BeginnerInstrumentInfo: [],
+        RegularProgramClassChoices: [],
+        AdvancedProjectsInfo: [],
+        Housing: [],
+        TShirts: [],
+        PaymentInfo: [],
+    }
+    for entry in entries:
+        parts[AdditionalRegistrationInfo].append(AdditionalRegistrationInfo(
+            registration_entry=entry,
+            phone=entry.user.phone1,
+            emergency_contact_name=f'{rng.choice(_FIRST_NAMES)} {entry.user.last_name}',
+            emergency_contact_phone=f'555-{rng.randint(1000, 9999)}',
+            include_in_whos_coming_to_conclave_list=rng.choice(YesNo.values),
+            age=rng.choice(['18-35', '36-64', '65+']),
+            gender=rng.choice(['Male', 'Female', 'Non-binary', 'Other']),
+            attended_conclave_before=YesNo.yes,
+            buddy_willingness=rng.choice(YesNoMaybe.values),
+            wants_display_space=(
+                YesNo.yes if entry.program == Program.vendor else YesNo.no),
+            liability_release=True,
+            covid_policy=True,
+            photo_release_auth=rng.choice(YesNo.values),
+        ))
+        wants_work_study = rng.random() < 0.1
+        parts[WorkStudyApplication].append(WorkStudyApplication(
+            registration_entry=entry,
+            wants_work_study=YesNo.yes if wants_work_study else YesNo.no,
+            phone_number=entry.user.phone1,
+            can_receive_texts_at_phone_number=YesNo.yes,
+            has_been_to_conclave=YesNo.yes,
+            has_done_work_study=YesNo.no,
+            can_arrive_before_first_meeting='yes',
+            early_arrival=EarlyArrivalChoices.no,
+            can_stay_until_sunday_afternoon=YesNo.yes,
+            job_preferences=rng.sample(WorkStudyJob.values, 2) if wants_work_study else [],
+            has_car=rng.choice(YesNoMaybe.values),
+            relevant_job_experience='Stage crew at my local early music festival.',
+        ))
+        entry_instruments = instruments_by_entry[entry.pk]
+        if entry.program == Program.beginners:
+            parts[BeginnerInstrumentInfo].append(BeginnerInstrumentInfo(
+                registration_entry=entry,
+                needs_instrument=YesNo.yes,
+            ))
+        elif entry.class_selection_is_required:
+            parts[SelfRatingInfo].append(SelfRatingInfo(
+                registration_entry=entry, level=rng.choice(levels)))
+        if entry.class_selection_is_required:
+            parts[RegularProgramClassChoices].append(_make_class_choices(
+                rng, entry, classes_by_period, entry_instruments[0]))
+        parts[AdvancedProjectsInfo].append(AdvancedProjectsInfo(
+            registration_entry=entry, participation=rng.choice(YesNo.values)))
+        room_type = rng.choice(HousingRoomType.values)
+        parts[Housing].append(Housing(
+            registration_entry=entry,
+            room_type=room_type,
+            arrival_day=rng.choice(_ARRIVAL_DATE_OPTIONS),
+            departure_day=rng.choice(_DEPARTURE_DATE_OPTIONS),
+            banquet_food_choice=rng.choice(_BANQUET_FOOD_OPTIONS),
+            is_bringing_guest_to_banquet=YesNo.no,
+        ))
+        parts[TShirts].append(TShirts(
+            registration_entry=entry,
+            tshirt1=rng.choice(TSHIRT_SIZES),
+            donation=rng.choice([0, 0, 25, 50]),
+        ))
+        parts[PaymentInfo].append(PaymentInfo(
+            registration_entry=entry,
+            stripe_payment_method_id=f'pm_benchmark_{entry.pk}',
+        ))
+
+    for model, objs in parts.items():
+        model.objects.bulk_create(objs, batch_size=_BATCH_SIZE)  # type: ignore
+    return entries
+
+
+def _make_class_choices(
+    rng: random.Random,
+    entry: RegistrationEntry,
+    classes_by_period: dict[int, list[Class]],
+    instrument: InstrumentBringing,
+) -> RegularProgramClassChoices:
+    class_choices = RegularProgramClassChoices(registration_entry=entry)
+    if entry.uses_flexible_class_selection:
+        all_classes = [class_ for classes in classes_by_period.values() for class_ in classes]
+        for rank, class_ in enumerate(rng.sample(all_classes, 3), start=1):
+            setattr(class_choices, f'flex_choice{rank}', class_)
+            setattr(class_choices, f'flex_choice{rank}_instrument', instrument)
+        return class_choices
+
+    if entry.program == Program.beginners:
+        periods = [Period.fourth]
+    else:
+        periods = rng.sample(list(Period), rng.choice([2, 3, 3, 4]))
+    for period in periods:
+        for rank, class_ in enumerate(rng.sample(classes_by_period[period], 3), start=1):
+            setattr(class_choices, f'period{period}_choice{rank}', class_)
+            setattr(class_choices, f'period{period}_choice{rank}_instrument', instrument)
+    return class_choices
+
+
+def _seed_rentals(
+    rng: random.Random, users: list[User], num_viols: int
+) -> tuple[list[Viol], int]:
+    today = timezone.localdate()
+    sizes = [ViolSize.treble, ViolSize.tenor, ViolSize.bass, ViolSize.seven_string_bass]
+
+    def make_instrument_fields(size: str) -> dict[str, object]:
+        return {
+            'maker': BENCHMARK_MAKER,
+            'size': size,
+            'value': rng.randint(500, 8000),
+            'provenance': f'Donated by {rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}',
+            'description': rng.choice(['Carved head', 'Flamed maple back', 'Open scroll']),
+            'accession_date': today - datetime.timedelta(days=rng.randint(365, 20 * 365)),
+        }
+
+    viols = []
+    for _ in range(num_viols):
+        size = rng.choice(sizes)
+        viols.append(Viol(
+            **make_instrument_fields(size),
+            strings=7 if size == ViolSize.seven_string_bass else 6,
+            program=rng.choice([RentalProgram.regular] * 4 + [RentalProgram.select_reserve]),
+            status=rng.choices(
+                [RentalState.available, RentalState.rented, RentalState.retired],
+                weights=[50, 45, 5])[0],
+        ))
+
+    history = []
+    current_rentals = []
+    with transaction.atomic():
+        first_num = Viol.objects.lock_next_vdgsa_num()
+        for offset, viol in enumerate(viols):
+            viol.vdgsa_number = first_num + offset
+            if viol.status == RentalState.rented:
+                viol.renter = rng.choice(users)
+        Viol.objects.bulk_create(viols, batch_size=_BATCH_SIZE)
+
+        accessories: dict[type, list[Bow | Case]] = {Bow: [], Case: []}
+        for model, items in accessories.items():
+            first_num = model.objects.lock_next_vdgsa_num()  # type: ignore
+            for offset, viol in enumerate(viols):
+                items.append(model(
+                    **make_instrument_fields(viol.size),
+                    vdgsa_number=first_num + offset,
+                    viol_num=viol,
+                    status=RentalState.attached,
+                ))
+            model.objects.bulk_create(items, batch_size=_BATCH_SIZE)  # type: ignore
+
+        for viol in viols:
+            history.append(RentalHistory(viol_num=viol, event=RentalEvent.new))
+            rental_start = viol.accession_date
+            for _ in range(rng.randint(0, 4)):
+                rental_start += datetime.timedelta(days=rng.randint(30, 365))
+                rental_end = rental_start + datetime.timedelta(days=365)
+                if rental_end >= today:
+                    break
+                renter = rng.choice(users)
+                history += [
+                    RentalHistory(
+                        viol_num=viol, event=RentalEvent.rented, renter_num=renter,
+                        rental_start=rental_start, rental_end=rental_end,
+                        notes='Rented at Conclave'),
+                    RentalHistory(
+                        viol_num=viol, event=RentalEvent.returned, renter_num=renter,
+                        notes=rng.choice(['', 'Returned with a cracked bridge'])),
+                ]
+                rental_start = rental_end
+            if viol.status == RentalState.rented:
+                rental_start = today - datetime.timedelta(days=rng.randint(0, 330))
+                rental = RentalHistory(
+                    viol_num=viol, event=RentalEvent.rented, renter_num=viol.renter,
+                    rental_start=rental_start,
+                    rental_end=rental_start + datetime.timedelta(days=365))
+                history.append(rental)
+                current_rentals.append(CurrentRental(
+                    viol=viol, renter=viol.renter, rental_start=rental.rental_start,
+                    rental_end=rental.rental_end, rental=rental))
+            elif viol.status == RentalState.retired:
+                history.append(RentalHistory(viol_num=viol, event=RentalEvent.retired))
+        for bow in accessories[Bow]:
+            history.append(RentalHistory(bow_num=bow, event=RentalEvent.new))
+        for case in accessories[Case]:
+            history.append(RentalHistory(case_num=case, event=RentalEvent.new))
+        RentalHistory.objects.bulk_create(history, batch_size=_BATCH_SIZE)
+        CurrentRental.objects.bulk_create(current_rentals, batch_size=_BATCH_SIZE)
+
+        WaitingList.objects.bulk_create(
+            [
+                WaitingList(
+                    renter_num=user,
+                    size=rng.choice(sizes),
+                    date_req=today - datetime.timedelta(days=rng.randint(0, 365)),
+                )
+                for user in rng.sample(users, min(len(users), num_viols // 4))
+            ],
+            batch_size=_BATCH_SIZE,
+        )
+
+    return viols, len(history)
+
+
+# =================================================================================================
+
+
+class EndpointBenchmark(TypedDict):
+    name: str
+    method: Literal['GET', 'POST']
+    url: str
+    data: dict[str, object]
+
+
+class TimingSummary(TypedDict):
+    min: float
+    median: float
+    max: float
+
+
+class BenchmarkResult(TypedDict):
+    name: str
+    method: str
+    url: str
+    status_code: int
+    response_bytes: int
+    repeat: int
+    wall_time_ms: TimingSummary
+    num_queries: int
+    query_time_ms: float
+    peak_memory_kb: float
+
+
+def get_endpoint_benchmarks() -> list[EndpointBenchmark]:
+    """
+    The pages to benchmark. Raises ValueError if there's no benchmark
+    data to request them with.
+    """
+    conclave_config = ConclaveRegistrationConfig.objects.filter(
+        year=BENCHMARK_CONCLAVE_YEAR).first()
+    if conclave_config is None:
+        raise ValueError('There is no benchmark data. Run seed_benchmark_data first.')
+    registration_entry = RegistrationEntry.objects.filter(
+        conclave_config=conclave_config, payment_info__isnull=False
+    ).order_by('pk').first()
+    if registration_entry is None:
+        raise ValueError('The benchmark Conclave has no registrations.')
+
+    return [
+        {
+            'name': 'directory_search',
+            'method': 'POST',
+            'url': reverse('directory'),
+            # address_country and address_state are read from the raw
+            # form data, so they have to be present.
+            'data': {
+                'searchtext': 'son', 'isAdvancedSearch': '', 'first_name': '',
+                'last_name': '', 'address_city': '', 'address_state': '',
+                'address_country': '', 'page': 1,
+            },
+        },
+        {
+            'name': 'all_users_csv',
+            'method': 'GET',
+            'url': reverse('all-users-csv'),
+            'data': {'all_users': 'true'},
+        },
+        {
+            'name': 'registration_entries_csv',
+            'method': 'GET',
+            'url': reverse(
+                'download-registration-entries',
+                kwargs={'conclave_config_pk': conclave_config.pk}),
+            'data': {},
+        },
+        {
+            'name': 'list_registration_entries',
+            'method': 'GET',
+            'url': reverse(
+                'list-registration-entries', kwargs={'conclave_config_pk': conclave_config.pk}),
+            'data': {},
+        },
+        {
+            'name': 'list_viols',
+            'method': 'GET',
+            'url': reverse('list-viols'),
+            'data': {'state': 'all', 'program': 'all', 'size': 'all'},
+        },
+        {
+            # Only the page load: submitting it charges a card.
+            'name': 'conclave_payment',
+            'method': 'GET',
+            'url': reverse(
+                'conclave-payment', kwargs={'conclave_reg_pk': registration_entry.pk}),
+            'data': {},
+        },
+    ]
+
+
+def run_benchmarks(repeat: int = 5, names: list[str] | None = None) -> list[BenchmarkResult]:
+    """
+    Requests each benchmarked page (or only those in names) as the
+    benchmark staff user. Each page is requested once to warm up,
+    then timed repeat times. The query count is from the last timed
+    request. Peak memory is measured in a separate request because
+    tracemalloc slows everything down.
+    """
+    benchmarks = get_endpoint_benchmarks()
+    if names is not None:
+        unknown = set(names) - {benchmark['name'] for benchmark in benchmarks}
+        if unknown:
+            raise ValueError(f'Unknown benchmark(s): {", ".join(sorted(unknown))}')
+        benchmarks = [benchmark for benchmark in benchmarks if benchmark['name'] in names]
+
+    client = Client()
+    client.force_login(User.objects.get(username=BENCHMARK_STAFF_USERNAME))
+    results: list[BenchmarkResult] = []
+    with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+        for benchmark in benchmarks:
+            status_code, response_bytes = _request(client, benchmark)
+
+            timings = []
+            for _ in range(repeat):
+                with QueryStats().record() as stats:
+                    start = time.perf_counter()
+                    _request(client, benchmark)
+                    timings.append((time.perf_counter() - start) * 1000)
+
+            tracemalloc.start()
+            try:
+                _request(client, benchmark)
+                _, peak_memory = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+
+            results.append({
+                'name': benchmark['name'],
+                'method': benchmark['method'],
+                'url': benchmark['url'],
+                'status_code': status_code,
+                'response_bytes': response_bytes,
+                'repeat': repeat,
+                'wall_time_ms': {
+                    'min': round(min(timings), 2),
+                    'median': round(statistics.median(timings), 2),
+                    'max': round(max(timings), 2),
+                },
+                'num_queries': stats.count,
+                'query_time_ms': round(stats.total_time_ms, 2),
+                'peak_memory_kb': round(peak_memory / 1024, 1),
+            })
+    return results
+
+
+def _request(client: Client, benchmark: EndpointBenchmark) -> tuple[int, int]:
+    if benchmark['method'] == 'POST':
+        response = client.post(benchmark['url'], benchmark['data'])
+    else:
+        response = client.get(benchmark['url'], benchmark['data'])
+    # Streaming responses (the CSV exports) do most of their work
+    # while being read.
+    if response.streaming:
+        content = b''.join(response.streaming_content)  # type: ignore
+    else:
+        content = response.content
+    return response.status_code, len(content)
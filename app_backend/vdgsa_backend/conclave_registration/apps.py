@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class ConclaveRegistrationConfig(AppConfig):
     name = 'vdgsa_backend.conclave_registration'
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
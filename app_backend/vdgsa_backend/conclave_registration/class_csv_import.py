@@ -0,0 +1,176 @@
+"""
+Contains the pipeline that loads a Conclave's class catalog from CSV.
+
+The whole file is parsed and validated before anything is written.
+Rows are matched to existing classes by (name, period), so re-importing
+a catalog updates classes in place instead of recreating them, which
+preserves registrants' class choices. Classes missing from the file are
+deleted. All writes happen in one transaction with a constant number of
+queries regardless of catalog size.
+"""
+
+from __future__ import annotations
+
+import csv
+from typing import Final, TextIO, TypedDict
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from vdgsa_backend.conclave_registration.models import Class, ConclaveRegistrationConfig, Period
+
+REQUIRED_COLUMNS: Final = [
+    'Title',
+    'Period',
+    'Level',
+    'Teacher',
+    'Description',
+    'Notes',
+    'offer_to_beginners',
+    'is_freebie',
+]
+# Optional, a blank value means the class has no capacity limit.
+CAPACITY_COLUMN: Final = 'Capacity'
+
+# Class fields that are copied from the CSV onto existing classes.
+UPDATE_FIELDS: Final = [
+    'level',
+    'instructor',
+    'description',
+    'notes',
+    'offer_to_beginners',
+    'is_freebie',
+    'capacity',
+    '_order',
+]
+
+
+class ClassImportRowError(TypedDict):
+    # The line number in the CSV file, the header is line 1.
+    row_num: int
+    messages: list[str]
+
+
+class ClassImportResult(TypedDict):
+    errors: list[ClassImportRowError]
+    created: list[Class]
+    updated: list[Class]
+    deleted: list[Class]
+
+
+def import_classes_csv(
+    conclave_config: ConclaveRegistrationConfig,
+    csv_file: TextIO,
+    *,
+    dry_run: bool = False,
+) -> ClassImportResult:
+    """
+    Validates every row of csv_file and, if there are no errors and
+    dry_run is False, replaces the classes in conclave_config with the
+    classes in the file.
+    """
+    result: ClassImportResult = {'errors': [], 'created': [], 'updated': [], 'deleted': []}
+
+    reader = csv.DictReader(csv_file)
+    missing_columns = [
+        column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])
+    ]
+    if missing_columns:
+        result['errors'].append({
+            'row_num': 1,
+            'messages': [f'Missing column(s): {", ".join(missing_columns)}'],
+        })
+        return result
+
+    existing = {
+        (class_.name, class_.period): class_ for class_ in conclave_config.classes.all()
+    }
+    seen: dict[tuple[str, int], int] = {}
+    # reader.line_num accounts for quoted values that span lines.
+    for index, row in enumerate(reader):
+        row_num = reader.line_num
+        class_, messages = _parse_row(row)
+        if class_ is None:
+            result['errors'].append({'row_num': row_num, 'messages': messages})
+            continue
+
+        key = (class_.name, class_.period)
+        if key in seen:
+            result['errors'].append({
+                'row_num': row_num,
+                'messages': [
+                    f'"{class_.name}" is already in period {class_.period} '
+                    f'on line {seen[key]}'
+                ],
+            })
+            continue
+        seen[key] = row_num
+
+        # Classes are displayed in the same order as the file.
+        class_._order = index  # type: ignore
+        if key in existing:
+            class_.pk = existing[key].pk
+            result['updated'].append(class_)
+        else:
+            result['created'].append(class_)
+
+    result['deleted'] = [class_ for key, class_ in existing.items() if key not in seen]
+
+    if result['errors'] or dry_run:
+        return result
+
+    with transaction.atomic():
+        Class.objects.filter(pk__in=[class_.pk for class_ in result['deleted']]).delete()
+        Class.objects.bulk_update(result['updated'], UPDATE_FIELDS)
+        for class_ in result['created']:
+            class_.conclave_config = conclave_config
+        Class.objects.bulk_create(result['created'])
+
+    return result
+
+
+def _parse_row(row: dict[str, str | None]) -> tuple[Class | None, list[str]]:
+    # DictReader fills in None for values missing from short rows.
+    row = {column: value or '' for column, value in row.items()}
+    messages: list[str] = []
+
+    try:
+        period = Period(int(row['Period']))
+    except (TypeError, ValueError):
+        messages.append(f'Invalid period: "{row["Period"]}"')
+        period = None
+
+    capacity = None
+    capacity_str = (row.get(CAPACITY_COLUMN) or '').strip()
+    if capacity_str:
+        try:
+            capacity = int(capacity_str)
+        except ValueError:
+            messages.append(f'Invalid capacity: "{capacity_str}"')
+
+    if messages:
+        return None, messages
+
+    class_ = Class(
+        name=row['Title'].strip(),
+        period=period,
+        level=row['Level'],
+        instructor=row['Teacher'],
+        description=row['Description'],
+        notes=row['Notes'],
+        offer_to_beginners=row['offer_to_beginners'].strip().lower() == 'true',
+        is_freebie=row['is_freebie'].strip().lower() == 'true',
+        capacity=capacity,
+    )
+    try:
+        # conclave_config is set right before saving, and uniqueness
+        # within the file is checked by the caller.
+        class_.full_clean(exclude=['conclave_config'], validate_unique=False)
+    except ValidationError as e:
+        return None, [
+            f'{field}: {message}' if field != '__all__' else message
+            for field, field_messages in e.message_dict.items()
+            for message in field_messages
+        ]
+
+    return class_, []
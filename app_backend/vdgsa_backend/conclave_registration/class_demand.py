@@ -0,0 +1,126 @@
+"""
+Contains the class demand report used by the music director to
+balance classes. Every class choice slot on RegularProgramClassChoices
+(period and flex choices) is unpivoted in SQL so that demand for all
+classes in a Conclave is computed with a single query.
+"""
+
+from __future__ import annotations
+
+from typing import Final, TypedDict
+
+from django.db import connection
+
+from vdgsa_backend.conclave_registration.models import (
+    Class, ConclaveRegistrationConfig, Level, PaymentInfo, Period, RegistrationEntry,
+    RegularProgramClassChoices, SelfRatingInfo
+)
+
+RANKS: Final = (1, 2, 3)
+
+# (rank, column name) for every class choice slot.
+CHOICE_SLOTS: Final = [
+    *[
+        (choice, f'period{period}_choice{choice}_id')
+        for period in Period
+        for choice in RANKS
+    ],
+    *[(choice, f'flex_choice{choice}_id') for choice in RANKS],
+]
+
+# Registrants without a self-rating (e.g. beginners) are counted here.
+NO_LEVEL: Final = ''
+# Levels that can appear as columns in the report, in display order.
+REGISTRANT_LEVELS: Final = [NO_LEVEL] + [level.value for level in list(Level)[1:]]
+
+
+class ClassDemand(TypedDict):
+    class_id: int
+    name: str
+    instructor: str
+    level: str
+    period: int
+    is_freebie: bool
+    # Number of registrants who chose this class as their 1st, 2nd,
+    # and 3rd choice, keyed by rank.
+    by_rank: dict[int, int]
+    # Same as by_rank, but only counting finalized registrations.
+    finalized_by_rank: dict[int, int]
+    # Number of registrants (any rank) keyed by self-rated level.
+    by_level: dict[str, int]
+    total: int
+    finalized_total: int
+
+
+def _demand_sql() -> str:
+    slot_values = ', '.join(f'({rank}, choices.{column})' for rank, column in CHOICE_SLOTS)
+    return f'''
+        SELECT
+            cls.id, cls.name, cls.instructor, cls.level, cls.period,
+            cls.is_freebie,
+            demand.rank, demand.is_finalized, demand.registrant_level,
+            COUNT(demand.class_id)
+        FROM {Class._meta.db_table} AS cls
+        LEFT JOIN (
+            SELECT
+                slot.class_id,
+                slot.rank,
+                COALESCE(payment.stripe_payment_method_id, '') <> '' AS is_finalized,
+                COALESCE(self_rating.level, '') AS registrant_level
+            FROM {RegularProgramClassChoices._meta.db_table} AS choices
+            JOIN {RegistrationEntry._meta.db_table} AS entry
+                ON entry.id = choices.registration_entry_id
+            LEFT JOIN {PaymentInfo._meta.db_table} AS payment
+                ON payment.registration_entry_id = entry.id
+            LEFT JOIN {SelfRatingInfo._meta.db_table} AS self_rating
+                ON self_rating.registration_entry_id = entry.id
+            CROSS JOIN LATERAL (VALUES {slot_values}) AS slot (rank, class_id)
+            WHERE entry.conclave_config_id = %s AND slot.class_id IS NOT NULL
+        ) AS demand ON demand.class_id = cls.id
+        WHERE cls.conclave_config_id = %s
+        GROUP BY cls.id, demand.rank, demand.is_finalized, demand.registrant_level
+        ORDER BY cls.period, cls._order
+    '''
+
+
+def get_class_demand(conclave_config: ConclaveRegistrationConfig) -> list[ClassDemand]:
+    """
+    Returns per-class choice counts for every class in conclave_config,
+    ordered by period and then by the order classes were added.
+    Classes that nobody has chosen are included with zero counts.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(_demand_sql(), [conclave_config.pk, conclave_config.pk])
+        rows = cursor.fetchall()
+
+    demand: dict[int, ClassDemand] = {}
+    for (class_id, name, instructor, level, period, is_freebie,
+         rank, is_finalized, registrant_level, count) in rows:
+        if class_id not in demand:
+            demand[class_id] = {
+                'class_id': class_id,
+                'name': name,
+                'instructor': instructor,
+                'level': level,
+                'period': period,
+                'is_freebie': is_freebie,
+                'by_rank': {rank_: 0 for rank_ in RANKS},
+                'finalized_by_rank': {rank_: 0 for rank_ in RANKS},
+                'by_level': {},
+                'total': 0,
+                'finalized_total': 0,
+            }
+
+        if rank is None:
+            continue
+
+        class_demand = demand[class_id]
+        class_demand['by_rank'][rank] += count
+        class_demand['total'] += count
+        if is_finalized:
+            class_demand['finalized_by_rank'][rank] += count
+            class_demand['finalized_total'] += count
+        class_demand['by_level'][registrant_level] = (
+            class_demand['by_level'].get(registrant_level, 0) + count)
+
+    return list(demand.values())
@@ -0,0 +1,357 @@
+"""
+Contains the batch engine that places finalized registrants into classes.
+
+Placement is modeled as a min-cost flow problem:
+    source -> one node per requested class slot (capacity 1)
+           -> each class the registrant chose for that slot
+              (capacity 1, cost based on choice rank and level fit)
+           -> sink (capacity Class.capacity, unlimited if blank)
+
+Registrants in programs that choose classes for specific periods get
+one slot per period they made choices for. Registrants in the flexible
+selection programs (part-time, seasoned players) get a single slot
+whose choices can span periods. Because all slots share the class
+nodes, the whole conclave is solved at once, which places as many
+registrants as possible and then maximizes preference satisfaction.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+from typing import Final, Iterable, TypedDict
+
+from django.db import transaction
+
+from vdgsa_backend.conclave_registration.models import (
+    FLEXIBLE_CLASS_SELECTION_PROGRAMS, LEVEL_ORDERING, Class, ClassAssignment,
+    ConclaveRegistrationConfig, Level, Period, RegularProgramClassChoices
+)
+
+# Cost of placing a registrant in their 1st, 2nd, or 3rd choice.
+RANK_COSTS: Final = {1: 0, 2: 1, 3: 2}
+# Added to the cost of a choice whose level range doesn't include the
+# registrant's self-rated level. This is larger than the difference
+# between any two rank costs, so a choice that fits the registrant's
+# level is always preferred over one that doesn't.
+LEVEL_MISMATCH_COST: Final = 3
+
+
+class PlacementChoice(TypedDict):
+    class_id: int
+    rank: int
+    level_mismatch: bool
+
+
+class PlacementRequest(TypedDict):
+    registration_entry_id: int
+    # Each inner list holds the ranked choices for one class the
+    # registrant should be placed in.
+    slots: list[list[PlacementChoice]]
+
+
+class Placement(TypedDict):
+    registration_entry_id: int
+    class_id: int
+    rank: int
+    level_mismatch: bool
+
+
+def solve_placement(
+    requests: Iterable[PlacementRequest],
+    capacities: dict[int, int | None],
+) -> list[Placement]:
+    """
+    Returns placements that fill as many requested slots as possible
+    and, among those, minimize the total choice-rank cost.
+    capacities maps the id of every class that can be chosen to its
+    capacity (None for no limit). Ties are broken in request order.
+    """
+    slots: list[tuple[int, list[PlacementChoice]]] = [
+        (request['registration_entry_id'], slot_choices)
+        for request in requests
+        for slot_choices in request['slots']
+        if slot_choices
+    ]
+
+    source, sink = 0, 1
+    class_nodes = {class_id: 2 + i for i, class_id in enumerate(capacities)}
+    num_nodes = 2 + len(class_nodes) + len(slots)
+    flow = _MinCostFlow(num_nodes)
+
+    demand_per_class = dict.fromkeys(capacities, 0)
+    choice_edges: list[tuple[int, int, PlacementChoice]] = []
+    for slot_index, (entry_id, slot_choices) in enumerate(slots):
+        slot_node = 2 + len(class_nodes) + slot_index
+        flow.add_edge(source, slot_node, 1, 0)
+        for choice in slot_choices:
+            cost = RANK_COSTS[choice['rank']]
+            if choice['level_mismatch']:
+                cost += LEVEL_MISMATCH_COST
+            edge = flow.add_edge(slot_node, class_nodes[choice['class_id']], 1, cost)
+            choice_edges.append((edge, entry_id, choice))
+            demand_per_class[choice['class_id']] += 1
+
+    for class_id, class_node in class_nodes.items():
+        capacity = capacities[class_id]
+        flow.add_edge(
+            class_node, sink,
+            demand_per_class[class_id] if capacity is None else capacity,
+            0
+        )
+
+    flow.solve(source, sink)
+
+    return [
+        {
+            'registration_entry_id': entry_id,
+            'class_id': choice['class_id'],
+            'rank': choice['rank'],
+            'level_mismatch': choice['level_mismatch'],
+        }
+        for edge, entry_id, choice in choice_edges
+        if flow.flow(edge)
+    ]
+
+
+_INFINITY: Final = float('inf')
+
+
+class _MinCostFlow:
+    """
+    Primal-dual min-cost max-flow. Shortest paths are found with
+    Dijkstra on reduced costs, then every shortest path is augmented at
+    once with a Dinic-style blocking flow. Since placement costs are
+    small integers, only a handful of Dijkstra rounds are needed even
+    for several thousand slots.
+    """
+
+    def __init__(self, num_nodes: int):
+        self._graph: list[list[int]] = [[] for _ in range(num_nodes)]
+        # Edge i and its residual edge i ^ 1 are stored next to each other.
+        self._to: list[int] = []
+        self._cap: list[int] = []
+        self._cost: list[int] = []
+
+    def add_edge(self, from_: int, to: int, capacity: int, cost: int) -> int:
+        edge = len(self._to)
+        self._graph[from_].append(edge)
+        self._to.append(to)
+        self._cap.append(capacity)
+        self._cost.append(cost)
+
+        self._graph[to].append(edge + 1)
+        self._to.append(from_)
+        self._cap.append(0)
+        self._cost.append(-cost)
+        return edge
+
+    def flow(self, edge: int) -> int:
+        return self._cap[edge ^ 1]
+
+    def solve(self, source: int, sink: int) -> int:
+        potential = [0] * len(self._graph)
+        total_flow = 0
+        while True:
+            dist = self._shortest_paths(source, potential)
+            if dist[sink] == _INFINITY:
+                return total_flow
+
+            for node, node_dist in enumerate(dist):
+                if node_dist != _INFINITY:
+                    potential[node] += int(node_dist)
+
+            total_flow += self._blocking_flow(source, sink, potential)
+
+    def _shortest_paths(self, source: int, potential: list[int]) -> list[float]:
+        graph, to, cap, cost = self._graph, self._to, self._cap, self._cost
+        dist: list[float] = [_INFINITY] * len(graph)
+        dist[source] = 0
+        queue = [(0, source)]
+        while queue:
+            node_dist, node = heapq.heappop(queue)
+            if node_dist > dist[node]:
+                continue
+            for edge in graph[node]:
+                if cap[edge] <= 0:
+                    continue
+                neighbor = to[edge]
+                new_dist = node_dist + cost[edge] + potential[node] - potential[neighbor]
+                if new_dist < dist[neighbor]:
+                    dist[neighbor] = new_dist
+                    heapq.heappush(queue, (new_dist, neighbor))
+
+        return dist
+
+    def _is_admissible(self, edge: int, node: int, potential: list[int]) -> bool:
+        return (
+            self._cap[edge] > 0
+            and self._cost[edge] + potential[node] - potential[self._to[edge]] == 0
+        )
+
+    def _blocking_flow(self, source: int, sink: int, potential: list[int]) -> int:
+        graph, to, cap = self._graph, self._to, self._cap
+
+        # Layer the zero reduced cost edges by BFS depth so that
+        # augmenting paths can't loop through zero-cost cycles.
+        depth = [-1] * len(graph)
+        depth[source] = 0
+        layer = [source]
+        while layer:
+            next_layer = []
+            for node in layer:
+                for edge in graph[node]:
+                    neighbor = to[edge]
+                    if depth[neighbor] == -1 and self._is_admissible(edge, node, potential):
+                        depth[neighbor] = depth[node] + 1
+                        next_layer.append(neighbor)
+            layer = next_layer
+
+        total_flow = 0
+        next_edge_index = [0] * len(graph)
+        path: list[int] = []
+        node = source
+        while True:
+            if node == sink:
+                bottleneck = min(cap[edge] for edge in path)
+                for edge in path:
+                    cap[edge] -= bottleneck
+                    cap[edge ^ 1] += bottleneck
+                total_flow += bottleneck
+                path = []
+                node = source
+                continue
+
+            edges = graph[node]
+            while next_edge_index[node] < len(edges):
+                edge = edges[next_edge_index[node]]
+                if (depth[to[edge]] == depth[node] + 1
+                        and self._is_admissible(edge, node, potential)):
+                    path.append(edge)
+                    node = to[edge]
+                    break
+                next_edge_index[node] += 1
+            else:
+                # Dead end, back up and skip the edge that led here.
+                if node == source:
+                    return total_flow
+                node = to[path.pop() ^ 1]
+                next_edge_index[node] += 1
+
+
+# -----------------------------------------------------------------------------
+
+
+_LEVEL_TOKEN_RE: Final = re.compile(r'(?<![A-Z])(?:UI|LI|B|I|A)\+?(?![A-Z+])')
+
+
+def class_level_range(class_level: str) -> tuple[int, int] | None:
+    """
+    Parses a free-text Class.level (e.g. "LI-I", "UI+/A") into the
+    lowest and highest LEVEL_ORDERING values it mentions.
+    Returns None if the class is open to any level.
+    """
+    orderings = [
+        LEVEL_ORDERING[Level(token)]
+        for token in _LEVEL_TOKEN_RE.findall(class_level.upper())
+    ]
+    if not orderings:
+        return None
+
+    return min(orderings), max(orderings)
+
+
+def is_level_mismatch(registrant_level: str, class_level_range_: tuple[int, int] | None) -> bool:
+    if not registrant_level or class_level_range_ is None:
+        return False
+
+    low, high = class_level_range_
+    return not (low <= LEVEL_ORDERING[Level(registrant_level)] <= high)
+
+
+def get_placement_requests(
+    conclave_config: ConclaveRegistrationConfig,
+    classes: Iterable[Class],
+) -> list[PlacementRequest]:
+    """
+    Loads the class choices of every finalized registrant in
+    conclave_config, in the order they finalized their registration.
+    """
+    level_ranges = {class_.pk: class_level_range(class_.level) for class_ in classes}
+    choices_query = RegularProgramClassChoices.objects.filter(
+        registration_entry__conclave_config=conclave_config,
+        registration_entry__payment_info__stripe_payment_method_id__gt='',
+    ).select_related(
+        'registration_entry__self_rating'
+    ).order_by('registration_entry__payment_info__pk')
+
+    requests: list[PlacementRequest] = []
+    for choices in choices_query:
+        entry = choices.registration_entry
+        registrant_level = (
+            entry.self_rating.level if hasattr(entry, 'self_rating') else ''
+        )
+
+        if entry.program in FLEXIBLE_CLASS_SELECTION_PROGRAMS:
+            slot_fields = [[f'flex_choice{rank}_id' for rank in RANK_COSTS]]
+        else:
+            slot_fields = [
+                [f'period{period}_choice{rank}_id' for rank in RANK_COSTS]
+                for period in Period
+            ]
+
+        slots: list[list[PlacementChoice]] = []
+        for fields in slot_fields:
+            slot_choices: list[PlacementChoice] = []
+            for rank, field in enumerate(fields, start=1):
+                class_id = getattr(choices, field)
+                if class_id is None or class_id not in level_ranges:
+                    continue
+                slot_choices.append({
+                    'class_id': class_id,
+                    'rank': rank,
+                    'level_mismatch': is_level_mismatch(
+                        registrant_level, level_ranges[class_id]),
+                })
+            if slot_choices:
+                slots.append(slot_choices)
+
+        requests.append({'registration_entry_id': entry.pk, 'slots': slots})
+
+    return requests
+
+
+def place_registrants(
+    conclave_config: ConclaveRegistrationConfig,
+    *,
+    dry_run: bool = False,
+) -> list[ClassAssignment]:
+    """
+    Places every finalized registrant in conclave_config into classes
+    and, unless dry_run is True, replaces the ClassAssignments for
+    conclave_config with the result.
+    """
+    classes = {class_.pk: class_ for class_ in conclave_config.classes.all()}
+    requests = get_placement_requests(conclave_config, classes.values())
+    placements = solve_placement(
+        requests, {class_id: class_.capacity for class_id, class_ in classes.items()}
+    )
+
+    assignments = [
+        ClassAssignment(
+            registration_entry_id=placement['registration_entry_id'],
+            assigned_class=classes[placement['class_id']],
+            period=classes[placement['class_id']].period,
+            choice_rank=placement['rank'],
+            level_mismatch=placement['level_mismatch'],
+        )
+        for placement in placements
+    ]
+    if not dry_run:
+        with transaction.atomic():
+            ClassAssignment.objects.filter(
+                registration_entry__conclave_config=conclave_config
+            ).delete()
+            ClassAssignment.objects.bulk_create(assignments)
+
+    return assignments
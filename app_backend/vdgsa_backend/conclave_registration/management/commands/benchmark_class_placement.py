@@ -0,0 +1,98 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+
+from vdgsa_backend.conclave_registration.class_placement import (
+    PlacementChoice, PlacementRequest, solve_placement
+)
+
+
+def make_synthetic_registrations(
+    num_registrants: int,
+    classes_per_period: int,
+    *,
+    num_periods: int = 4,
+    flex_fraction: float = 0.15,
+    level_mismatch_fraction: float = 0.1,
+    seed: int = 0,
+) -> tuple[list[PlacementRequest], dict[int, int | None]]:
+    """
+    Generates placement requests and class capacities that resemble a
+    real Conclave: a few popular classes are oversubscribed, total
+    capacity per period is slightly more than demand, and some
+    registrants only want one class chosen from any period.
+    """
+    rng = random.Random(seed)
+    classes_by_period = [
+        list(range(period * classes_per_period, (period + 1) * classes_per_period))
+        for period in range(num_periods)
+    ]
+    all_classes = [class_id for classes in classes_by_period for class_id in classes]
+    # Zipf-like popularity so that demand is skewed toward a few classes.
+    popularity = {
+        class_id: 1 / (1 + rng.randrange(classes_per_period)) for class_id in all_classes
+    }
+
+    def pick_choices(class_ids: list[int]) -> list[PlacementChoice]:
+        chosen: list[int] = []
+        while len(chosen) < min(3, len(class_ids)):
+            [class_id] = rng.choices(class_ids, weights=[popularity[id_] for id_ in class_ids])
+            if class_id not in chosen:
+                chosen.append(class_id)
+        return [
+            {
+                'class_id': class_id,
+                'rank': rank,
+                'level_mismatch': rng.random() < level_mismatch_fraction,
+            }
+            for rank, class_id in enumerate(chosen, start=1)
+        ]
+
+    requests: list[PlacementRequest] = []
+    for entry_id in range(num_registrants):
+        if rng.random() < flex_fraction:
+            slots = [pick_choices(all_classes)]
+        else:
+            periods = rng.sample(range(num_periods), rng.choice([2, 3, 3, 4]))
+            slots = [pick_choices(classes_by_period[period]) for period in periods]
+        requests.append({'registration_entry_id': entry_id, 'slots': slots})
+
+    seats_per_class = max(1, round(num_registrants * 1.1 / classes_per_period))
+    capacities: dict[int, int | None] = {
+        class_id: rng.randint(seats_per_class // 2, seats_per_class * 3 // 2)
+        for class_id in all_classes
+    }
+    return requests, capacities
+
+
+class Command(BaseCommand):
+    help = 'Time the class placement solver on synthetic registrations.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--registrants', type=int, default=500)
+        parser.add_argument('--classes-per-period', type=int, default=12)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        requests, capacities = make_synthetic_registrations(
+            options['registrants'], options['classes_per_period'], seed=options['seed'])
+        num_slots = sum(len(request['slots']) for request in requests)
+        self.stdout.write(
+            f'{len(requests)} registrants, {num_slots} requested slots, '
+            f'{len(capacities)} classes'
+        )
+
+        timings = []
+        for _ in range(options['repeat']):
+            start = time.perf_counter()
+            placements = solve_placement(requests, capacities)
+            timings.append(time.perf_counter() - start)
+
+        num_first_choice = sum(placement['rank'] == 1 for placement in placements)
+        self.stdout.write(
+            f'Placed {len(placements)}/{num_slots} slots, {num_first_choice} in first choice')
+        self.stdout.write(self.style.SUCCESS(
+            f'min {min(timings):.3f}s, median {statistics.median(timings):.3f}s'))
@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vdgsa_backend.conclave_registration.models import ConclaveRegistrationConfig
+from vdgsa_backend.conclave_registration.year_rollover import clone_conclave_config
+
+
+class Command(BaseCommand):
+    help = "Start a new Conclave year by copying a prior year's settings and classes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source_year', type=int)
+        parser.add_argument('new_year', type=int)
+        parser.add_argument(
+            '--no-classes',
+            action='store_true',
+            help="Don't copy the source year's classes."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            source = ConclaveRegistrationConfig.objects.get(year=options['source_year'])
+        except ConclaveRegistrationConfig.DoesNotExist:
+            raise CommandError(f'No Conclave registration config for {options["source_year"]}')
+
+        if ConclaveRegistrationConfig.objects.filter(year=options['new_year']).exists():
+            raise CommandError(f'There is already a Conclave for {options["new_year"]}')
+
+        new_config = clone_conclave_config(
+            source, options['new_year'], include_classes=not options['no_classes'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Created Conclave {new_config.year} with '
+            f'{new_config.classes.count()} classes'))
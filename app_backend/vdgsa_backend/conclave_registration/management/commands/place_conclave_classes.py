@@ -0,0 +1,42 @@
+import collections
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from vdgsa_backend.conclave_registration.class_placement import place_registrants
+from vdgsa_backend.conclave_registration.models import ConclaveRegistrationConfig
+
+
+class Command(BaseCommand):
+    help = (
+        'Place finalized Conclave registrants into classes. '
+        'Replaces the existing class assignments for that year.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('year', type=int)
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Compute and report the placement without saving it.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            conclave_config = ConclaveRegistrationConfig.objects.get(year=options['year'])
+        except ConclaveRegistrationConfig.DoesNotExist:
+            raise CommandError(f'No Conclave registration config for {options["year"]}')
+
+        start = time.perf_counter()
+        assignments = place_registrants(conclave_config, dry_run=options['dry_run'])
+        elapsed = time.perf_counter() - start
+
+        by_rank = collections.Counter(assignment.choice_rank for assignment in assignments)
+        for rank, count in sorted(by_rank.items()):
+            self.stdout.write(f'Choice {rank}: {count}')
+        num_mismatched = sum(assignment.level_mismatch for assignment in assignments)
+        self.stdout.write(f'Outside self-rated level: {num_mismatched}')
+
+        verb = 'Computed' if options['dry_run'] else 'Saved'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(assignments)} class assignments in {elapsed:.2f}s'))
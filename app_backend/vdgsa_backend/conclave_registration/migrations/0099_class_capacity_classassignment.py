@@ -0,0 +1,34 @@
+# Generated by Django 3.2.25 on 2026-10-19 15:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conclave_registration', '0098_auto_20260313_1434'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='capacity',
+            field=models.PositiveIntegerField(blank=True, default=None, null=True),
+        ),
+        migrations.CreateModel(
+            name='ClassAssignment',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('period', models.IntegerField(choices=[(1, '1st Period'), (2, '2nd Period'), (3, '3rd Period'), (4, '4th Period')])),
+                ('choice_rank', models.IntegerField()),
+                ('level_mismatch', models.BooleanField(default=False)),
+                ('assigned_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='assignments', to='conclave_registration.class')),
+                ('registration_entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_assignments', to='conclave_registration.registrationentry')),
+            ],
+            options={
+                'unique_together': {('registration_entry', 'period')},
+            },
+        ),
+    ]
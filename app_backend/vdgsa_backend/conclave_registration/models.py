@@ -217,6 +217,10 @@ class Class(models.Model):
 
     is_freebie = models.BooleanField(blank=True, default=False)
 
+    # The maximum number of registrants that can be placed in the
+    # class. Leave blank for no limit.
+    capacity = models.PositiveIntegerField(null=True, blank=True, default=None)
+
     def clean(self):
         super().clean()
         if self.period != Period.fourth and self.is_freebie:
@@ -832,6 +836,34 @@ class RegularProgramClassChoices(models.Model):
         return count
 
 
+class ClassAssignment(models.Model):
+    """
+    The class a registrant was placed in for one period.
+    These are written in bulk by vdgsa_backend.conclave_registration.class_placement.
+    """
+    class Meta:
+        unique_together = ('registration_entry', 'period')
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    registration_entry = models.ForeignKey(
+        RegistrationEntry,
+        on_delete=models.CASCADE,
+        related_name='class_assignments',
+    )
+    assigned_class = models.ForeignKey(
+        Class,
+        on_delete=models.CASCADE,
+        related_name='assignments',
+    )
+    period = models.IntegerField(choices=Period.choices)
+    # 1, 2, or 3 for the registrant's 1st, 2nd, or 3rd choice.
+    choice_rank = models.IntegerField()
+    # True if the registrant's self-rated level is outside the
+    # class's level range.
+    level_mismatch = models.BooleanField(default=False)
+
+
 class AdvancedProjectsParticipationOptions(models.TextChoices):
     participate = 'participate', 'I would like to participate in other projects'
     propose_a_project = 'propose_a_project', 'I would like to propose a project'
@@ -0,0 +1,93 @@
+"""
+Signal handlers that keep cached data derived from registrations up
+to date.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Final
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.conclave_registration.models import (
+    AdditionalRegistrationInfo, ConclaveRegistrationConfig, PaymentInfo, RegistrationEntry,
+    RegistrationPhase
+)
+from vdgsa_backend.conclave_registration.whos_coming import (
+    invalidate_whos_coming, refresh_whos_coming
+)
+
+# User fields that are shown in the "who's coming" list.
+WHOS_COMING_USER_FIELDS: Final = {'first_name', 'last_name', 'address_city', 'address_country'}
+
+
+def _schedule_whos_coming_refresh(conclave_config_pk: int) -> None:
+    def refresh() -> None:
+        conclave_config = ConclaveRegistrationConfig.objects.filter(pk=conclave_config_pk).first()
+        if conclave_config is None or conclave_config.phase == RegistrationPhase.unpublished:
+            invalidate_whos_coming(conclave_config_pk)
+        else:
+            refresh_whos_coming(conclave_config)
+
+    transaction.on_commit(refresh)
+
+
+@receiver(post_save, sender=ConclaveRegistrationConfig)
+def on_conclave_config_saved(
+    sender: Any, instance: ConclaveRegistrationConfig, **kwargs: Any
+) -> None:
+    _schedule_whos_coming_refresh(instance.pk)
+
+
+@receiver(post_delete, sender=RegistrationEntry)
+def on_registration_entry_deleted(
+    sender: Any, instance: RegistrationEntry, **kwargs: Any
+) -> None:
+    _schedule_whos_coming_refresh(instance.conclave_config_id)
+
+
+@receiver(post_save, sender=PaymentInfo)
+def on_payment_info_saved(sender: Any, instance: PaymentInfo, **kwargs: Any) -> None:
+    # Saving the payment method is what finalizes a registration.
+    conclave_config_pk = RegistrationEntry.objects.filter(
+        pk=instance.registration_entry_id  # type: ignore
+    ).values_list('conclave_config_id', flat=True).first()
+    if conclave_config_pk is not None:
+        _schedule_whos_coming_refresh(conclave_config_pk)
+
+
+@receiver(post_save, sender=RegistrationEntry)
+@receiver(post_save, sender=AdditionalRegistrationInfo)
+def on_registration_edited(
+    sender: Any, instance: RegistrationEntry | AdditionalRegistrationInfo, **kwargs: Any
+) -> None:
+    # Registrations that are still in progress aren't in the list.
+    if isinstance(instance, RegistrationEntry):
+        entry_pk = instance.pk
+    else:
+        entry_pk = instance.registration_entry_id  # type: ignore
+    conclave_config_pk = RegistrationEntry.objects.filter(
+        pk=entry_pk,
+        payment_info__stripe_payment_method_id__gt='',
+    ).values_list('conclave_config_id', flat=True).first()
+    if conclave_config_pk is not None:
+        _schedule_whos_coming_refresh(conclave_config_pk)
+
+
+@receiver(post_save, sender=User)
+def on_user_saved(
+    sender: Any, instance: User, update_fields: frozenset[str] | None = None, **kwargs: Any
+) -> None:
+    # Skip saves like the last_login update on every login.
+    if update_fields is not None and not (update_fields & WHOS_COMING_USER_FIELDS):
+        return
+
+    conclave_config_pks = RegistrationEntry.objects.filter(
+        user=instance,
+        payment_info__stripe_payment_method_id__gt='',
+    ).values_list('conclave_config_id', flat=True).distinct()
+    for conclave_config_pk in conclave_config_pks:
+        _schedule_whos_coming_refresh(conclave_config_pk)
@@ -0,0 +1,170 @@
+import collections
+
+from django.test.testcases import SimpleTestCase, TestCase
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.conclave_registration.class_placement import (
+    PlacementRequest, class_level_range, place_registrants, solve_placement
+)
+from vdgsa_backend.conclave_registration.management.commands.benchmark_class_placement import (
+    make_synthetic_registrations
+)
+from vdgsa_backend.conclave_registration.models import (
+    LEVEL_ORDERING, Class, ClassAssignment, ConclaveRegistrationConfig, Level, PaymentInfo, Period,
+    Program, RegistrationEntry, RegularProgramClassChoices, SelfRatingInfo
+)
+
+
+def _request(entry_id: int, *slots: list[int]) -> PlacementRequest:
+    return {
+        'registration_entry_id': entry_id,
+        'slots': [
+            [
+                {'class_id': class_id, 'rank': rank, 'level_mismatch': False}
+                for rank, class_id in enumerate(class_ids, start=1)
+            ]
+            for class_ids in slots
+        ]
+    }
+
+
+class SolvePlacementTestCase(SimpleTestCase):
+    def test_places_everyone_when_greedy_would_not(self) -> None:
+        # Placing entry 1 in its first choice would leave entry 2 unplaced.
+        placements = solve_placement(
+            [_request(1, [10, 11]), _request(2, [10])],
+            {10: 1, 11: None}
+        )
+        self.assertCountEqual(
+            [(1, 11, 2), (2, 10, 1)],
+            [(p['registration_entry_id'], p['class_id'], p['rank']) for p in placements]
+        )
+
+    def test_maximizes_first_choices(self) -> None:
+        placements = solve_placement(
+            [_request(1, [10, 11]), _request(2, [11, 10]), _request(3, [10, 11])],
+            {10: 2, 11: 1}
+        )
+        self.assertEqual(
+            [1, 1, 1], sorted(placement['rank'] for placement in placements))
+
+    def test_prefers_matching_level(self) -> None:
+        request = _request(1, [10, 11])
+        request['slots'][0][0]['level_mismatch'] = True
+        [placement] = solve_placement([request], {10: None, 11: None})
+        self.assertEqual(11, placement['class_id'])
+
+    def test_one_class_per_slot(self) -> None:
+        placements = solve_placement(
+            [_request(1, [10, 11, 12], [20, 21])],
+            {10: None, 11: None, 12: None, 20: None, 21: None}
+        )
+        self.assertCountEqual([10, 20], [placement['class_id'] for placement in placements])
+
+    def test_respects_capacity_synthetic(self) -> None:
+        requests, capacities = make_synthetic_registrations(300, 8, seed=42)
+        placements = solve_placement(requests, capacities)
+        per_class = collections.Counter(placement['class_id'] for placement in placements)
+        for class_id, count in per_class.items():
+            self.assertLessEqual(count, capacities[class_id])
+
+        per_entry = collections.Counter(
+            placement['registration_entry_id'] for placement in placements)
+        for request in requests:
+            self.assertLessEqual(
+                per_entry[request['registration_entry_id']], len(request['slots']))
+
+
+class ClassLevelRangeTestCase(SimpleTestCase):
+    def test_class_level_range(self) -> None:
+        self.assertEqual(
+            (LEVEL_ORDERING[Level.lower_intermediate], LEVEL_ORDERING[Level.intermediate]),
+            class_level_range('LI-I')
+        )
+        self.assertEqual(
+            (LEVEL_ORDERING[Level.upper_intermediate_plus], LEVEL_ORDERING[Level.advanced]),
+            class_level_range('UI+/A')
+        )
+        self.assertEqual(
+            (LEVEL_ORDERING[Level.beginner_plus], LEVEL_ORDERING[Level.beginner_plus]),
+            class_level_range('B+')
+        )
+        self.assertIsNone(class_level_range('Any'))
+        self.assertIsNone(class_level_range('All levels'))
+
+
+class PlaceRegistrantsTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.conclave_config = ConclaveRegistrationConfig.objects.create(year=2019)
+        self.period1_class1 = self._make_class('Class 1', Period.first, 'LI-I', capacity=1)
+        self.period1_class2 = self._make_class('Class 2', Period.first, 'UI-A')
+        self.period2_class = self._make_class('Class 3', Period.second, 'Any')
+
+    def _make_class(
+        self, name: str, period: Period, level: str, capacity: int | None = None
+    ) -> Class:
+        return Class.objects.create(
+            conclave_config=self.conclave_config, name=name, period=period, level=level,
+            instructor='Steve', description='Wee', capacity=capacity)
+
+    def _make_entry(
+        self, username: str, program: Program, *, finalized: bool = True, level: str = '',
+        **choices: Class
+    ) -> RegistrationEntry:
+        entry = RegistrationEntry.objects.create(
+            conclave_config=self.conclave_config,
+            user=User.objects.create_user(username),
+            program=program)
+        PaymentInfo.objects.create(
+            registration_entry=entry,
+            stripe_payment_method_id='pm_wee' if finalized else '')
+        if level:
+            SelfRatingInfo.objects.create(registration_entry=entry, level=level)
+        RegularProgramClassChoices.objects.create(registration_entry=entry, **choices)
+        return entry
+
+    def test_place_registrants(self) -> None:
+        regular = self._make_entry(
+            'regular@user.com', Program.regular, level=Level.upper_intermediate,
+            period1_choice1=self.period1_class1, period1_choice2=self.period1_class2,
+            period2_choice1=self.period2_class)
+        # Gets period1_class1 because it's outside "regular"'s level,
+        # even though they both picked it first.
+        other_regular = self._make_entry(
+            'other@user.com', Program.regular, level=Level.lower_intermediate,
+            period1_choice1=self.period1_class1, period1_choice2=self.period1_class2)
+        part_time = self._make_entry(
+            'part_time@user.com', Program.part_time,
+            flex_choice1=self.period2_class, flex_choice2=self.period1_class2)
+        self._make_entry(
+            'unfinalized@user.com', Program.regular, finalized=False,
+            period1_choice1=self.period1_class1)
+
+        place_registrants(self.conclave_config)
+
+        assignments = {
+            (assignment.registration_entry_id, assignment.period): assignment
+            for assignment in ClassAssignment.objects.all()
+        }
+        self.assertEqual(4, len(assignments))
+
+        self.assertEqual(self.period1_class2, assignments[regular.pk, Period.first].assigned_class)
+        self.assertEqual(2, assignments[regular.pk, Period.first].choice_rank)
+        self.assertFalse(assignments[regular.pk, Period.first].level_mismatch)
+        self.assertEqual(self.period2_class, assignments[regular.pk, Period.second].assigned_class)
+        self.assertEqual(
+            self.period1_class1, assignments[other_regular.pk, Period.first].assigned_class)
+        self.assertEqual(
+            self.period2_class, assignments[part_time.pk, Period.second].assigned_class)
+
+        # Re-running replaces the previous assignments.
+        place_registrants(self.conclave_config)
+        self.assertEqual(4, ClassAssignment.objects.count())
+
+    def test_dry_run(self) -> None:
+        self._make_entry(
+            'regular@user.com', Program.regular, period1_choice1=self.period1_class1)
+        assignments = place_registrants(self.conclave_config, dry_run=True)
+        self.assertEqual(1, len(assignments))
+        self.assertEqual(0, ClassAssignment.objects.count())
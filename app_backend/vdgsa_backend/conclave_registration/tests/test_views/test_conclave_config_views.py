@@ -0,0 +1,380 @@
+import csv
+import io
+from datetime import date
+
+from django.contrib.auth.models import Permission
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.testcases import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import MembershipSubscription, MembershipType, User
+from vdgsa_backend.conclave_registration.class_csv_import import (
+    ClassImportResult, import_classes_csv
+)
+from vdgsa_backend.conclave_registration.class_demand import NO_LEVEL, get_class_demand
+from vdgsa_backend.conclave_registration.models import (
+    Class, Clef, ConclaveRegistrationConfig, InstrumentBringing, InstrumentChoices,
+    InstrumentPurpose, Level, PaymentInfo, Period, Program, RegistrationEntry, RegistrationPhase,
+    RegularProgramClassChoices, RelativeInstrumentLevel, SelfRatingInfo
+)
+from vdgsa_backend.conclave_registration.year_rollover import clone_conclave_config, shift_to_year
+from vdgsa_backend.query_budget import QueryBudgetTestMixin
+
+
+class ClassDemandTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.conclave_config = ConclaveRegistrationConfig.objects.create(
+            year=2019, phase=RegistrationPhase.open
+        )
+        self.class1 = Class.objects.create(
+            conclave_config=self.conclave_config, name='Class 1', period=Period.first,
+            level='LI', instructor='Steve', description='Wee')
+        self.class2 = Class.objects.create(
+            conclave_config=self.conclave_config, name='Class 2', period=Period.first,
+            level='I', instructor='Stove', description='Woo')
+        self.class3 = Class.objects.create(
+            conclave_config=self.conclave_config, name='Class 3', period=Period.third,
+            level='A', instructor='Stave', description='Waa')
+        self.unchosen_class = Class.objects.create(
+            conclave_config=self.conclave_config, name='Class 4', period=Period.fourth,
+            level='Any', instructor='Stuve', description='Wuu')
+
+        # Finalized, rated LI
+        self._make_entry(
+            'user1@user.com', finalized=True, level=Level.lower_intermediate,
+            period1_choice1=self.class1, period1_choice2=self.class2,
+            period3_choice1=self.class3)
+        # Not finalized, rated LI
+        self._make_entry(
+            'user2@user.com', finalized=False, level=Level.lower_intermediate,
+            period1_choice1=self.class2, period1_choice3=self.class1)
+        # Finalized, no self rating, class picked as a flex choice
+        self._make_entry('user3@user.com', finalized=True, flex_choice2=self.class1)
+
+        # Choices for another year's config shouldn't be counted.
+        other_config = ConclaveRegistrationConfig.objects.create(year=2020)
+        other_entry = RegistrationEntry.objects.create(
+            conclave_config=other_config,
+            user=User.objects.create_user('other@user.com'),
+            program=Program.regular)
+        RegularProgramClassChoices.objects.create(
+            registration_entry=other_entry, period1_choice1=self.class1)
+
+        self.conclave_team = User.objects.create_user(
+            username='boardo@wee.com', password='password'
+        )
+        self.conclave_team.user_permissions.add(
+            Permission.objects.get(codename='conclave_team')
+        )
+        MembershipSubscription.objects.create(
+            owner=self.conclave_team, membership_type=MembershipType.lifetime)
+
+    def _make_entry(
+        self, username: str, *, finalized: bool, level: str = '', **choices: Class
+    ) -> RegistrationEntry:
+        entry = RegistrationEntry.objects.create(
+            conclave_config=self.conclave_config,
+            user=User.objects.create_user(username),
+            program=Program.regular)
+        PaymentInfo.objects.create(
+            registration_entry=entry,
+            stripe_payment_method_id='pm_wee' if finalized else '')
+        if level:
+            SelfRatingInfo.objects.create(registration_entry=entry, level=level)
+        RegularProgramClassChoices.objects.create(registration_entry=entry, **choices)
+        return entry
+
+    def test_get_class_demand(self) -> None:
+        with self.assertNumQueries(1):
+            demand = get_class_demand(self.conclave_config)
+
+        self.assertEqual(
+            [self.class1.pk, self.class2.pk, self.class3.pk, self.unchosen_class.pk],
+            [class_['class_id'] for class_ in demand]
+        )
+        class1, class2, class3, unchosen_class = demand
+
+        self.assertEqual({1: 1, 2: 1, 3: 1}, class1['by_rank'])
+        self.assertEqual({1: 1, 2: 1, 3: 0}, class1['finalized_by_rank'])
+        self.assertEqual({Level.lower_intermediate: 2, NO_LEVEL: 1}, class1['by_level'])
+        self.assertEqual(3, class1['total'])
+        self.assertEqual(2, class1['finalized_total'])
+
+        self.assertEqual({1: 1, 2: 1, 3: 0}, class2['by_rank'])
+        self.assertEqual({1: 0, 2: 1, 3: 0}, class2['finalized_by_rank'])
+
+        self.assertEqual({1: 1, 2: 0, 3: 0}, class3['by_rank'])
+        self.assertEqual({1: 1, 2: 0, 3: 0}, class3['finalized_by_rank'])
+
+        self.assertEqual({1: 0, 2: 0, 3: 0}, unchosen_class['by_rank'])
+        self.assertEqual({}, unchosen_class['by_level'])
+        self.assertEqual(0, unchosen_class['total'])
+
+    def test_class_demand_views(self) -> None:
+        self.client.force_login(self.conclave_team)
+        url_kwargs = {'conclave_config_pk': self.conclave_config.pk}
+
+        response = self.client.get(reverse('class-demand', kwargs=url_kwargs))
+        self.assertEqual(200, response.status_code)
+        self.assertContains(response, 'Class 4')
+
+        response = self.client.get(reverse('class-demand-json', kwargs=url_kwargs))
+        self.assertEqual(200, response.status_code)
+        data = response.json()
+        self.assertEqual(2019, data['year'])
+        self.assertEqual(3, data['classes'][0]['total'])
+
+        response = self.client.get(reverse('download-class-demand', kwargs=url_kwargs))
+        self.assertEqual(200, response.status_code)
+        rows = list(csv.reader(response.content.decode().splitlines()))
+        self.assertEqual(5, len(rows))
+        self.assertEqual('Class 1', rows[1][1])
+
+    def test_class_demand_views_permission_denied(self) -> None:
+        user = User.objects.create_user('nope@user.com')
+        self.client.force_login(user)
+        url_kwargs = {'conclave_config_pk': self.conclave_config.pk}
+        for url_name in ['class-demand', 'class-demand-json', 'download-class-demand']:
+            response = self.client.get(reverse(url_name, kwargs=url_kwargs))
+            self.assertEqual(403, response.status_code)
+
+
+class RegistrationEntriesCSVTestCase(QueryBudgetTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.conclave_config = ConclaveRegistrationConfig.objects.create(
+            year=2019, phase=RegistrationPhase.open)
+        self.class1 = Class.objects.create(
+            conclave_config=self.conclave_config, name='Class 1', period=Period.first,
+            level='LI', instructor='Steve', description='Wee')
+        self.class2 = Class.objects.create(
+            conclave_config=self.conclave_config, name='Class 2', period=Period.second,
+            level='I', instructor='Stove', description='Woo')
+        for i in range(5):
+            entry = RegistrationEntry.objects.create(
+                conclave_config=self.conclave_config,
+                user=User.objects.create_user(f'user{i}@user.com', last_name=f'Last {i}'),
+                program=Program.regular)
+            PaymentInfo.objects.create(registration_entry=entry, stripe_payment_method_id='pm_wee')
+            SelfRatingInfo.objects.create(registration_entry=entry, level=Level.intermediate)
+            InstrumentBringing.objects.create(
+                registration_entry=entry, size=InstrumentChoices.treble,
+                relative_level=RelativeInstrumentLevel.at_level, clefs=[Clef.treble],
+                purpose=InstrumentPurpose.bringing_for_self)
+            RegularProgramClassChoices.objects.create(
+                registration_entry=entry, period1_choice1=self.class1,
+                period2_choice1=self.class2)
+
+        self.conclave_team = User.objects.create_user('boardo@wee.com')
+        self.conclave_team.user_permissions.add(Permission.objects.get(codename='conclave_team'))
+
+    def test_registration_entries_csv(self) -> None:
+        self.client.force_login(self.conclave_team)
+        url = reverse(
+            'download-registration-entries',
+            kwargs={'conclave_config_pk': self.conclave_config.pk})
+        with self.assertQueryBudget(7):
+            response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        rows = list(csv.DictReader(response.content.decode().splitlines()))
+        self.assertEqual(5, len(rows))
+        self.assertEqual('user0@user.com', rows[0]['email'])
+        self.assertEqual(str(self.class1), rows[0]['period1_choice1'])
+        self.assertEqual(str(self.class2), rows[0]['period2_choice1'])
+
+
+_CLASS_CSV_HEADER = (
+    'Title,Period,Level,Teacher,Description,Notes,offer_to_beginners,is_freebie,Capacity\n'
+)
+
+
+class ClassCSVImportTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.conclave_config = ConclaveRegistrationConfig.objects.create(year=2019)
+        self.kept_class = Class.objects.create(
+            conclave_config=self.conclave_config, name='Kept', period=Period.first,
+            level='LI', instructor='Steve', description='Wee')
+        self.removed_class = Class.objects.create(
+            conclave_config=self.conclave_config, name='Removed', period=Period.second,
+            level='LI', instructor='Steve', description='Wee')
+
+        entry = RegistrationEntry.objects.create(
+            conclave_config=self.conclave_config,
+            user=User.objects.create_user('user@user.com'),
+            program=Program.regular)
+        self.choices = RegularProgramClassChoices.objects.create(
+            registration_entry=entry, period1_choice1=self.kept_class)
+
+    def _import(self, csv_rows: str, dry_run: bool = False) -> ClassImportResult:
+        return import_classes_csv(
+            self.conclave_config, io.StringIO(_CLASS_CSV_HEADER + csv_rows), dry_run=dry_run)
+
+    def test_import_upserts_classes(self) -> None:
+        result = self._import(
+            'New,3,UI,Stove,Woo,,true,false,\n'
+            'Kept,1,I,Stave,Waa,Some notes,false,false,12\n'
+        )
+        self.assertEqual([], result['errors'])
+        self.assertEqual(['New'], [class_.name for class_ in result['created']])
+        self.assertEqual(['Kept'], [class_.name for class_ in result['updated']])
+        self.assertEqual([self.removed_class], result['deleted'])
+
+        self.assertEqual(
+            ['New', 'Kept'],
+            [class_.name for class_ in self.conclave_config.classes.all()]
+        )
+        self.kept_class.refresh_from_db()
+        self.assertEqual('I', self.kept_class.level)
+        self.assertEqual('Stave', self.kept_class.instructor)
+        self.assertEqual(12, self.kept_class.capacity)
+        self.assertFalse(Class.objects.filter(pk=self.removed_class.pk).exists())
+
+        # Choices for classes that are kept shouldn't be cleared.
+        self.choices.refresh_from_db()
+        self.assertEqual(self.kept_class, self.choices.period1_choice1)
+
+    def test_num_queries_does_not_grow_with_file(self) -> None:
+        def num_import_queries(num_classes: int) -> int:
+            self.conclave_config.classes.all().delete()
+            with CaptureQueriesContext(connection) as queries:
+                result = self._import(''.join(
+                    f'Class {i},{i % 4 + 1},LI,Steve,Wee,,false,false,\n'
+                    for i in range(num_classes)
+                ))
+            self.assertEqual([], result['errors'])
+            return len(queries)
+
+        self.assertEqual(num_import_queries(5), num_import_queries(50))
+
+    def test_dry_run(self) -> None:
+        result = self._import('New,3,UI,Stove,Woo,,true,false,\n', dry_run=True)
+        self.assertEqual([], result['errors'])
+        self.assertEqual(1, len(result['created']))
+        self.assertEqual(2, len(result['deleted']))
+        self.assertEqual(2, self.conclave_config.classes.count())
+
+    def test_validation_errors(self) -> None:
+        result = self._import(
+            'Fine,1,LI,Steve,Wee,,false,false,\n'
+            'Bad period,7,LI,Steve,Wee,,false,false,\n'
+            'Freebie,2,LI,Steve,Wee,,false,true,\n'
+            'Fine,1,LI,Steve,Wee,,false,false,\n'
+            'Bad capacity,1,LI,Steve,Wee,,false,false,lots\n'
+            'No description,1,LI,Steve,,,false,false,\n'
+        )
+        self.assertEqual([3, 4, 5, 6, 7], [error['row_num'] for error in result['errors']])
+        self.assertIn('Freebie classes must be in 4th period', result['errors'][1]['messages'][0])
+        self.assertIn('line 2', result['errors'][2]['messages'][0])
+
+        self.assertEqual(
+            ['Kept', 'Removed'],
+            [class_.name for class_ in self.conclave_config.classes.all()]
+        )
+
+    def test_missing_columns(self) -> None:
+        result = import_classes_csv(self.conclave_config, io.StringIO('Title,Period\n'))
+        self.assertEqual(1, len(result['errors']))
+        self.assertIn('Level', result['errors'][0]['messages'][0])
+
+    def test_upload_view(self) -> None:
+        conclave_team = User.objects.create_user(username='boardo@wee.com')
+        conclave_team.user_permissions.add(Permission.objects.get(codename='conclave_team'))
+        self.client.force_login(conclave_team)
+        url = reverse('class-csv-upload', kwargs={'conclave_config_pk': self.conclave_config.pk})
+
+        response = self.client.post(url, {
+            'class_csv': SimpleUploadedFile(
+                'classes.csv', (_CLASS_CSV_HEADER + 'Bad,9,LI,S,W,,false,false,\n').encode()),
+        })
+        self.assertEqual(400, response.status_code)
+        self.assertContains(response, 'Line 2', status_code=400)
+
+        response = self.client.post(url, {
+            'class_csv': SimpleUploadedFile(
+                'classes.csv', (_CLASS_CSV_HEADER + 'New,3,UI,S,W,,false,false,\n').encode()),
+            'dry_run': 'on',
+        })
+        self.assertEqual(200, response.status_code)
+        self.assertContains(response, 'Delete 2 class(es)')
+        self.assertEqual(2, self.conclave_config.classes.count())
+
+        response = self.client.post(url, {
+            'class_csv': SimpleUploadedFile(
+                'classes.csv', (_CLASS_CSV_HEADER + 'New,3,UI,S,W,,false,false,\n').encode()),
+        })
+        self.assertRedirects(
+            response, reverse('conclave-detail', kwargs={'pk': self.conclave_config.pk}))
+        self.assertEqual(
+            ['New'], [class_.name for class_ in self.conclave_config.classes.all()])
+
+
+class CloneConclaveConfigTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.conclave_config = ConclaveRegistrationConfig.objects.create(
+            year=2024,
+            phase=RegistrationPhase.closed,
+            landing_page_markdown='Welcome!',
+            regular_tuition=500,
+            early_arrival_date_options='Saturday July 13',
+            arrival_date_options='Sunday July 14\nMonday July 15',
+            departure_date_options='Sunday July 21',
+        )
+        for period in Period:
+            for i in range(3):
+                Class.objects.create(
+                    conclave_config=self.conclave_config, name=f'Class {i}', period=period,
+                    level='LI', instructor='Steve', description='Wee', capacity=i or None)
+
+    def test_shift_to_year(self) -> None:
+        self.assertEqual(date(2025, 7, 13), shift_to_year(date(2024, 7, 14), 2025))
+        self.assertEqual(date(2026, 7, 12), shift_to_year(date(2024, 7, 14), 2026))
+        self.assertEqual(date(2030, 7, 14), shift_to_year(date(2024, 7, 14), 2030))
+
+    def test_clone(self) -> None:
+        with self.assertNumQueries(5):
+            new_config = clone_conclave_config(self.conclave_config, 2025)
+
+        self.assertEqual(2025, new_config.year)
+        self.assertEqual(RegistrationPhase.unpublished, new_config.phase)
+        self.assertEqual('Welcome!', new_config.landing_page_markdown)
+        self.assertEqual(500, new_config.regular_tuition)
+        self.assertEqual('Saturday July 12', new_config.early_arrival_date_options)
+        self.assertEqual('Sunday July 13\nMonday July 14', new_config.arrival_date_options)
+        self.assertEqual('Sunday July 20', new_config.departure_date_options)
+        self.assertEqual(
+            [date(2025, 7, 13), date(2025, 7, 14)], new_config.arrival_dates)
+
+        old_classes = list(self.conclave_config.classes.all())
+        new_classes = list(new_config.classes.all())
+        self.assertEqual(12, len(new_classes))
+        self.assertEqual(
+            [(c.name, c.period, c.capacity) for c in old_classes],
+            [(c.name, c.period, c.capacity) for c in new_classes]
+        )
+        self.assertEqual(12, self.conclave_config.classes.count())
+
+    def test_clone_without_classes(self) -> None:
+        new_config = clone_conclave_config(self.conclave_config, 2025, include_classes=False)
+        self.assertEqual(0, new_config.classes.count())
+
+    def test_clone_view(self) -> None:
+        conclave_team = User.objects.create_user(username='boardo@wee.com')
+        conclave_team.user_permissions.add(Permission.objects.get(codename='conclave_team'))
+        self.client.force_login(conclave_team)
+        url = reverse('clone-conclave', kwargs={'conclave_config_pk': self.conclave_config.pk})
+
+        response = self.client.get(url)
+        self.assertContains(response, 'value="2025"')
+
+        response = self.client.post(url, {'new_year': 2024, 'include_classes': 'on'})
+        self.assertContains(response, 'There is already a Conclave for 2024')
+
+        response = self.client.post(url, {'new_year': 2025, 'include_classes': 'on'})
+        new_config = ConclaveRegistrationConfig.objects.get(year=2025)
+        self.assertRedirects(response, reverse('conclave-detail', kwargs={'pk': new_config.pk}))
+        self.assertEqual(12, new_config.classes.count())
@@ -0,0 +1,66 @@
+import os
+import tempfile
+
+from django.contrib.auth.models import Permission
+from django.test import override_settings
+from django.test.testcases import TestCase
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.conclave_registration.models import (
+    AdditionalRegistrationInfo, ConclaveRegistrationConfig, Program, RegistrationEntry,
+    RegistrationPhase, YesNo
+)
+
+
+class RegistrationPhotoViewTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root.name, PROTECTED_FILE_OFFLOAD=None)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        os.mkdir(os.path.join(media_root.name, 'photos'))
+        with open(os.path.join(media_root.name, 'photos', 'me.png'), 'wb') as f:
+            f.write(b'not really a png')
+
+        self.conclave_config = ConclaveRegistrationConfig.objects.create(
+            year=2019, phase=RegistrationPhase.open)
+        self.registrant = User.objects.create_user('registrant@wee.com')
+        self.entry = RegistrationEntry.objects.create(
+            conclave_config=self.conclave_config, user=self.registrant, program=Program.regular)
+        AdditionalRegistrationInfo.objects.create(
+            registration_entry=self.entry,
+            wants_display_space=YesNo.no,
+            photo_release_auth=YesNo.yes,
+            liability_release=True,
+            covid_policy=True,
+        )
+        # Bypass save(), which re-encodes the image.
+        AdditionalRegistrationInfo.objects.filter(registration_entry=self.entry).update(
+            user_image_file_name='photos/me.png')
+        self.url = reverse(
+            'conclave-registration-photo', kwargs={'conclave_reg_pk': self.entry.pk})
+
+    def test_registrant_can_view(self) -> None:
+        self.client.force_login(self.registrant)
+        response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b'not really a png', response.getvalue())
+        self.assertEqual('image/png', response['Content-Type'])
+
+        not_modified = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(304, not_modified.status_code)
+
+    def test_conclave_team_can_view(self) -> None:
+        conclave_team = User.objects.create_user('team@wee.com')
+        conclave_team.user_permissions.add(Permission.objects.get(codename='conclave_team'))
+        self.client.force_login(conclave_team)
+        self.assertEqual(200, self.client.get(self.url).status_code)
+
+    def test_other_user_forbidden(self) -> None:
+        self.client.force_login(User.objects.create_user('rando@wee.com'))
+        self.assertEqual(403, self.client.get(self.url).status_code)
@@ -0,0 +1,130 @@
+from django.core.cache import cache
+from django.test.testcases import TestCase
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.conclave_registration.models import (
+    AdditionalRegistrationInfo, ConclaveRegistrationConfig, PaymentInfo, Program,
+    RegistrationEntry, RegistrationPhase, YesNo
+)
+
+
+class WhosComingTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.conclave_config = ConclaveRegistrationConfig.objects.create(
+            year=2019, phase=RegistrationPhase.open
+        )
+        self.opted_in = self._make_entry(
+            'Lonk', 'Zeldo', Program.regular, opt_in=True, finalized=True, nickname='Link')
+        self._make_entry('Mario', 'Mario', Program.part_time, opt_in=False, finalized=True)
+        self.in_progress = self._make_entry(
+            'Sanic', 'Hedgehog', Program.regular, opt_in=True, finalized=False)
+
+        self.json_url = reverse(
+            'whos-coming-json', kwargs={'conclave_config_pk': self.conclave_config.pk})
+
+    def _make_entry(
+        self, first_name: str, last_name: str, program: Program, *,
+        opt_in: bool, finalized: bool, nickname: str = ''
+    ) -> RegistrationEntry:
+        user = User.objects.create_user(
+            f'{first_name}@{last_name}.com', first_name=first_name, last_name=last_name,
+            address_city='Castle', address_country='Hyrule')
+        entry = RegistrationEntry.objects.create(
+            conclave_config=self.conclave_config, user=user, program=program)
+        AdditionalRegistrationInfo.objects.create(
+            registration_entry=entry,
+            nickname=nickname,
+            include_in_whos_coming_to_conclave_list=YesNo.yes if opt_in else YesNo.no,
+            wants_display_space=YesNo.no,
+            photo_release_auth=YesNo.yes,
+            liability_release=True,
+            covid_policy=True,
+        )
+        PaymentInfo.objects.create(
+            registration_entry=entry,
+            stripe_payment_method_id='pm_wee' if finalized else '')
+        return entry
+
+    def test_json(self) -> None:
+        response = self.client.get(self.json_url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {
+                'year': 2019,
+                'attendees': [{
+                    'first_name': 'Lonk',
+                    'last_name': 'Zeldo',
+                    'nickname': 'Link',
+                    'city': 'Castle',
+                    'country': 'Hyrule',
+                }],
+                'program_counts': [
+                    {'program': 'regular', 'label': Program.regular.label, 'count': 1},
+                    {'program': 'part_time', 'label': Program.part_time.label, 'count': 1},
+                ],
+                'total': 2,
+            },
+            response.json()
+        )
+        self.assertIn('public', response['Cache-Control'])
+
+        # Served from the cache from now on.
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.json_url)
+        self.assertEqual(response.content, cached_response.content)
+
+        with self.assertNumQueries(0):
+            not_modified = self.client.get(
+                self.json_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(304, not_modified.status_code)
+
+    def test_refreshed_when_registration_finalized(self) -> None:
+        etag = self.client.get(self.json_url)['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.in_progress.payment_info.stripe_payment_method_id = 'pm_woo'
+            self.in_progress.payment_info.save()
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.json_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            ['Sanic', 'Lonk'],
+            [attendee['first_name'] for attendee in response.json()['attendees']]
+        )
+
+    def test_refreshed_when_opt_in_edited(self) -> None:
+        self.client.get(self.json_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.opted_in.additional_info.include_in_whos_coming_to_conclave_list = YesNo.no
+            self.opted_in.additional_info.save()
+
+        self.assertEqual([], self.client.get(self.json_url).json()['attendees'])
+
+    def test_refreshed_when_name_edited(self) -> None:
+        self.client.get(self.json_url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.opted_in.user.first_name = 'Link'
+            self.opted_in.user.save()
+
+        self.assertEqual(
+            'Link', self.client.get(self.json_url).json()['attendees'][0]['first_name'])
+
+    def test_html(self) -> None:
+        response = self.client.get(
+            reverse('whos-coming', kwargs={'conclave_config_pk': self.conclave_config.pk}))
+        self.assertContains(response, 'Lonk Zeldo')
+        self.assertNotContains(response, 'Sanic')
+        self.assertNotIn('X-Frame-Options', response)
+
+    def test_unpublished_not_found(self) -> None:
+        with self.captureOnCommitCallbacks(execute=True):
+            self.conclave_config.phase = RegistrationPhase.unpublished
+            self.conclave_config.save()
+
+        self.assertEqual(404, self.client.get(self.json_url).status_code)
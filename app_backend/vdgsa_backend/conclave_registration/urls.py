@@ -8,6 +8,9 @@ urlpatterns = [
          name='create-conclave'),
     path('admin/<int:pk>/settings/', views.EditConclaveRegistrationConfigView.as_view(),
          name='edit-conclave'),
+    path('admin/<int:conclave_config_pk>/clone/',
+         views.CloneConclaveRegistrationConfigView.as_view(),
+         name='clone-conclave'),
     path('admin/<int:conclave_config_pk>/registration_entries/csv/',
          views.DownloadRegistrationEntriesCSVView.as_view(),
          name='download-registration-entries'),
@@ -17,6 +20,15 @@ urlpatterns = [
     path('admin/<int:conclave_config_pk>/class_first_choices/csv/',
          views.DownloadFirstClassChoicesCSVView.as_view(),
          name='download-class-first-choices'),
+    path('admin/<int:conclave_config_pk>/class_demand/',
+         views.ClassDemandView.as_view(),
+         name='class-demand'),
+    path('admin/<int:conclave_config_pk>/class_demand/csv/',
+         views.DownloadClassDemandCSVView.as_view(),
+         name='download-class-demand'),
+    path('admin/<int:conclave_config_pk>/class_demand/json/',
+         views.ClassDemandJSONView.as_view(),
+         name='class-demand-json'),
     path('admin/<int:conclave_config_pk>/registration_photos/',
          views.RegistrationPhotosView.as_view(),
          name='registration-photos'),
@@ -57,12 +69,19 @@ urlpatterns = [
          name='conclave-payment'),
     path('register/<int:conclave_reg_pk>/done/', views.RegistrationDoneView.as_view(),
          name='conclave-done'),
+    path('register/<int:conclave_reg_pk>/photo/', views.RegistrationPhotoView.as_view(),
+         name='conclave-registration-photo'),
     path('register/<int:conclave_reg_pk>/start_over/', views.StartOverView.as_view(),
          name='start-over'),
     path('<int:conclave_config_pk>/current_user_registration_summary/',
          views.CurrentUserRegistrationSummaryView.as_view(),
          name='conclave-registration-summary-current-user'),
 
+    path('<int:conclave_config_pk>/whos_coming/', views.WhosComingView.as_view(),
+         name='whos-coming'),
+    path('<int:conclave_config_pk>/whos_coming/json/', views.WhosComingJSONView.as_view(),
+         name='whos-coming-json'),
+
     path('<int:conclave_config_pk>/register/', views.ConclaveRegistrationLandingPage.as_view(),
          name='conclave-reg-landing'),
 
@@ -1,3 +1,7 @@
+from .conclave_config_views import ClassDemandView as ClassDemandView
+from .conclave_config_views import (
+    CloneConclaveRegistrationConfigView as CloneConclaveRegistrationConfigView
+)
 from .conclave_config_views import ConclaveClassCSVView as ConclaveClassCSVView
 from .conclave_config_views import ConclaveRegistrationConfigView as ConclaveRegistrationConfigView
 from .conclave_config_views import CreateConclaveClassView as CreateConclaveClassView
@@ -30,6 +34,7 @@ from .conclave_registration_views import SelfRatingInfoInfoView as SelfRatingInf
 from .conclave_registration_views import InstrumentsBringingView as InstrumentsBringingView
 from .conclave_registration_views import PaymentView as PaymentView
 from .conclave_registration_views import RegistrationDoneView as RegistrationDoneView
+from .conclave_registration_views import RegistrationPhotoView as RegistrationPhotoView
 from .conclave_registration_views import (
     RegularProgramClassSelectionView as RegularProgramClassSelectionView
 )
@@ -39,9 +44,13 @@ from .conclave_registration_views import WorkStudyApplicationView as WorkStudyAp
 from .conclave_registration_views import (
     current_year_conclave_redirect_view as current_year_conclave_redirect_view
 )
+from .registration_csv_view import ClassDemandJSONView as ClassDemandJSONView
+from .registration_csv_view import DownloadClassDemandCSVView as DownloadClassDemandCSVView
 from .registration_csv_view import (
     DownloadFirstClassChoicesCSVView as DownloadFirstClassChoicesCSVView
 )
 from .registration_csv_view import (
     DownloadRegistrationEntriesCSVView as DownloadRegistrationEntriesCSVView
 )
+from .whos_coming_views import WhosComingJSONView as WhosComingJSONView
+from .whos_coming_views import WhosComingView as WhosComingView
@@ -1,6 +1,5 @@
 from __future__ import annotations
 
-import csv
 import os
 import tempfile
 import zipfile
@@ -8,7 +7,6 @@ from typing import Any, Counter
 
 from django import forms
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db import transaction
 from django.db.models import Q, Count
 from django.db.models.query import QuerySet
 from django.forms import widgets
@@ -16,15 +14,19 @@ from django.http.response import HttpResponse, HttpResponseRedirect, FileRespons
 from django.shortcuts import get_object_or_404, render
 from django.urls.base import reverse, reverse_lazy
 from django.utils.functional import cached_property
-from django.views.generic import CreateView, DeleteView, DetailView, ListView, UpdateView
-from django.views.generic.base import View
+from django.views.generic import CreateView, DeleteView, DetailView, FormView, ListView, UpdateView
+from django.views.generic.base import TemplateView, View
 
 from vdgsa_backend import settings
+from vdgsa_backend.conclave_registration.class_csv_import import import_classes_csv
+from vdgsa_backend.conclave_registration.class_demand import REGISTRANT_LEVELS, get_class_demand
 from vdgsa_backend.conclave_registration.models import (
-    Class, ConclaveRegistrationConfig, Housing, HousingRoomType, Period, RegistrationEntry,
+    Class, ConclaveRegistrationConfig, Housing, HousingRoomType, RegistrationEntry,
     TSHIRT_SIZES, TShirts, WorkStudyApplication, YesNo, get_classes_by_period
 )
 from vdgsa_backend.conclave_registration.views.permissions import is_conclave_team
+from vdgsa_backend.conclave_registration.year_rollover import clone_conclave_config
+from vdgsa_backend.db_routing import ReadFromReplicaMixin
 
 
 class ConclaveRegistrationConfigForm(forms.ModelForm):
@@ -214,7 +216,52 @@ class EditConclaveRegistrationConfigView(LoginRequiredMixin, UserPassesTestMixin
         return is_conclave_team(self.request.user)
 
 
-class ListRegistrationEntriesView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+class CloneConclaveRegistrationConfigForm(forms.Form):
+    new_year = forms.IntegerField()
+    include_classes = forms.BooleanField(
+        required=False,
+        initial=True,
+        label='Copy classes',
+    )
+
+    def clean_new_year(self) -> int:
+        new_year = self.cleaned_data['new_year']
+        if ConclaveRegistrationConfig.objects.filter(year=new_year).exists():
+            raise forms.ValidationError(f'There is already a Conclave for {new_year}.')
+        return new_year
+
+
+class CloneConclaveRegistrationConfigView(LoginRequiredMixin, UserPassesTestMixin, FormView):
+    form_class = CloneConclaveRegistrationConfigForm
+    template_name = 'registration_config/clone_conclave.html'
+
+    @cached_property
+    def conclave_config(self) -> ConclaveRegistrationConfig:
+        return get_object_or_404(ConclaveRegistrationConfig, pk=self.kwargs['conclave_config_pk'])
+
+    def get_initial(self) -> dict[str, Any]:
+        return {**super().get_initial(), 'new_year': self.conclave_config.year + 1}
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['conclave_config'] = self.conclave_config
+        return context
+
+    def form_valid(self, form: CloneConclaveRegistrationConfigForm) -> HttpResponse:
+        new_config = clone_conclave_config(
+            self.conclave_config,
+            form.cleaned_data['new_year'],
+            include_classes=form.cleaned_data['include_classes'],
+        )
+        return HttpResponseRedirect(reverse('conclave-detail', kwargs={'pk': new_config.pk}))
+
+    def test_func(self) -> bool | None:
+        return is_conclave_team(self.request.user)
+
+
+class ListRegistrationEntriesView(
+    LoginRequiredMixin, UserPassesTestMixin, ReadFromReplicaMixin, ListView
+):
     template_name = 'registration_config/list_registration_entries.html'
 
     @cached_property
@@ -317,6 +364,38 @@ class ListRegistrationEntriesView(LoginRequiredMixin, UserPassesTestMixin, ListV
         return is_conclave_team(self.request.user)
 
 
+class ClassDemandView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """
+    Per-class choice counts, used by the music director to balance
+    class sizes while registration is open.
+    """
+    template_name = 'registration_config/class_demand.html'
+
+    @cached_property
+    def conclave_config(self) -> ConclaveRegistrationConfig:
+        return get_object_or_404(ConclaveRegistrationConfig, pk=self.kwargs['conclave_config_pk'])
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['conclave_config'] = self.conclave_config
+        context['levels'] = REGISTRANT_LEVELS
+        # Django templates can't look up dict keys by variable, so
+        # flatten the level counts into lists ordered like "levels".
+        context['classes'] = [
+            {
+                **class_demand,
+                'level_counts': [
+                    class_demand['by_level'].get(level, 0) for level in REGISTRANT_LEVELS
+                ],
+            }
+            for class_demand in get_class_demand(self.conclave_config)
+        ]
+        return context
+
+    def test_func(self) -> bool | None:
+        return is_conclave_team(self.request.user)
+
+
 class RegistrationPhotosView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     template_name = 'registration_config/list_registration_photos.html'
 
@@ -390,6 +469,7 @@ class ConclaveClassForm(forms.ModelForm):
             'name',
             'instructor',
             'level',
+            'capacity',
             'offer_to_beginners',
             'is_freebie',
             'description',
@@ -397,6 +477,7 @@ class ConclaveClassForm(forms.ModelForm):
         ]
 
         labels = {'offer_to_beginners': 'Offer as Beginners+ Add-On Option'}
+        help_texts = {'capacity': 'Leave blank for no limit.'}
 
         widgets = {
             'description': widgets.Textarea(attrs={'rows': 5, 'cols': None}),
@@ -476,28 +557,22 @@ class ConclaveClassCSVView(LoginRequiredMixin, UserPassesTestMixin, View):
 
     def post(self, *args: Any, **kwargs: Any) -> HttpResponse:
         file_ = self.request.FILES['class_csv']
+        dry_run = 'dry_run' in self.request.POST
         with tempfile.NamedTemporaryFile('w+', newline='') as f:
             for chunk in file_.chunks():
                 f.write(chunk.decode(encoding='utf-8', errors='surrogateescape'))
 
             f.seek(0)
 
-            reader = csv.DictReader(f)
-            with transaction.atomic():
-                self.conclave_config.classes.all().delete()
-                for row in reader:
-                    Class.objects.create(
-                        conclave_config=self.conclave_config,
-                        name=row['Title'].strip(),
-                        period=Period(int(row['Period'])),
-
-                        level=row['Level'],
-                        instructor=row['Teacher'],
-                        description=row['Description'],
-                        notes=row['Notes'],
-                        offer_to_beginners=row['offer_to_beginners'].strip().lower() == 'true',
-                        is_freebie=row['is_freebie'].strip().lower() == 'true',
-                    )
+            result = import_classes_csv(self.conclave_config, f, dry_run=dry_run)
+
+        if result['errors'] or dry_run:
+            return render(
+                self.request,
+                self.template_name,
+                {'result': result, 'dry_run': dry_run},
+                status=400 if result['errors'] else 200,
+            )
 
         return HttpResponseRedirect(
             reverse('conclave-detail', kwargs={'pk': self.conclave_config.pk})
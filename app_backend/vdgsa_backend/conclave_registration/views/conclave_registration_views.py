@@ -6,7 +6,6 @@ from datetime import datetime
 from itertools import chain
 from typing import Any, Dict, Final, Iterable, List, Type, cast
 
-import stripe  # type: ignore
 from django import forms
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
@@ -18,8 +17,9 @@ from django.forms import widgets
 from django.forms.fields import BooleanField, IntegerField
 from django.forms.utils import ErrorDict
 from django.forms.widgets import ClearableFileInput
+from django.http import Http404
 from django.http.request import HttpRequest
-from django.http.response import HttpResponse, HttpResponseRedirect
+from django.http.response import HttpResponse, HttpResponseBase, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, render
 from django.template.loader import render_to_string
 from django.urls.base import reverse
@@ -44,6 +44,8 @@ from vdgsa_backend.conclave_registration.summary_and_charges import (
 from vdgsa_backend.conclave_registration.templatetags.conclave_tags import (
     PERIOD_STRS, format_period_long, get_current_conclave
 )
+from vdgsa_backend.protected_files import serve_protected_file
+from vdgsa_backend.stripe_client import get_stripe
 from vdgsa_backend.templatetags.filters import show_name, show_name_and_email
 
 from .permissions import is_conclave_team
@@ -1376,6 +1378,7 @@ class PaymentView(_RegistrationStepViewBase):
         if self._get_missing_sections():
             return self.render_page(form)
 
+        stripe = get_stripe()
         try:
             card_number = ''.join(form.cleaned_data['card_number'].split())
             payment_method = stripe.PaymentMethod.create(
@@ -1488,6 +1491,27 @@ class StartOverView(_RegistrationStepViewBase):
         )
 
 
+class RegistrationPhotoView(LoginRequiredMixin, UserPassesTestMixin, View):
+    @cached_property
+    def registration_entry(self) -> RegistrationEntry:
+        return get_object_or_404(
+            RegistrationEntry.objects.select_related('additional_info'),
+            pk=self.kwargs['conclave_reg_pk']
+        )
+
+    def get(self, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        additional_info = getattr(self.registration_entry, 'additional_info', None)
+        if additional_info is None:
+            raise Http404
+        return serve_protected_file(self.request, additional_info.user_image_file_name)
+
+    def test_func(self) -> bool:
+        return (
+            is_conclave_team(self.request.user)
+            or self.request.user == self.registration_entry.user
+        )
+
+
 class RegistrationDoneView(View):
     def get(self, *args: Any, **kwargs: Any) -> HttpResponse:
         return render(self.request, 'registration/done.html')
@@ -7,22 +7,29 @@ from typing import Any, Dict, get_args
 from zoneinfo import ZoneInfo
 
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http.response import HttpResponse
+from django.http.response import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
 from django.views.generic import View
 
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.conclave_registration.class_demand import (
+    RANKS, REGISTRANT_LEVELS, get_class_demand
+)
 from vdgsa_backend.conclave_registration.models import (
     AdditionalRegistrationInfo, ConclaveRegistrationConfig, Housing, Period, RegistrationEntry,
-    WorkStudyApplication, YesNo
+    RegularProgramClassChoices, WorkStudyApplication, YesNo
 )
 from vdgsa_backend.conclave_registration.summary_and_charges import (
     CHARGE_CSV_LABELS, get_charges_summary
 )
+from vdgsa_backend.db_routing import ReadFromReplicaMixin
 
 from .permissions import is_conclave_team
 
 
-class DownloadRegistrationEntriesCSVView(LoginRequiredMixin, UserPassesTestMixin, View):
+class DownloadRegistrationEntriesCSVView(
+    LoginRequiredMixin, UserPassesTestMixin, ReadFromReplicaMixin, View
+):
     def get(self, *args: Any, **kwargs: Any) -> HttpResponse:
         return make_reg_csv(
             get_object_or_404(ConclaveRegistrationConfig, pk=self.kwargs['conclave_config_pk'])
@@ -32,6 +39,28 @@ class DownloadRegistrationEntriesCSVView(LoginRequiredMixin, UserPassesTestMixin
         return is_conclave_team(self.request.user)
 
 
+# Everything the CSV dicts below read from each entry, so that the
+# whole file takes a couple of queries instead of a dozen per entry.
+_CLASS_CHOICE_FIELDS = [
+    f'period{period}_choice{choice}' for period in Period for choice in range(1, 4)
+] + [f'flex_choice{choice}' for choice in range(1, 4)]
+_CSV_SELECT_RELATED = [
+    'user',
+    'conclave_config',
+    'payment_info',
+    'additional_info',
+    'self_rating',
+    'beginner_instruments',
+    'advanced_projects',
+    'work_study',
+    'housing',
+    'tshirts',
+    'regular_class_choices',
+    *(f'regular_class_choices__{field}' for field in _CLASS_CHOICE_FIELDS),
+    *(f'regular_class_choices__{field}_instrument' for field in _CLASS_CHOICE_FIELDS),
+]
+
+
 def format_datetime(datetime_):
     if datetime_ is None:
         return ''
@@ -52,7 +81,12 @@ def make_reg_csv(conclave_config: ConclaveRegistrationConfig) -> HttpResponse:
     writer.writeheader()
 
     entries = RegistrationEntry.objects.filter(
-        conclave_config=conclave_config).order_by('payment_info__pk')
+        conclave_config=conclave_config
+    ).select_related(
+        *_CSV_SELECT_RELATED
+    ).prefetch_related(
+        'instruments_bringing'
+    ).order_by('payment_info__pk')
     for entry in entries:
         if not hasattr(entry, 'payment_info') or entry.payment_info.stripe_payment_method_id == '':
             continue
@@ -429,7 +463,9 @@ CSV_HEADERS = [
 # -----------------------------------------------------------------------------
 
 
-class DownloadFirstClassChoicesCSVView(LoginRequiredMixin, UserPassesTestMixin, View):
+class DownloadFirstClassChoicesCSVView(
+    LoginRequiredMixin, UserPassesTestMixin, ReadFromReplicaMixin, View
+):
     def get(self, *args: Any, **kwargs: Any) -> HttpResponse:
         return make_class_first_choices_csv(
             get_object_or_404(ConclaveRegistrationConfig, pk=self.kwargs['conclave_config_pk'])
@@ -445,35 +481,108 @@ def make_class_first_choices_csv(conclave_config: ConclaveRegistrationConfig) ->
         f'attachment; filename="conclave_{conclave_config.year}_class_first_choices.csv"')
 
     classes = list(conclave_config.classes.all())
-    first_choices_per_class = {str(class_): [] for class_ in classes}
-
-    for entry in conclave_config.registration_entries.order_by('pk'):
-        if not entry.is_finalized or not hasattr(entry, 'regular_class_choices'):
-            continue
-
-        choices = entry.regular_class_choices
-
-        if choices.period1_choice1:
-            first_choices_per_class[str(choices.period1_choice1)].append(entry.user)
-        if choices.period2_choice1:
-            first_choices_per_class[str(choices.period2_choice1)].append(entry.user)
-        if choices.period3_choice1:
-            first_choices_per_class[str(choices.period3_choice1)].append(entry.user)
-        if choices.period4_choice1:
-            first_choices_per_class[str(choices.period4_choice1)].append(entry.user)
-
-        if choices.flex_choice1:
-            first_choices_per_class[str(choices.flex_choice1)].append(entry.user)
+    # Key on pk rather than str(class_), since two classes can render
+    # the same string.
+    first_choices_per_class: dict[int, list[User]] = {class_.pk: [] for class_ in classes}
+
+    first_choice_fields = [
+        *(f'period{period}_choice1_id' for period in Period),
+        'flex_choice1_id',
+    ]
+    choices_query = RegularProgramClassChoices.objects.filter(
+        registration_entry__conclave_config=conclave_config,
+        registration_entry__payment_info__stripe_payment_method_id__gt='',
+    ).select_related('registration_entry__user').order_by('registration_entry__pk')
+    for choices in choices_query:
+        for field in first_choice_fields:
+            class_pk = getattr(choices, field)
+            if class_pk is not None:
+                first_choices_per_class[class_pk].append(choices.registration_entry.user)
 
     writer = csv.DictWriter(response, fieldnames=['Class', 'Who Picked as First Choice'])
     writer.writeheader()
-    for class_name, first_choices in first_choices_per_class.items():
+    for class_ in classes:
         writer.writerow({
-            'Class': class_name,
+            'Class': str(class_),
             'Who Picked as First Choice': '\n'.join(
                 map(lambda user: f'{user.first_name} {user.last_name} ({user.username})',
-                    first_choices)
+                    first_choices_per_class[class_.pk])
             )
         })
 
     return response
+
+
+# -----------------------------------------------------------------------------
+
+
+class DownloadClassDemandCSVView(LoginRequiredMixin, UserPassesTestMixin, View):
+    def get(self, *args: Any, **kwargs: Any) -> HttpResponse:
+        return make_class_demand_csv(
+            get_object_or_404(ConclaveRegistrationConfig, pk=self.kwargs['conclave_config_pk'])
+        )
+
+    def test_func(self) -> bool:
+        return is_conclave_team(self.request.user)
+
+
+class ClassDemandJSONView(LoginRequiredMixin, UserPassesTestMixin, View):
+    def get(self, *args: Any, **kwargs: Any) -> HttpResponse:
+        conclave_config = get_object_or_404(
+            ConclaveRegistrationConfig, pk=self.kwargs['conclave_config_pk'])
+        return JsonResponse({
+            'year': conclave_config.year,
+            'classes': get_class_demand(conclave_config),
+        })
+
+    def test_func(self) -> bool:
+        return is_conclave_team(self.request.user)
+
+
+def make_class_demand_csv(conclave_config: ConclaveRegistrationConfig) -> HttpResponse:
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = (
+        f'attachment; filename="conclave_{conclave_config.year}_class_demand.csv"')
+
+    level_headers = [f'Level {level or "(none)"}' for level in REGISTRANT_LEVELS]
+    writer = csv.DictWriter(response, fieldnames=CLASS_DEMAND_CSV_HEADERS + level_headers)
+    writer.writeheader()
+    for class_demand in get_class_demand(conclave_config):
+        writer.writerow({
+            'Period': class_demand['period'],
+            'Class': class_demand['name'],
+            'Instructor': class_demand['instructor'],
+            'Class Level': class_demand['level'],
+            'Freebie': class_demand['is_freebie'],
+            **{
+                f'{_RANK_LABELS[rank]} Choice': count
+                for rank, count in class_demand['by_rank'].items()
+            },
+            **{
+                f'{_RANK_LABELS[rank]} Choice (Finalized)': count
+                for rank, count in class_demand['finalized_by_rank'].items()
+            },
+            'Total': class_demand['total'],
+            'Total (Finalized)': class_demand['finalized_total'],
+            **{
+                header: class_demand['by_level'].get(level, 0)
+                for header, level in zip(level_headers, REGISTRANT_LEVELS)
+            },
+        })
+
+    return response
+
+
+_RANK_LABELS = {1: '1st', 2: '2nd', 3: '3rd'}
+
+CLASS_DEMAND_CSV_HEADERS = [
+    'Period',
+    'Class',
+    'Instructor',
+    'Class Level',
+    'Freebie',
+    *[f'{_RANK_LABELS[rank]} Choice' for rank in RANKS],
+    *[f'{_RANK_LABELS[rank]} Choice (Finalized)' for rank in RANKS],
+    'Total',
+    'Total (Finalized)',
+]
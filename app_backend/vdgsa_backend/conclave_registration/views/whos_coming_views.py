@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Any, Final
+
+from django.http import Http404
+from django.http.response import HttpResponse
+from django.shortcuts import render
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.decorators import method_decorator
+from django.views.decorators.clickjacking import xframe_options_exempt
+from django.views.generic.base import View
+
+from vdgsa_backend.conclave_registration.whos_coming import WhosComingPayload, get_whos_coming
+
+# How long browsers and proxies may reuse a response before
+# revalidating it with its ETag.
+WHOS_COMING_MAX_AGE: Final = 5 * 60
+
+
+class _WhosComingViewBase(View):
+    """
+    These views are public and are loaded by the public website, so
+    they are served entirely from the cache.
+    """
+
+    def get(self, *args: Any, **kwargs: Any) -> HttpResponse:
+        payload = get_whos_coming(self.kwargs['conclave_config_pk'])
+        if payload is None:
+            raise Http404
+
+        response = get_conditional_response(self.request, etag=payload['etag'])
+        if response is None:
+            response = self.render_payload(payload)
+
+        response['ETag'] = payload['etag']
+        patch_cache_control(response, public=True, max_age=WHOS_COMING_MAX_AGE)
+        return response
+
+    def render_payload(self, payload: WhosComingPayload) -> HttpResponse:
+        raise NotImplementedError
+
+
+class WhosComingJSONView(_WhosComingViewBase):
+    def render_payload(self, payload: WhosComingPayload) -> HttpResponse:
+        return HttpResponse(payload['json'], content_type='application/json')
+
+
+# Allow the public website to embed this page.
+@method_decorator(xframe_options_exempt, name='dispatch')
+class WhosComingView(_WhosComingViewBase):
+    def render_payload(self, payload: WhosComingPayload) -> HttpResponse:
+        return render(self.request, 'registration/whos_coming.html', payload['data'])
@@ -0,0 +1,131 @@
+"""
+Contains the public "who's coming to Conclave" list.
+
+The list is built once, serialized to JSON, and stored in the cache
+along with its ETag. Signal handlers in
+vdgsa_backend.conclave_registration.signals rebuild it whenever a
+registration that could affect it is finalized or edited, so requests
+for the list don't query the database.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import TypedDict
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from vdgsa_backend.conclave_registration.models import (
+    ConclaveRegistrationConfig, Program, RegistrationEntry, RegistrationPhase, YesNo
+)
+
+
+class WhosComingAttendee(TypedDict):
+    first_name: str
+    last_name: str
+    nickname: str
+    city: str
+    country: str
+
+
+class WhosComingProgramCount(TypedDict):
+    program: str
+    label: str
+    count: int
+
+
+class WhosComing(TypedDict):
+    year: int
+    # Only finalized registrants who opted in to the list.
+    attendees: list[WhosComingAttendee]
+    # Counts of all finalized registrants, whether or not they opted in.
+    program_counts: list[WhosComingProgramCount]
+    total: int
+
+
+class WhosComingPayload(TypedDict):
+    data: WhosComing
+    json: bytes
+    etag: str
+
+
+def _cache_key(conclave_config_pk: int) -> str:
+    return f'conclave_whos_coming_{conclave_config_pk}'
+
+
+def build_whos_coming(conclave_config: ConclaveRegistrationConfig) -> WhosComing:
+    finalized = RegistrationEntry.objects.filter(
+        conclave_config=conclave_config,
+        payment_info__stripe_payment_method_id__gt='',
+    )
+    attendees: list[WhosComingAttendee] = [
+        {
+            'first_name': first_name,
+            'last_name': last_name,
+            'nickname': nickname,
+            'city': city,
+            'country': country,
+        }
+        for first_name, last_name, nickname, city, country in finalized.filter(
+            additional_info__include_in_whos_coming_to_conclave_list=YesNo.yes
+        ).order_by(
+            'user__last_name', 'user__first_name'
+        ).values_list(
+            'user__first_name', 'user__last_name', 'additional_info__nickname',
+            'user__address_city', 'user__address_country',
+        )
+    ]
+
+    counts = dict(
+        finalized.order_by().values_list('program').annotate(count=Count('pk'))
+    )
+    return {
+        'year': conclave_config.year,
+        'attendees': attendees,
+        'program_counts': [
+            {'program': program.value, 'label': program.label, 'count': counts[program]}
+            for program in Program
+            if program in counts
+        ],
+        'total': sum(counts.values()),
+    }
+
+
+def refresh_whos_coming(conclave_config: ConclaveRegistrationConfig) -> WhosComingPayload:
+    """
+    Rebuilds the cached list for conclave_config.
+    """
+    data = build_whos_coming(conclave_config)
+    json_ = json.dumps(data).encode()
+    payload: WhosComingPayload = {
+        'data': data,
+        'json': json_,
+        'etag': f'"{hashlib.sha256(json_).hexdigest()[:32]}"',
+    }
+    cache.set(_cache_key(conclave_config.pk), payload, timeout=None)
+    return payload
+
+
+def get_whos_coming(conclave_config_pk: int) -> WhosComingPayload | None:
+    """
+    Returns the cached list for the given ConclaveRegistrationConfig,
+    building it if needed. Returns None if the config doesn't exist or
+    is unpublished.
+    """
+    payload = cache.get(_cache_key(conclave_config_pk))
+    if payload is not None:
+        return payload
+
+    conclave_config = ConclaveRegistrationConfig.objects.filter(
+        pk=conclave_config_pk
+    ).exclude(phase=RegistrationPhase.unpublished).first()
+    if conclave_config is None:
+        return None
+
+    return refresh_whos_coming(conclave_config)
+
+
+def invalidate_whos_coming(conclave_config_pk: int) -> None:
+    cache.delete(_cache_key(conclave_config_pk))
@@ -0,0 +1,102 @@
+"""
+Contains the operation that starts a new Conclave year by cloning a
+prior year's ConclaveRegistrationConfig and, optionally, its classes.
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Final
+
+from django.db import transaction
+
+from vdgsa_backend.conclave_registration.models import (
+    Class, ConclaveRegistrationConfig, RegistrationPhase
+)
+
+# Settings that hold newline-separated dates in
+# ConclaveRegistrationConfig.arrival_date_format.
+DATE_OPTION_FIELDS: Final = [
+    'early_arrival_date_options',
+    'arrival_date_options',
+    'departure_date_options',
+]
+
+# Settings that are specific to one year's registration and are
+# reset rather than copied.
+NOT_COPIED_FIELDS: Final = ['id', 'year', 'phase']
+
+
+def shift_to_year(date_: date, new_year: int) -> date:
+    """
+    Returns the date in new_year that falls on the same weekday and
+    is closest to date_'s month and day, e.g. the Sunday that Conclave
+    starts on moves to the corresponding Sunday of new_year.
+    """
+    years = new_year - date_.year
+    # Shifting by whole weeks keeps the weekday, and 52 weeks is one
+    # day short of a year (two for leap years). Round to the nearest
+    # whole week so that drift doesn't accumulate.
+    approximate = date_ + timedelta(days=round(years * 365.2425))
+    weeks = round((approximate - date_).days / 7)
+    return date_ + timedelta(weeks=weeks)
+
+
+def shift_date_options(options: str, old_year: int, new_year: int) -> str:
+    """
+    Shifts each line of a date options setting from old_year to the
+    same weekday in new_year. Lines that aren't dates are kept as-is.
+    """
+    date_format = ConclaveRegistrationConfig.arrival_date_format
+    shifted = []
+    for line in options.splitlines():
+        try:
+            parsed = datetime.strptime(line, date_format).date().replace(year=old_year)
+        except ValueError:
+            shifted.append(line)
+            continue
+
+        shifted.append(shift_to_year(parsed, new_year).strftime(date_format))
+
+    return '\n'.join(shifted)
+
+
+def clone_conclave_config(
+    source: ConclaveRegistrationConfig,
+    new_year: int,
+    *,
+    include_classes: bool = True,
+) -> ConclaveRegistrationConfig:
+    """
+    Creates a ConclaveRegistrationConfig for new_year with the same
+    settings as source. The new config starts out unpublished.
+    If include_classes is True, source's classes are copied as well.
+    Uses a constant number of queries regardless of the number of
+    classes.
+    """
+    new_config = ConclaveRegistrationConfig(
+        year=new_year,
+        phase=RegistrationPhase.unpublished,
+        **{
+            field.attname: getattr(source, field.attname)
+            for field in ConclaveRegistrationConfig._meta.concrete_fields
+            if field.name not in NOT_COPIED_FIELDS
+        }
+    )
+    for field_name in DATE_OPTION_FIELDS:
+        setattr(
+            new_config,
+            field_name,
+            shift_date_options(getattr(source, field_name), source.year, new_year)
+        )
+
+    with transaction.atomic():
+        new_config.save()
+        if include_classes:
+            classes = list(Class.objects.filter(conclave_config=source))
+            for class_ in classes:
+                class_.pk = None
+                class_.conclave_config = new_config
+            Class.objects.bulk_create(classes)
+
+    return new_config
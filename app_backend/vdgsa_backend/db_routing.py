@@ -0,0 +1,201 @@
+"""
+Contains the pieces that let heavy reports read from a replica of the
+database instead of the primary that payments and registrations write
+to:
+    - ReplicaRouter (see settings.DATABASE_ROUTERS) sends reads to the
+      settings.REPLICA_DATABASE alias only inside views marked with
+      ReadFromReplicaMixin or inside a replica_reads() block. Every
+      other read, and every read when REPLICA_DATABASE is None, uses
+      the primary.
+    - ReplicaRoutingMiddleware keeps track of each request's routing.
+      A request that writes to the database reads from the primary for
+      the rest of the request, and the user's requests in the next
+      settings.REPLICA_STICKY_SECONDS do too (using the REPLICA_PIN_COOKIE
+      cookie), so users always see their own changes.
+    - Reads also go to the primary while the replica is more than
+      settings.REPLICA_MAX_LAG_SECONDS behind it or can't be reached.
+      Each process checks this at most every LAG_CHECK_INTERVAL seconds.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Final, Iterator
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+from django.db.models import Model
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+
+from vdgsa_backend.streaming import when_content_done
+
+logger = logging.getLogger(__name__)
+
+REPLICA_PIN_COOKIE: Final = 'vdgsa_primary_until'
+LAG_CHECK_INTERVAL: Final = 5.0
+
+# Zero when the replica has replayed everything it has received from
+# the primary, since pg_last_xact_replay_timestamp() is the time of the
+# last write replayed, which is old whenever the primary is idle. Also
+# zero when the database isn't a standby at all.
+_REPLICA_LAG_SQL: Final = '''
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery()
+            OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+
+@dataclass
+class _RoutingState:
+    # Set by ReadFromReplicaMixin and replica_reads.
+    use_replica: bool = False
+    # Set from REPLICA_PIN_COOKIE.
+    pinned: bool = False
+    # Set by ReplicaRouter.db_for_write.
+    wrote: bool = False
+
+
+_routing_state: contextvars.ContextVar[_RoutingState | None] = contextvars.ContextVar(
+    'routing_state', default=None)
+
+
+@contextmanager
+def _state_context(state: _RoutingState) -> Iterator[_RoutingState]:
+    token = _routing_state.set(state)
+    try:
+        yield state
+    finally:
+        _routing_state.reset(token)
+
+
+@contextmanager
+def replica_reads() -> Iterator[None]:
+    """
+    Lets reads inside this block go to the replica. Use
+    ReadFromReplicaMixin for views instead, since their querysets are
+    often evaluated while the template is rendered, after the view has
+    returned.
+    """
+    state = _routing_state.get()
+    if state is None:
+        with _state_context(_RoutingState(use_replica=True)):
+            yield
+        return
+
+    previous = state.use_replica
+    state.use_replica = True
+    try:
+        yield
+    finally:
+        state.use_replica = previous
+
+
+class ReadFromReplicaMixin:
+    """
+    For class-based views that only read from the database. Put it
+    after the permission mixins, so that permission checks read from
+    the primary.
+    """
+
+    def dispatch(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        state = _routing_state.get()
+        if state is None:
+            # ReplicaRoutingMiddleware isn't installed.
+            with replica_reads():
+                return super().dispatch(request, *args, **kwargs)  # type: ignore
+
+        # For the rest of the request, including rendering and
+        # streaming the response.
+        state.use_replica = True
+        return super().dispatch(request, *args, **kwargs)  # type: ignore
+
+
+_lag_check: dict[str, Any] = {'checked_at': None, 'usable': True}
+
+
+def reset_replica_lag_check() -> None:
+    """Makes the next read from the replica check its lag again."""
+    _lag_check['checked_at'] = None
+
+
+def _replica_is_usable(alias: str) -> bool:
+    now = time.monotonic()
+    checked_at = _lag_check['checked_at']
+    if checked_at is not None and now - checked_at < LAG_CHECK_INTERVAL:
+        return _lag_check['usable']
+
+    try:
+        with connections[alias].cursor() as cursor:
+            cursor.execute(_REPLICA_LAG_SQL)
+            lag = float(cursor.fetchone()[0])
+    except DatabaseError:
+        logger.warning('Reading from the primary: replica %r is unreachable', alias,
+                       exc_info=True)
+        usable = False
+    else:
+        usable = lag <= settings.REPLICA_MAX_LAG_SECONDS
+        if not usable:
+            logger.warning('Reading from the primary: replica %r is %.1fs behind', alias, lag)
+
+    _lag_check.update(checked_at=now, usable=usable)
+    return usable
+
+
+class ReplicaRouter:
+    def db_for_read(self, model: type[Model], **hints: Any) -> str | None:
+        state = _routing_state.get()
+        alias = settings.REPLICA_DATABASE
+        if (alias is None or state is None or not state.use_replica
+                or state.pinned or state.wrote):
+            return None
+        return alias if _replica_is_usable(alias) else None
+
+    def db_for_write(self, model: type[Model], **hints: Any) -> str | None:
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> bool | None:
+        # The replica holds the same data as the primary.
+        return True
+
+
+def _is_pinned(request: HttpRequest) -> bool:
+    try:
+        return float(request.COOKIES.get(REPLICA_PIN_COOKIE, '')) > time.time()
+    except ValueError:
+        return False
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Install this before SessionMiddleware and AuthenticationMiddleware
+    in settings.MIDDLEWARE, so that their writes (e.g. logging in) pin
+    the user to the primary too.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponseBase]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        state = _RoutingState(pinned=_is_pinned(request))
+        with _state_context(state):
+            response = self.get_response(request)
+
+        if state.wrote and settings.REPLICA_DATABASE is not None:
+            response.set_cookie(
+                REPLICA_PIN_COOKIE, str(time.time() + settings.REPLICA_STICKY_SECONDS),
+                max_age=settings.REPLICA_STICKY_SECONDS, secure=request.is_secure(),
+                httponly=True, samesite='Lax')
+
+        # Streaming responses (e.g. CSV exports) run most of their
+        # queries after this returns.
+        return when_content_done(response, context=lambda: _state_context(state))
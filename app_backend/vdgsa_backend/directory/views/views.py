@@ -15,6 +15,7 @@ from django.views.generic import View
 from vdgsa_backend.accounts.models import MembershipType, User
 from vdgsa_backend.accounts.views.permissions import is_active_member
 from vdgsa_backend.accounts.views.utils import get_ajax_form_response, LocationAddress
+from vdgsa_backend.db_routing import ReadFromReplicaMixin
 
 class CommercialMemberType(models.TextChoices):
     INSTRUMENT_MAKER = "I", "Instrument Maker"
@@ -123,7 +124,7 @@ class DirectoryMemberDetailView(LoginRequiredMixin, UserPassesTestMixin, View):
         return is_active_member(self.request.user)
 
 
-class DirectoryHomeView(LoginRequiredMixin, UserPassesTestMixin, View):
+class DirectoryHomeView(LoginRequiredMixin, UserPassesTestMixin, ReadFromReplicaMixin, View):
     template_name = "directory/home.html"
 
     def get(self, *args: Any, **kwargs: Any) -> HttpResponse:
@@ -20,6 +20,9 @@ from django.views import View
 
 from vdgsa_backend.accounts.models import MembershipType, User
 from vdgsa_backend.accounts.views.permissions import is_membership_secretary
+from vdgsa_backend.metrics import (
+    MEMBERSHIP_EMAIL_JOB_LAST_SUCCESS, MEMBERSHIP_EMAIL_JOB_RUNS, MEMBERSHIP_EMAILS_SENT
+)
 
 FROM_EMAIL: Final = 'membership@vdgsa.org'
 BCC_TO_EMAIL: Final = 'membership@vdgsa.org'
@@ -85,6 +88,15 @@ class ExpiringEmails():
         return msg
 
     def runJob(self) -> None:
+        try:
+            self._runJob()
+        except Exception:
+            MEMBERSHIP_EMAIL_JOB_RUNS.labels('failure').inc()
+            raise
+        MEMBERSHIP_EMAIL_JOB_RUNS.labels('success').inc()
+        MEMBERSHIP_EMAIL_JOB_LAST_SUCCESS.set_to_current_time()
+
+    def _runJob(self) -> None:
         jobs = [EXPIRING_THIS_MONTH, EXPIRED_LAST_MONTH, EXPIRED_PAST]
         logging = []
 
@@ -93,6 +105,7 @@ class ExpiringEmails():
             title = job['title']
             for member in expiring_members:
                 msg = self.sendEmail(member, job, send=True)
+                MEMBERSHIP_EMAILS_SENT.labels(title).inc()
                 log = f'{title}: {member.email}, expired \
 on {member.subscription.valid_until.strftime("%m/%d/%Y")} \n'
                 logging.append(log)
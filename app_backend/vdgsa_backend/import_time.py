@@ -0,0 +1,117 @@
+"""
+Contains tools for finding out what makes starting the app slow:
+    - measure_startup starts a fresh Python process with
+      "-X importtime" that does what a uwsgi worker does at boot
+      (django.setup(), then loading settings.ROOT_URLCONF and every view
+      it refers to) and returns how long that took and what each module
+      cost to import.
+    - parse_import_times reads the "-X importtime" report.
+    - totals_by_package adds up the import times of each top-level
+      package, e.g. all of "stripe.*".
+Use them through the profile_imports command.
+
+A module's "self" time doesn't include the modules it imported, while
+its "cumulative" time does. Each module is only reported by whichever
+module imported it first.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Final, TypedDict
+
+from django.conf import settings
+
+# e.g. "import time:       532 |       1234 |     django.utils.functional"
+_IMPORT_TIME_LINE_RE: Final = re.compile(
+    r'^import time:\s+(?P<self>\d+) \|\s+(?P<cumulative>\d+) \| (?P<indent> *)(?P<module>\S+)$')
+
+_STARTUP_SCRIPT: Final = '''
+import time
+start = time.perf_counter()
+
+import django
+django.setup()
+
+# "-X importtime" doesn't report modules loaded with
+# importlib.import_module, which is how Django loads the URLconf.
+from django.conf import settings
+__import__(settings.ROOT_URLCONF)
+
+from django.urls import get_resolver
+get_resolver().url_patterns
+
+print(time.perf_counter() - start)
+'''
+
+
+class ModuleImportTime(TypedDict):
+    module: str
+    self_us: int
+    cumulative_us: int
+    # How many imports deep this module was first imported.
+    depth: int
+
+
+class StartupProfile(TypedDict):
+    wall_time_s: float
+    modules: list[ModuleImportTime]
+
+
+def parse_import_times(report: str) -> list[ModuleImportTime]:
+    """
+    Returns the modules in a "-X importtime" report in the order they
+    finished importing. Lines that aren't part of the report are
+    ignored.
+    """
+    modules: list[ModuleImportTime] = []
+    for line in report.splitlines():
+        match = _IMPORT_TIME_LINE_RE.match(line)
+        if match is None:
+            continue
+        modules.append({
+            'module': match['module'],
+            'self_us': int(match['self']),
+            'cumulative_us': int(match['cumulative']),
+            'depth': len(match['indent']) // 2,
+        })
+    return modules
+
+
+def totals_by_package(modules: list[ModuleImportTime]) -> dict[str, int]:
+    """
+    Returns the total self time in microseconds of each top-level
+    package's modules, most expensive first.
+    """
+    totals: dict[str, int] = defaultdict(int)
+    for module in modules:
+        totals[module['module'].split('.')[0]] += module['self_us']
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def measure_startup() -> StartupProfile:
+    """
+    Runs _STARTUP_SCRIPT in a new process using the current settings
+    module and environment.
+    """
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get(
+        'DJANGO_SETTINGS_MODULE', 'vdgsa_backend.settings'))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _STARTUP_SCRIPT],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        # The report comes first and the traceback is at the end.
+        raise RuntimeError(f'Starting the app failed:\n{result.stderr[-5000:]}')
+
+    return {
+        'wall_time_s': float(result.stdout.strip().splitlines()[-1]),
+        'modules': parse_import_times(result.stderr),
+    }
@@ -0,0 +1,61 @@
+"""
+Contains InstrumentationMiddleware, which times each request and
+records its database queries for:
+    - the Prometheus metrics (see vdgsa_backend/metrics.py)
+    - the query budget headers and log (see vdgsa_backend/query_budget.py)
+    - the slow query log (see vdgsa_backend/slow_queries.py)
+
+All three share one query_budget.QueryStats, so each query is wrapped
+and timed once.
+"""
+
+from __future__ import annotations
+
+import functools
+import time
+from typing import Callable
+
+from django.conf import settings
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+
+from vdgsa_backend.metrics import observe_request
+from vdgsa_backend.query_budget import QueryStats, log_if_over_budget
+from vdgsa_backend.slow_queries import record_slow_query
+from vdgsa_backend.streaming import when_content_done
+
+
+class InstrumentationMiddleware:
+    """
+    Install this right after AccessLogMiddleware in settings.MIDDLEWARE,
+    so that the slow queries and query budget summaries it logs get the
+    request's id, and so that the time and queries spent in the rest of
+    the middleware (e.g. loading the session and user) count too.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponseBase]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        stats = QueryStats(
+            track_shapes=settings.QUERY_BUDGET_ENABLED,
+            on_slow_query=functools.partial(record_slow_query, request=request),
+        )
+        start = time.perf_counter()
+        with stats.record():
+            response = self.get_response(request)
+
+        # Streaming responses keep querying after this returns, too
+        # late for headers.
+        if (settings.QUERY_BUDGET_ENABLED and settings.QUERY_BUDGET_HEADERS
+                and not response.streaming):
+            response['X-Query-Count'] = str(stats.count)
+            response['X-Query-Time-Ms'] = f'{stats.total_time_ms:.1f}'
+
+        def done() -> None:
+            elapsed = time.perf_counter() - start
+            observe_request(request, response, stats, elapsed)
+            if settings.QUERY_BUDGET_ENABLED:
+                log_if_over_budget(request, stats, elapsed)
+
+        return when_content_done(response, done, context=stats.record)
@@ -0,0 +1,131 @@
+"""
+Prometheus metrics for the site, served at /metrics:
+    - observe_request records each request's latency, response
+      status, and database query count and time, labeled by URL name.
+      InstrumentationMiddleware (see vdgsa_backend/instrumentation.py)
+      calls it.
+    - The membership email job and the Stripe webhooks update the
+      counters defined below.
+
+In production, uwsgi runs several worker processes (and cron jobs run
+in their own processes), so each process's metrics are written to
+files in the directory named by the PROMETHEUS_MULTIPROC_DIR
+environment variable, and metrics_view adds them up. That directory
+must be emptied before uwsgi starts (see deployment/prod/uwsgi.ini).
+Without that variable, as in development and tests, metrics are kept
+in memory.
+
+If settings.METRICS_TOKEN is set, only clients that send it in an
+"Authorization: Bearer" header can read /metrics. Otherwise, only
+clients whose address is in settings.METRICS_ALLOWED_IPS can. Behind
+nginx and Docker's port mapping every request comes from the same
+proxy address, so production should set METRICS_TOKEN. Everyone else
+gets a 404.
+"""
+
+from __future__ import annotations
+
+import hmac
+import ipaddress
+import os
+from typing import Final
+
+from django.conf import settings
+from django.http import Http404, HttpRequest, HttpResponse
+from django.http.response import HttpResponseBase
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+    multiprocess
+)
+
+from vdgsa_backend.query_budget import QueryStats
+
+# Requests that don't match a URL pattern (mostly 404s) share this
+# label, and unusual methods share "other", so that bots probing the
+# site can't create new series.
+UNRESOLVED_VIEW: Final = '<unresolved>'
+_METHODS: Final = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+
+REQUEST_LATENCY: Final = Histogram(
+    'vdgsa_request_duration_seconds',
+    'Time from the start of the request until the response was sent.',
+    ['view', 'method'],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+RESPONSES: Final = Counter(
+    'vdgsa_responses',
+    'Responses sent, by status code.',
+    ['view', 'method', 'status'],
+)
+REQUEST_QUERIES: Final = Histogram(
+    'vdgsa_request_db_queries',
+    'Database queries made per request.',
+    ['view'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+)
+REQUEST_QUERY_TIME: Final = Histogram(
+    'vdgsa_request_db_query_duration_seconds',
+    'Time spent running database queries per request.',
+    ['view'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+
+MEMBERSHIP_EMAILS_SENT: Final = Counter(
+    'vdgsa_membership_emails_sent',
+    'Membership expiration emails sent by the membership email job.',
+    ['job'],
+)
+MEMBERSHIP_EMAIL_JOB_RUNS: Final = Counter(
+    'vdgsa_membership_email_job_runs',
+    'Runs of the membership email job, by whether they finished.',
+    ['outcome'],
+)
+MEMBERSHIP_EMAIL_JOB_LAST_SUCCESS: Final = Gauge(
+    'vdgsa_membership_email_job_last_success_timestamp_seconds',
+    'When the membership email job last finished without an error.',
+    multiprocess_mode='max',
+)
+
+STRIPE_WEBHOOK_EVENTS: Final = Counter(
+    'vdgsa_stripe_webhook_events',
+    'Stripe webhook events received, by what was done with them.',
+    ['webhook', 'event_type', 'outcome'],
+)
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    if not _is_allowed(request):
+        raise Http404
+
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return HttpResponse(generate_latest(registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def _is_allowed(request: HttpRequest) -> bool:
+    if settings.METRICS_TOKEN:
+        authorization = request.META.get('HTTP_AUTHORIZATION', '')
+        return hmac.compare_digest(
+            authorization.encode(), f'Bearer {settings.METRICS_TOKEN}'.encode())
+
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network) for network in settings.METRICS_ALLOWED_IPS)
+
+
+def observe_request(
+    request: HttpRequest, response: HttpResponseBase, stats: QueryStats, elapsed: float
+) -> None:
+    resolver_match = getattr(request, 'resolver_match', None)
+    view = resolver_match.view_name if resolver_match is not None else UNRESOLVED_VIEW
+    method = request.method if request.method in _METHODS else 'other'
+    REQUEST_LATENCY.labels(view, method).observe(elapsed)
+    RESPONSES.labels(view, method, str(response.status_code)).inc()
+    REQUEST_QUERIES.labels(view).observe(stats.count)
+    REQUEST_QUERY_TIME.labels(view).observe(stats.total_time)
@@ -0,0 +1,330 @@
+"""
+Contains tools that let staff profile individual requests on the
+production site:
+    - ProfilingMiddleware runs a request under cProfile when a staff
+      user adds the PROFILE_QUERY_PARAM query parameter to its URL or
+      has the PROFILE_COOKIE cookie set (ProfileCookieView turns it on
+      and off). Streaming responses (e.g. CSV exports) are profiled
+      until their last chunk has been produced.
+    - Each profile is saved under settings.MEDIA_ROOT /
+      PROFILE_DIR_NAME as a pstats file (open it with
+      "python -m pstats" or snakeviz), a collapsed-stack file for
+      flame graph tools (flamegraph.pl, speedscope), and a JSON file
+      describing the request. Profiles older than
+      settings.PROFILE_MAX_AGE_DAYS or beyond the newest
+      settings.PROFILE_MAX_COUNT are deleted each time one is saved.
+    - ProfileListView lists the saved profiles for staff, and
+      ProfileDownloadView sends their files.
+
+Requests without the switch only pay for checking it, and the
+middleware isn't installed at all unless settings.PROFILING_ENABLED is
+set.
+
+cProfile only records which function called which, not whole stacks,
+so the collapsed stacks come from StackSampler instead, which records
+the request thread's stack every SAMPLE_INTERVAL seconds while
+cProfile runs. Requests much shorter than that may have no samples.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import datetime
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from types import FrameType
+from typing import Any, Callable, Final, Iterator, TypedDict
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import Http404, HttpRequest, HttpResponse, HttpResponseRedirect
+from django.http.response import HttpResponseBase
+from django.urls import reverse
+from django.utils import timezone
+from django.views.generic.base import TemplateView, View
+
+from vdgsa_backend.protected_files import serve_protected_media
+
+PROFILE_QUERY_PARAM: Final = '_profile'
+PROFILE_COOKIE: Final = 'vdgsa_profile'
+PROFILE_DIR_NAME: Final = 'profiles'
+
+PSTATS_SUFFIX: Final = '.prof'
+COLLAPSED_SUFFIX: Final = '.collapsed'
+INFO_SUFFIX: Final = '.json'
+_SUFFIXES: Final = [PSTATS_SUFFIX, COLLAPSED_SUFFIX, INFO_SUFFIX]
+
+# Profile names are made by _new_profile_name, e.g.
+# "20240101-120000-list-conclaves-1a2b3c4d".
+_PROFILE_NAME_RE: Final = re.compile(r'^\d{8}-\d{6}-[\w-]+-[0-9a-f]{8}$')
+_UNSAFE_NAME_CHARS_RE: Final = re.compile(r'[^\w-]+')
+
+SAMPLE_INTERVAL: Final = 0.002
+
+
+class ProfileInfo(TypedDict):
+    name: str
+    method: str
+    path: str
+    view: str
+    user: str
+    status_code: int
+    duration_ms: float
+    num_samples: int
+    created_at: str
+
+
+def profile_dir() -> Path:
+    return Path(settings.MEDIA_ROOT) / PROFILE_DIR_NAME
+
+
+def list_profiles() -> list[ProfileInfo]:
+    """The saved profiles, newest first."""
+    profiles = []
+    for info_path in profile_dir().glob(f'*{INFO_SUFFIX}'):
+        try:
+            profiles.append(json.loads(info_path.read_text()))
+        except (OSError, ValueError):
+            # Deleted by another process or only partly written.
+            continue
+    return sorted(profiles, key=lambda profile: profile['name'], reverse=True)
+
+
+def prune_profiles() -> None:
+    """
+    Deletes profiles older than settings.PROFILE_MAX_AGE_DAYS, then the
+    oldest until at most settings.PROFILE_MAX_COUNT are left.
+    """
+    names = sorted(
+        {path.name[:-len(suffix)] for suffix in _SUFFIXES
+         for path in profile_dir().glob(f'*{suffix}')},
+        reverse=True)
+    cutoff = (
+        timezone.now() - datetime.timedelta(days=settings.PROFILE_MAX_AGE_DAYS)
+    ).strftime('%Y%m%d-%H%M%S')
+    for index, name in enumerate(names):
+        if index >= settings.PROFILE_MAX_COUNT or name[:15] < cutoff:
+            for suffix in _SUFFIXES:
+                (profile_dir() / (name + suffix)).unlink(missing_ok=True)
+
+
+class StackSampler:
+    """
+    Counts how often each stack is seen in the thread that created
+    this, by looking at it from a background thread every
+    SAMPLE_INTERVAL seconds while sampling is on.
+    """
+
+    def __init__(self) -> None:
+        self.counts: Counter[str] = Counter()
+        self._thread_id = threading.get_ident()
+        self._sampling = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @contextmanager
+    def sample(self) -> Iterator[None]:
+        self._sampling.set()
+        try:
+            yield
+        finally:
+            self._sampling.clear()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._sampling.set()
+        self._thread.join()
+
+    def collapsed_stacks(self) -> list[str]:
+        """
+        Returns the samples as lines of "outer;...;inner count", the
+        format flame graph tools read.
+        """
+        return [f'{stack} {count}' for stack, count in self.counts.most_common()]
+
+    def _run(self) -> None:
+        while self._sampling.wait() and not self._stopped.wait(SAMPLE_INTERVAL):
+            if not self._sampling.is_set():
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self.counts[_stack_key(frame)] += 1
+            # Don't keep the request's frames alive until the next sample.
+            del frame
+
+
+def _stack_key(frame: FrameType | None) -> str:
+    labels = []
+    while frame is not None:
+        code = frame.f_code
+        filename = os.path.basename(code.co_filename)
+        labels.append(f'{code.co_name} ({filename}:{code.co_firstlineno})')
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+def _new_profile_name(request: HttpRequest) -> str:
+    resolver_match = getattr(request, 'resolver_match', None)
+    view = resolver_match.view_name if resolver_match is not None else 'unresolved'
+    view = _UNSAFE_NAME_CHARS_RE.sub('_', view)[:50]
+    return f'{timezone.now():%Y%m%d-%H%M%S}-{view}-{uuid.uuid4().hex[:8]}'
+
+
+class _RequestProfile:
+    def __init__(self, request: HttpRequest) -> None:
+        self.request = request
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler()
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def run(self) -> Iterator[None]:
+        with self.sampler.sample():
+            self.profiler.enable()
+            try:
+                yield
+            finally:
+                self.profiler.disable()
+
+    def discard(self) -> None:
+        self.sampler.stop()
+
+    def save(self, response: HttpResponseBase) -> None:
+        duration = time.perf_counter() - self.start
+        self.sampler.stop()
+
+        name = _new_profile_name(self.request)
+        directory = profile_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        self.profiler.dump_stats(directory / (name + PSTATS_SUFFIX))
+        (directory / (name + COLLAPSED_SUFFIX)).write_text(
+            ''.join(line + '\n' for line in self.sampler.collapsed_stacks()))
+
+        resolver_match = getattr(self.request, 'resolver_match', None)
+        info: ProfileInfo = {
+            'name': name,
+            'method': self.request.method or '',
+            'path': self.request.get_full_path(),
+            'view': resolver_match.view_name if resolver_match is not None else '',
+            'user': self.request.user.get_username(),  # type: ignore
+            'status_code': response.status_code,
+            'duration_ms': duration * 1000,
+            'num_samples': sum(self.sampler.counts.values()),
+            'created_at': timezone.now().isoformat(),
+        }
+        # Written last, since list_profiles only shows profiles that have one.
+        (directory / (name + INFO_SUFFIX)).write_text(json.dumps(info))
+
+        prune_profiles()
+
+
+def _wants_profile(request: HttpRequest) -> bool:
+    if PROFILE_QUERY_PARAM not in request.GET and not request.COOKIES.get(PROFILE_COOKIE):
+        return False
+    return request.user.is_staff  # type: ignore
+
+
+class ProfilingMiddleware:
+    """
+    Install this after AuthenticationMiddleware in settings.MIDDLEWARE,
+    since only staff can turn profiling on.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponseBase]) -> None:
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        if not _wants_profile(request):
+            return self.get_response(request)
+
+        profile = _RequestProfile(request)
+        try:
+            with profile.run():
+                response = self.get_response(request)
+        except BaseException:
+            profile.discard()
+            raise
+
+        if response.streaming:
+            response.streaming_content = self._profile_stream(  # type: ignore
+                response.streaming_content, profile, response)  # type: ignore
+        else:
+            profile.save(response)
+        return response
+
+    def _profile_stream(
+        self, content: Iterator[bytes], profile: _RequestProfile, response: HttpResponseBase
+    ) -> Iterator[bytes]:
+        # Only profile producing each chunk, not the server sending it.
+        content = iter(content)
+        finished = False
+        try:
+            while True:
+                with profile.run():
+                    chunk = next(content, None)
+                if chunk is None:
+                    break
+                yield chunk
+            finished = True
+        finally:
+            if finished:
+                profile.save(response)
+            else:
+                profile.discard()
+
+
+class _StaffOnlyMixin(LoginRequiredMixin, UserPassesTestMixin):
+    def test_func(self) -> bool:
+        return self.request.user.is_staff  # type: ignore
+
+
+class ProfileListView(_StaffOnlyMixin, TemplateView):
+    """List the saved request profiles"""
+    template_name = 'profiles.html'
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['profiles'] = list_profiles()
+        context['profiling_enabled'] = settings.PROFILING_ENABLED
+        context['cookie_is_set'] = bool(self.request.COOKIES.get(PROFILE_COOKIE))
+        context['query_param'] = PROFILE_QUERY_PARAM
+        context['max_count'] = settings.PROFILE_MAX_COUNT
+        context['max_age_days'] = settings.PROFILE_MAX_AGE_DAYS
+        return context
+
+
+class ProfileDownloadView(_StaffOnlyMixin, View):
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        filename = self.kwargs['filename']
+        name, suffix = os.path.splitext(filename)
+        if not _PROFILE_NAME_RE.match(name) or suffix not in _SUFFIXES:
+            raise Http404('No such profile')
+        response = serve_protected_media(request, f'{PROFILE_DIR_NAME}/{filename}', max_age=0)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class ProfileCookieView(_StaffOnlyMixin, View):
+    """Turn profiling of all of the current user's requests on or off"""
+
+    def post(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        response = HttpResponseRedirect(reverse('profiles'))
+        if request.POST.get('enable'):
+            response.set_cookie(
+                PROFILE_COOKIE, '1', max_age=60 * 60, secure=request.is_secure(),
+                httponly=True, samesite='Lax')
+        else:
+            response.delete_cookie(PROFILE_COOKIE)
+        return response
@@ -0,0 +1,171 @@
+"""
+Contains serve_protected_file, which sends an uploaded file to the
+client once the calling view has checked the user's permissions, and
+serve_protected_media, which does the same for any file under
+MEDIA_ROOT given its name.
+
+If settings.PROTECTED_FILE_OFFLOAD is set, the response only holds a
+header that tells the front server which file to send, so the transfer
+doesn't tie up one of our few app workers:
+    - 'nginx': X-Accel-Redirect to PROTECTED_FILE_ACCEL_PREFIX plus the
+      file's name. nginx must map that prefix to MEDIA_ROOT in an
+      "internal" location.
+    - 'uwsgi': X-Sendfile with the file's path, which uwsgi.ini routes
+      to uwsgi's static file offloading.
+Otherwise, Django streams the file itself. Either way, responses
+support conditional GET and single byte ranges.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import re
+from typing import Final, Iterator
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db.models.fields.files import FieldFile
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+
+_RANGE_RE: Final = re.compile(r'^bytes=(\d*)-(\d*)$')
+_CHUNK_SIZE: Final = 64 * 1024
+
+
+class _RangeNotSatisfiable(Exception):
+    pass
+
+
+def serve_protected_file(
+    request: HttpRequest, field_file: FieldFile, *, max_age: int = 3600
+) -> HttpResponseBase:
+    """
+    Returns a response that sends field_file's contents, or raises
+    Http404 if there is no such file. Responses may be cached by the
+    user's browser (but not shared caches) for max_age seconds, after
+    which the browser revalidates with the file's ETag.
+    """
+    if not field_file:
+        raise Http404('No file')
+    return _serve(request, field_file.name, field_file.path, max_age=max_age)
+
+
+def serve_protected_media(
+    request: HttpRequest, name: str, *, max_age: int = 3600
+) -> HttpResponseBase:
+    """
+    Like serve_protected_file, for the file at name relative to
+    MEDIA_ROOT. name must not come from the user unchecked.
+    """
+    return _serve(request, name, os.path.join(settings.MEDIA_ROOT, name), max_age=max_age)
+
+
+def _serve(request: HttpRequest, name: str, path: str, *, max_age: int) -> HttpResponseBase:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        raise Http404('File not found')
+
+    etag = quote_etag(f'{int(stat.st_mtime):x}-{stat.st_size:x}')
+    last_modified = int(stat.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        if settings.PROTECTED_FILE_OFFLOAD == 'nginx':
+            response = HttpResponse(content_type=content_type)
+            response['X-Accel-Redirect'] = (
+                settings.PROTECTED_FILE_ACCEL_PREFIX + quote(name))
+        elif settings.PROTECTED_FILE_OFFLOAD == 'uwsgi':
+            response = HttpResponse(content_type=content_type)
+            response['X-Sendfile'] = path
+        else:
+            response = _stream_file(request, path, stat.st_size, content_type, etag, last_modified)
+
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, max_age=max_age)
+    return response
+
+
+def _stream_file(
+    request: HttpRequest,
+    path: str,
+    size: int,
+    content_type: str,
+    etag: str,
+    last_modified: int,
+) -> HttpResponseBase:
+    try:
+        byte_range = _get_byte_range(request, size, etag, last_modified)
+    except _RangeNotSatisfiable:
+        response: HttpResponseBase = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(path, start, end), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+def _get_byte_range(
+    request: HttpRequest, size: int, etag: str, last_modified: int
+) -> tuple[int, int] | None:
+    """
+    Returns the first and last byte of the range requested in the
+    Range header, or None if the whole file should be sent. Multiple
+    ranges aren't supported, and those requests get the whole file.
+    """
+    range_header = request.META.get('HTTP_RANGE', '').strip()
+    if not range_header:
+        return None
+
+    # If-Range means "send the range if the file hasn't changed,
+    # otherwise send the whole file".
+    if_range = request.META.get('HTTP_IF_RANGE', '').strip()
+    if if_range and if_range != etag and parse_http_date_safe(if_range) != last_modified:
+        return None
+
+    match = _RANGE_RE.match(range_header)
+    if match is None:
+        return None
+
+    start, end = match.groups()
+    if not start:
+        if not end:
+            return None
+        # "bytes=-N" means the last N bytes.
+        suffix_length = int(end)
+        if suffix_length == 0 or size == 0:
+            raise _RangeNotSatisfiable
+        return max(size - suffix_length, 0), size - 1
+
+    first = int(start)
+    if first >= size:
+        raise _RangeNotSatisfiable
+    last = min(int(end), size - 1) if end else size - 1
+    if last < first:
+        return None
+    return first, last
+
+
+def _read_range(path: str, start: int, end: int) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(_CHUNK_SIZE, remaining))
+            if not chunk:
+                return
+            remaining -= len(chunk)
+            yield chunk
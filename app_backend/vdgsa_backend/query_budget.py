@@ -0,0 +1,147 @@
+"""
+Contains tools for keeping the number of SQL queries per request in
+check:
+    - QueryStats counts the queries made while it's recording and how
+      long they take. InstrumentationMiddleware (see
+      vdgsa_backend/instrumentation.py) records each request with one.
+      If settings.QUERY_BUDGET_ENABLED is set, it adds X-Query-Count
+      and X-Query-Time-Ms headers to responses if
+      settings.QUERY_BUDGET_HEADERS is set, and logs a summary
+      (including the most repeated queries, which is where N+1
+      problems show up) for slow or query-heavy requests.
+    - QueryBudgetTestMixin.assertQueryBudget fails a test if the code
+      under it makes more than a given number of queries.
+
+Queries are grouped by "shape": the SQL with the selected columns,
+numbers, quoted strings, and lists of parameters collapsed, so that
+the same query run for each row of a page counts as one shape.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Final, Iterator
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest
+
+logger = logging.getLogger(__name__)
+
+# How many of the most repeated shapes to show in logs and test failures.
+NUM_TOP_SHAPES: Final = 5
+
+_SHAPE_SUBSTITUTIONS: Final = [
+    (re.compile(r'^SELECT\s.*?\sFROM\s', re.DOTALL), 'SELECT ... FROM '),
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'%s'), '?'),
+    (re.compile(r'\?(?:\s*,\s*\?)+'), '?, ...'),
+    (re.compile(r'\s+'), ' '),
+]
+
+
+def query_shape(sql: str) -> str:
+    for pattern, replacement in _SHAPE_SUBSTITUTIONS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class QueryStats:
+    """
+    Records the queries made on every database connection while
+    record() is active. Pass track_shapes=False to only count and time
+    them, which is cheaper.
+
+    on_slow_query, if given, is called with the SQL, parameters, "many"
+    flag, and duration in ms of each query that takes at least
+    settings.SLOW_QUERY_THRESHOLD_MS (see slow_queries.record_slow_query).
+    """
+
+    def __init__(
+        self,
+        *,
+        track_shapes: bool = True,
+        on_slow_query: Callable[[str, Any, bool, float], None] | None = None,
+    ) -> None:
+        self.count = 0
+        self.total_time = 0.0
+        self.track_shapes = track_shapes
+        self.shapes: Counter[str] = Counter()
+        self.on_slow_query = on_slow_query
+
+    @contextmanager
+    def record(self) -> Iterator[QueryStats]:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self._execute))
+            yield self
+
+    def _execute(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict[str, Any],
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.total_time += duration
+            if self.track_shapes:
+                self.shapes[query_shape(sql)] += 1
+            if (self.on_slow_query is not None
+                    and duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS):
+                self.on_slow_query(sql, params, many, duration * 1000)
+
+    @property
+    def total_time_ms(self) -> float:
+        return self.total_time * 1000
+
+    def top_shapes(self, num_shapes: int = NUM_TOP_SHAPES) -> list[tuple[str, int]]:
+        """The most repeated query shapes and how many times each ran."""
+        return [(shape, count) for shape, count in self.shapes.most_common(num_shapes)
+                if count > 1]
+
+    def summary(self) -> str:
+        lines = [f'{self.count} queries in {self.total_time_ms:.1f} ms']
+        lines += [f'  {count}x {shape}' for shape, count in self.top_shapes()]
+        return '\n'.join(lines)
+
+
+def log_if_over_budget(request: HttpRequest, stats: QueryStats, elapsed: float) -> None:
+    """
+    Logs a summary of stats if the request took at least
+    settings.QUERY_BUDGET_SLOW_REQUEST_MS or made at least
+    settings.QUERY_BUDGET_MAX_QUERIES queries.
+    """
+    if (elapsed * 1000 < settings.QUERY_BUDGET_SLOW_REQUEST_MS
+            and stats.count < settings.QUERY_BUDGET_MAX_QUERIES):
+        return
+    logger.warning(
+        '%s %s took %.1f ms, %s',
+        request.method, request.path, elapsed * 1000, stats.summary())
+
+
+class QueryBudgetTestMixin:
+    """
+    For TestCase classes. Unlike assertNumQueries, the budget is a
+    maximum, so that a view can get cheaper without breaking its test,
+    and a failure lists the repeated queries.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries: int) -> Iterator[QueryStats]:
+        with QueryStats().record() as stats:
+            yield stats
+        if stats.count > max_queries:
+            self.fail(  # type: ignore
+                f'Expected at most {max_queries} queries, got {stats.summary()}')
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class RentalViolsConfig(AppConfig):
     name = 'vdgsa_backend.rental_viols'
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
@@ -0,0 +1,122 @@
+"""
+Contains operations that keep the CurrentRental projection in sync
+with RentalHistory.
+
+Call these inside the same transaction that writes the corresponding
+RentalHistory entry so that the two never disagree.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Final
+
+from django.db import transaction
+from django.db.models import QuerySet
+
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent, RentalState
+from vdgsa_backend.rental_viols.models import CurrentRental, RentalHistory, Viol
+
+# RentalHistory events that start a rental period.
+RENTAL_EVENTS: Final = [RentalEvent.rented, RentalEvent.renewed]
+
+
+def start_rental(history: RentalHistory) -> CurrentRental:
+    """
+    Makes history, a "rented" or "renewed" entry, the current rental
+    for its viol.
+    """
+    current_rental, _ = CurrentRental.objects.update_or_create(
+        viol=history.viol_num,
+        defaults={
+            'renter': history.renter_num,
+            'rental_start': history.rental_start,
+            'rental_end': history.rental_end,
+            'rental': history,
+            'contract': history.contract_scan,
+        }
+    )
+    return current_rental
+
+
+def end_rental(viol: Viol) -> None:
+    CurrentRental.objects.filter(viol=viol).delete()
+
+
+def sync_rental(history: RentalHistory) -> None:
+    """
+    Copies edits to history (e.g. new dates or an uploaded contract)
+    to the current rental if history is the entry it came from.
+    """
+    CurrentRental.objects.filter(rental=history).update(
+        rental_start=history.rental_start,
+        rental_end=history.rental_end,
+        contract=history.contract_scan,
+    )
+
+
+def get_overdue_rentals(today: datetime.date | None = None) -> QuerySet[CurrentRental]:
+    if today is None:
+        today = datetime.date.today()
+    return CurrentRental.objects.filter(rental_end__lt=today).select_related('viol', 'renter')
+
+
+def rederive_rental(viol: Viol) -> CurrentRental | None:
+    """
+    Replaces viol's current rental with the one its RentalHistory
+    entries say is still out, e.g. after one of them was soft-deleted.
+    Returns the new current rental, if any.
+    """
+    end_rental(viol)
+    entry = _still_out(RentalHistory.objects.filter(viol_num=viol)).get(viol.pk)
+    if entry is None:
+        return None
+    return start_rental(entry)
+
+
+def rebuild_current_rentals() -> int:
+    """
+    Replaces the contents of CurrentRental with the rentals that
+    RentalHistory says are still out: the most recent "rented" or
+    "renewed" entry for each viol that hasn't been followed by a
+    "returned" entry. Returns the number of current rentals.
+    """
+    current = _still_out(RentalHistory.objects.filter(viol_num__isnull=False))
+
+    with transaction.atomic():
+        CurrentRental.objects.all().delete()
+        CurrentRental.objects.bulk_create([
+            CurrentRental(
+                viol_id=entry.viol_num_id,
+                renter_id=entry.renter_num_id,
+                rental_start=entry.rental_start,
+                rental_end=entry.rental_end,
+                rental_id=entry.entry_num,
+                contract_id=entry.contract_scan_id,
+            )
+            for entry in current.values()
+        ])
+
+    return len(current)
+
+
+def _still_out(history: QuerySet[RentalHistory]) -> dict[int, RentalHistory]:
+    """
+    Replays the entries in history that haven't been soft-deleted and
+    returns the "rented" or "renewed" entry still out for each viol,
+    keyed by viol id.
+    """
+    current: dict[int, RentalHistory] = {}
+    history = history.filter(
+        event__in=[*RENTAL_EVENTS, RentalEvent.returned],
+    ).exclude(
+        status=RentalState.deleted
+    ).order_by('created_at', 'entry_num')
+
+    for entry in history.iterator():
+        if entry.event == RentalEvent.returned:
+            current.pop(entry.viol_num_id, None)
+        elif entry.renter_num_id is not None:
+            current[entry.viol_num_id] = entry
+
+    return current
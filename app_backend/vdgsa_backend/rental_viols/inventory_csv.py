@@ -0,0 +1,267 @@
+"""
+Contains bulk CSV import and export of rental viols, bows, and cases.
+
+Imports are all-or-nothing: every row is validated before anything is
+written, and the new items get a contiguous block of VdGSA numbers
+and a "New" RentalHistory entry each in a single transaction.
+
+Exported files can be edited and imported again. Columns that imports
+don't use (e.g. vdgsa_number, status, renter) are ignored.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+from typing import Any, ClassVar, Final, Iterable, Iterator, Type, TypedDict
+
+from django import forms
+from django.db import transaction
+from django.db.models import Model, QuerySet
+from django.db.models.functions import Lower
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.inventory_summary import invalidate_inventory_summary
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent, RentalState
+from vdgsa_backend.rental_viols.models import Bow, Case, ItemType, RentalHistory, Viol
+
+_IMPORT_FIELDS: Final = [
+    'maker',
+    'size',
+    'value',
+    'provenance',
+    'description',
+    'accession_date',
+    'notes',
+    'program',
+]
+
+# Viols list the VdGSA numbers of their bows and cases, and bows and
+# cases list the VdGSA number of the viol they're attached to.
+_EXPORT_COLUMNS: Final = {
+    ItemType.viol: [
+        'vdgsa_number', 'maker', 'size', 'strings', 'status', 'value', 'program',
+        'provenance', 'description', 'accession_date', 'notes', 'custodian',
+        'bows', 'cases', 'renter', 'rental_end',
+    ],
+    ItemType.bow: [
+        'vdgsa_number', 'maker', 'size', 'status', 'value', 'program',
+        'provenance', 'description', 'accession_date', 'notes', 'custodian', 'attached_to',
+    ],
+    ItemType.case: [
+        'vdgsa_number', 'maker', 'size', 'status', 'value', 'program',
+        'provenance', 'description', 'accession_date', 'notes', 'custodian', 'attached_to',
+    ],
+}
+
+
+class _ImportRowForm(forms.ModelForm):
+    # The custodian's email address.
+    custodian = forms.EmailField(required=False)
+
+    # Blank values in other columns get the model's default.
+    required_fields: ClassVar[list[str]] = ['size']
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        for name, field in self.fields.items():
+            field.required = name in self.required_fields
+
+
+class _ViolImportRowForm(_ImportRowForm):
+    required_fields = ['size', 'strings']
+
+    class Meta:
+        model = Viol
+        fields = _IMPORT_FIELDS + ['strings']
+
+
+class _BowImportRowForm(_ImportRowForm):
+    class Meta:
+        model = Bow
+        fields = _IMPORT_FIELDS
+
+
+class _CaseImportRowForm(_ImportRowForm):
+    class Meta:
+        model = Case
+        fields = _IMPORT_FIELDS
+
+
+_IMPORT_FORMS: Final[dict[str, Type[_ImportRowForm]]] = {
+    ItemType.viol: _ViolImportRowForm,
+    ItemType.bow: _BowImportRowForm,
+    ItemType.case: _CaseImportRowForm,
+}
+
+_MODELS: Final[dict[str, Type[Model]]] = {
+    ItemType.viol: Viol,
+    ItemType.bow: Bow,
+    ItemType.case: Case,
+}
+
+# The RentalHistory field that refers to each type of item.
+_HISTORY_FIELDS: Final = {
+    ItemType.viol: 'viol_num',
+    ItemType.bow: 'bow_num',
+    ItemType.case: 'case_num',
+}
+
+
+class InventoryImportError(TypedDict):
+    # Line number in the file, counting the header as line 1.
+    line: int
+    message: str
+
+
+class InventoryImportResult(TypedDict):
+    errors: list[InventoryImportError]
+    # The VdGSA numbers given to the imported items, or empty if there
+    # were any errors.
+    vdgsa_numbers: list[int]
+
+
+def import_inventory_csv(item_type: str, csv_file: Iterable[str]) -> InventoryImportResult:
+    """
+    Creates a viol, bow, or case (per item_type) for each row of
+    csv_file. If any row is invalid, nothing is created and the
+    returned result lists every problem found.
+    """
+    form_class = _IMPORT_FORMS[item_type]
+    model = _MODELS[item_type]
+
+    reader = csv.DictReader(csv_file)
+    errors: list[InventoryImportError] = []
+    if reader.fieldnames is None:
+        return {'errors': [{'line': 1, 'message': 'The file is empty.'}], 'vdgsa_numbers': []}
+
+    missing_columns = [
+        name for name in form_class.required_fields if name not in reader.fieldnames]
+    if missing_columns:
+        return {
+            'errors': [{
+                'line': 1, 'message': 'Missing columns: ' + ', '.join(missing_columns)
+            }],
+            'vdgsa_numbers': [],
+        }
+
+    forms_by_line: dict[int, _ImportRowForm] = {}
+    for row in reader:
+        # Blank optional columns come through as '' and would otherwise
+        # override model defaults (e.g. "program").
+        data = {key: value.strip() for key, value in row.items() if key and value}
+        form = form_class(data)
+        if not form.is_valid():
+            errors += [
+                {'line': reader.line_num, 'message': f'{field}: {message}'}
+                for field, messages in form.errors.items()
+                for message in messages
+            ]
+        forms_by_line[reader.line_num] = form
+
+    if not forms_by_line and not errors:
+        errors.append({'line': 1, 'message': 'The file has no rows.'})
+
+    custodians = _get_custodians(
+        form.cleaned_data['custodian'] for form in forms_by_line.values()
+        if form.is_valid() and form.cleaned_data['custodian']
+    )
+    for line, form in forms_by_line.items():
+        if not form.is_valid():
+            continue
+        email = form.cleaned_data['custodian'].lower()
+        if email and email not in custodians:
+            errors.append({'line': line, 'message': f'custodian: No user with email {email}'})
+        form.instance.storer = custodians.get(email)
+
+    if errors:
+        return {'errors': errors, 'vdgsa_numbers': []}
+
+    items = [form.instance for form in forms_by_line.values()]
+    with transaction.atomic():
+        first_num = model.objects.lock_next_vdgsa_num()
+        for offset, item in enumerate(items):
+            item.vdgsa_number = first_num + offset
+        model.objects.bulk_create(items)
+        RentalHistory.objects.bulk_create([
+            RentalHistory(
+                **{_HISTORY_FIELDS[item_type]: item},
+                event=RentalEvent.new,
+                notes='Imported from CSV',
+            )
+            for item in items
+        ])
+
+    # bulk_create doesn't send the post_save signals that usually
+    # take care of this. See signals.on_inventory_item_changed.
+    transaction.on_commit(invalidate_inventory_summary)
+    return {'errors': [], 'vdgsa_numbers': [item.vdgsa_number for item in items]}
+
+
+def _get_custodians(emails: Iterable[str]) -> dict[str, User]:
+    lowered = {email.lower() for email in emails}
+    if not lowered:
+        return {}
+    users = User.objects.annotate(lower_username=Lower('username')).filter(
+        lower_username__in=lowered)
+    return {user.lower_username: user for user in users}
+
+
+def export_inventory_csv(item_type: str) -> Iterator[str]:
+    """
+    Yields the lines of a CSV file listing every viol, bow, or case
+    (per item_type) that hasn't been deleted.
+    """
+    columns = _EXPORT_COLUMNS[item_type]
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=columns)
+
+    def _flush() -> str:
+        line = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return line
+
+    writer.writeheader()
+    yield _flush()
+    for row in _export_rows(item_type):
+        writer.writerow(row)
+        yield _flush()
+
+
+def _export_rows(item_type: str) -> Iterator[dict[str, object]]:
+    items: QuerySet[Any] = _MODELS[item_type].objects.exclude(
+        status=RentalState.deleted
+    ).select_related('storer').order_by('vdgsa_number', 'pk')
+    if item_type == ItemType.viol:
+        items = items.select_related('current_rental__renter').prefetch_related(
+            'bows', 'cases')
+    else:
+        items = items.select_related('viol_num')
+
+    for item in items:
+        row: dict[str, object] = {
+            'vdgsa_number': item.vdgsa_number,
+            'maker': item.maker,
+            'size': item.size,
+            'status': item.status,
+            'value': item.value,
+            'program': item.program,
+            'provenance': item.provenance,
+            'description': item.description,
+            'accession_date': item.accession_date,
+            'notes': item.notes,
+            'custodian': item.storer.username if item.storer else '',
+        }
+        if item_type == ItemType.viol:
+            current_rental = getattr(item, 'current_rental', None)
+            row.update({
+                'strings': item.strings,
+                'bows': ' '.join(str(bow.vdgsa_number) for bow in item.bows.all()),
+                'cases': ' '.join(str(case.vdgsa_number) for case in item.cases.all()),
+                'renter': current_rental.renter.username if current_rental else '',
+                'rental_end': current_rental.rental_end if current_rental else '',
+            })
+        else:
+            row['attached_to'] = item.viol_num.vdgsa_number if item.viol_num else ''
+        yield row
@@ -0,0 +1,147 @@
+"""
+Contains the rental inventory summary: counts and total value of
+viols, bows, and cases grouped by size, status, and program.
+
+Each item type is summarized with a single GROUP BY query, and the
+result is cached until a Viol, Bow, or Case is saved or deleted (see
+vdgsa_backend.rental_viols.signals).
+"""
+
+from __future__ import annotations
+
+from decimal import Decimal
+from typing import Final, TypedDict
+
+from django.core.cache import cache
+from django.db.models import BooleanField, Count, ExpressionWrapper, Q, Sum
+
+from vdgsa_backend.rental_viols.managers.InstrumentManager import ViolSize
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalState
+from vdgsa_backend.rental_viols.models import Bow, Case, ItemType, Viol
+
+_CACHE_KEY: Final = 'rental_inventory_summary'
+
+
+class InventoryGroup(TypedDict):
+    size: str
+    status: str
+    program: str
+    # Whether the accessories in this group are attached to a viol.
+    # Always None for viols.
+    attached: bool | None
+    count: int
+    total_value: Decimal
+
+
+class InventorySummary(TypedDict):
+    viol: list[InventoryGroup]
+    bow: list[InventoryGroup]
+    case: list[InventoryGroup]
+
+
+class InventoryTableRow(TypedDict):
+    size: str
+    status_counts: list[int]
+    attached: int
+    unattached: int
+    total: int
+    total_value: Decimal
+
+
+class InventoryTable(TypedDict):
+    item_type: str
+    statuses: list[str]
+    rows: list[InventoryTableRow]
+
+
+def _summarize(model: type[Viol | Bow | Case]) -> list[InventoryGroup]:
+    queryset = model.objects.exclude(status=RentalState.deleted).order_by()
+    fields = ['size', 'status', 'program']
+    if model is not Viol:
+        queryset = queryset.annotate(attached=ExpressionWrapper(
+            Q(viol_num__isnull=False), output_field=BooleanField()))
+        fields.append('attached')
+
+    return [
+        {
+            'size': group['size'],
+            'status': group['status'],
+            'program': group['program'],
+            'attached': group.get('attached'),
+            'count': group['count'],
+            'total_value': group['total_value'] or Decimal(0),
+        }
+        for group in queryset.values(*fields).annotate(
+            count=Count('pk'), total_value=Sum('value')
+        ).order_by(*fields)
+    ]
+
+
+def build_inventory_summary() -> InventorySummary:
+    return {
+        ItemType.viol.value: _summarize(Viol),
+        ItemType.bow.value: _summarize(Bow),
+        ItemType.case.value: _summarize(Case),
+    }
+
+
+def get_inventory_summary() -> InventorySummary:
+    """
+    Returns the cached inventory summary, building it if needed.
+    """
+    summary = cache.get(_CACHE_KEY)
+    if summary is None:
+        summary = build_inventory_summary()
+        cache.set(_CACHE_KEY, summary, timeout=None)
+    return summary
+
+
+def invalidate_inventory_summary() -> None:
+    cache.delete(_CACHE_KEY)
+
+
+def make_inventory_tables(
+    summary: InventorySummary, program: str | None = None
+) -> list[InventoryTable]:
+    """
+    Rearranges summary into one table per item type with a row for
+    each size and a column for each status, for display on the
+    rentals home page. If program is given, only items in that
+    program are counted.
+    """
+    tables: list[InventoryTable] = []
+    for item_type in ItemType:
+        groups = [
+            group for group in summary[item_type.value]
+            if program is None or group['program'] == program
+        ]
+        present = {group['status'] for group in groups}
+        statuses = [
+            *[status.value for status in RentalState if status in present],
+            *sorted(present - set(RentalState)),
+        ]
+
+        sizes = {group['size'] for group in groups}
+        rows: list[InventoryTableRow] = []
+        for size in [*ViolSize, *sorted(sizes - set(ViolSize))]:
+            size_groups = [group for group in groups if group['size'] == size]
+            if not size_groups:
+                continue
+
+            status_counts = dict.fromkeys(statuses, 0)
+            for group in size_groups:
+                status_counts[group['status']] += group['count']
+            rows.append({
+                'size': size.label if isinstance(size, ViolSize) else size,
+                'status_counts': list(status_counts.values()),
+                'attached': sum(group['count'] for group in size_groups if group['attached']),
+                'unattached': sum(
+                    group['count'] for group in size_groups if group['attached'] is False),
+                'total': sum(group['count'] for group in size_groups),
+                'total_value': sum(
+                    (group['total_value'] for group in size_groups), Decimal(0)),
+            })
+
+        tables.append({'item_type': item_type.value, 'statuses': statuses, 'rows': rows})
+
+    return tables
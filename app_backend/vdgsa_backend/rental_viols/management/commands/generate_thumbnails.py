@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from vdgsa_backend.rental_viols.models import Image
+from vdgsa_backend.rental_viols.thumbnails import generate_thumbnail
+
+
+class Command(BaseCommand):
+    help = 'Generate thumbnails for rental images that are missing them.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Regenerate thumbnails for all images, not just those missing one.'
+        )
+
+    def handle(self, *args, **options):
+        images = Image.objects.exclude(image_file_name='').exclude(image_file_name__isnull=True)
+        if not options['all']:
+            images = images.filter(Q(thumb_file_name__isnull=True) | Q(thumb_file_name=''))
+
+        num_generated = 0
+        for image in images.order_by('picture_id').iterator():
+            try:
+                generate_thumbnail(image)
+                num_generated += 1
+            except OSError as e:
+                self.stderr.write(f'Image {image.picture_id} ({image.image_file_name}): {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'Generated {num_generated} thumbnails'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from vdgsa_backend.rental_viols.current_rentals import rebuild_current_rentals
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the current rentals table by replaying the rental history.'
+
+    def handle(self, *args, **options):
+        num_rentals = rebuild_current_rentals()
+        self.stdout.write(self.style.SUCCESS(f'Found {num_rentals} current rentals'))
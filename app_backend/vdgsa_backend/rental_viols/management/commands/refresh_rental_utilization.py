@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from vdgsa_backend.rental_viols.utilization import refresh_rental_utilization
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the rental utilization report from the rental history.'
+
+    def handle(self, *args, **options):
+        num_viols = refresh_rental_utilization()
+        self.stdout.write(self.style.SUCCESS(f'Summarized utilization of {num_viols} viols'))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from vdgsa_backend.rental_viols.rental_reminders import (
+    DEFAULT_DAYS_BEFORE_END, RentalReminderEmails
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Email renters whose rentals end soon or are overdue. '
+        'Reminders that have already been sent are skipped, so this can run daily.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=DEFAULT_DAYS_BEFORE_END,
+            help='Remind renters whose rentals end within this many days.'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help="List the reminders that would be sent, but don't send them."
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 0:
+            raise CommandError('--days must not be negative')
+
+        log = RentalReminderEmails(days_before_end=options['days']).run_job(
+            send=not options['dry_run'])
+        for line in log:
+            self.stdout.write(line)
+        verb = 'Would send' if options['dry_run'] else 'Sent'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {len(log)} rental reminders'))
@@ -1,8 +1,9 @@
 # type: ignore
 
-from django.db import models
+from django.db import connections, models
 from django.db.models import Count, Max, OuterRef, Q, Subquery
 from django.db.models.enums import TextChoices
+from django.db.transaction import TransactionManagementError
 from django.utils.translation import gettext_lazy as _
 
 from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import (
@@ -20,6 +21,29 @@ class ViolSize(TextChoices):
     other = 'other', _('Other')
 
 
+def _lock_next_vdgsa_num(manager):
+    """
+    Returns the number after the highest VdGSA number used by
+    manager's model. The table stays locked against writes until the
+    enclosing transaction ends, so the caller can insert rows using
+    this number and the ones after it without racing other adds.
+    """
+    connection = connections[manager.db]
+    if not connection.in_atomic_block:
+        raise TransactionManagementError(
+            'lock_next_vdgsa_num cannot be used outside of a transaction.')
+
+    with connection.cursor() as cursor:
+        # EXCLUSIVE mode still allows reads, but makes concurrent
+        # allocations wait for us to commit.
+        cursor.execute(
+            f'LOCK TABLE {connection.ops.quote_name(manager.model._meta.db_table)} '
+            'IN EXCLUSIVE MODE')
+    max_val = manager.model._base_manager.using(manager.db).aggregate(
+        Max('vdgsa_number')).get('vdgsa_number__max')
+    return (max_val or 0) + 1
+
+
 class AccessoryQuerySet(models.QuerySet):
 
     def get_all(self, size):
@@ -100,6 +124,9 @@ class AccessoryManager(models.Manager):
         maxVal = maxVal or 0
         return maxVal + 1
 
+    def lock_next_vdgsa_num(self):
+        return _lock_next_vdgsa_num(self)
+
     def get_all(self, size=None):
         return self.get_queryset().get_all(size=size)
 
@@ -113,6 +140,9 @@ class ViolManager(models.Manager):
         maxVal = maxVal or 0
         return maxVal + 1
 
+    def lock_next_vdgsa_num(self):
+        return _lock_next_vdgsa_num(self)
+
     def get_all(self, size=None):
         return self.get_queryset().get_all(size=size)
 
@@ -0,0 +1,65 @@
+# Generated by Django 3.2.25 on 2026-10-19 15:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def populate_current_rentals(apps, schema_editor):
+    """
+    Adds the rentals that RentalHistory says are still out: the most
+    recent "Rented" or "Renewed" entry for each viol that hasn't been
+    followed by a "Returned" entry. A copy of
+    current_rentals.rebuild_current_rentals as of this migration.
+    """
+    RentalHistory = apps.get_model('rental_viols', 'RentalHistory')
+    CurrentRental = apps.get_model('rental_viols', 'CurrentRental')
+
+    current = {}
+    history = RentalHistory.objects.filter(
+        viol_num__isnull=False,
+        event__in=['Rented', 'Renewed', 'Returned'],
+    ).exclude(
+        status='Deleted'
+    ).order_by('created_at', 'entry_num')
+
+    for entry in history.iterator():
+        if entry.event == 'Returned':
+            current.pop(entry.viol_num_id, None)
+        elif entry.renter_num_id is not None:
+            current[entry.viol_num_id] = entry
+
+    CurrentRental.objects.bulk_create([
+        CurrentRental(
+            viol_id=entry.viol_num_id,
+            renter_id=entry.renter_num_id,
+            rental_start=entry.rental_start,
+            rental_end=entry.rental_end,
+            rental_id=entry.entry_num,
+            contract_id=entry.contract_scan_id,
+        )
+        for entry in current.values()
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental_viols', '0008_auto_20230122_2105'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CurrentRental',
+            fields=[
+                ('viol', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='current_rental', serialize=False, to='rental_viols.viol')),
+                ('rental_start', models.DateField(blank=True, null=True)),
+                ('rental_end', models.DateField(blank=True, db_index=True, null=True)),
+                ('contract', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='rental_viols.rentalcontract')),
+                ('rental', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='rental_viols.rentalhistory')),
+                ('renter', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='current_rentals', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(populate_current_rentals, migrations.RunPython.noop),
+    ]
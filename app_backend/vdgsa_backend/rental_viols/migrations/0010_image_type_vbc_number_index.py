@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 15:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental_viols', '0009_currentrental'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='image',
+            index=models.Index(fields=['type', 'vbc_number'], name='rental_viol_type_618b77_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental_viols', '0010_image_type_vbc_number_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RentalReminder',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('reminder_type', models.CharField(choices=[('ending', 'Ending'), ('overdue', 'Overdue')], max_length=20)),
+                ('rental_end', models.DateField()),
+                ('sent_at', models.DateTimeField(auto_now_add=True)),
+                ('rental', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='rental_viols.rentalhistory')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('rental', 'reminder_type', 'rental_end'), name='unique_rental_reminder')],
+            },
+        ),
+    ]
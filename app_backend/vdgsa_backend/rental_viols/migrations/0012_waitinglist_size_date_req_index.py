@@ -0,0 +1,19 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental_viols', '0011_rentalreminder'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='waitinglist',
+            index=models.Index(fields=['size', 'date_req'], name='rental_viol_size_83706d_idx'),
+        ),
+    ]
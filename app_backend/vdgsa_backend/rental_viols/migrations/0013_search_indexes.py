@@ -0,0 +1,33 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental_viols', '0012_waitinglist_size_date_req_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='bow',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('maker', 'provenance', 'description', 'notes', config='english'), name='rental_viols_bow_search'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('maker', 'provenance', 'description', 'notes', config='english'), name='rental_viols_case_search'),
+        ),
+        migrations.AddIndex(
+            model_name='rentalhistory',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('notes', config='english'), name='rental_viols_history_search'),
+        ),
+        migrations.AddIndex(
+            model_name='viol',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.search.SearchVector('maker', 'provenance', 'description', 'notes', config='english'), name='rental_viols_viol_search'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 3.2.25 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rental_viols', '0013_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SizeUtilization',
+            fields=[
+                ('owned_days', models.PositiveIntegerField()),
+                ('rented_days', models.PositiveIntegerField()),
+                ('num_rentals', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('size', models.TextField(choices=[('pardessus', 'Pardessus'), ('treble', 'Treble'), ('alto', 'Alto'), ('tenor', 'Tenor'), ('bass', 'Bass'), ('seven-string bass', 'Seven-String Bass'), ('other', 'Other')], primary_key=True, serialize=False)),
+                ('num_viols', models.PositiveIntegerField()),
+                ('num_never_rented', models.PositiveIntegerField()),
+                ('num_waits', models.PositiveIntegerField()),
+                ('avg_wait_days', models.FloatField(blank=True, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='ViolUtilization',
+            fields=[
+                ('owned_days', models.PositiveIntegerField()),
+                ('rented_days', models.PositiveIntegerField()),
+                ('num_rentals', models.PositiveIntegerField()),
+                ('computed_at', models.DateTimeField()),
+                ('viol', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='utilization', serialize=False, to='rental_viols.viol')),
+                ('last_rented', models.DateField(blank=True, null=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -1,8 +1,11 @@
 # type: ignore
 from __future__ import annotations
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
 from django.db import models
 from django.db.models.enums import TextChoices
+from django.db.models.fields.files import FieldFile
 
 from vdgsa_backend.accounts.models import User
 from vdgsa_backend.rental_viols.managers.InstrumentManager import (
@@ -25,6 +28,21 @@ class ItemType(TextChoices):
     case = 'case'
 
 
+# Postgres can only use a full-text index if the query's tsvector
+# expression is exactly the indexed one, so the indexes below and
+# vdgsa_backend.rental_viols.search both build them with these.
+INSTRUMENT_SEARCH_FIELDS = ['maker', 'provenance', 'description', 'notes']
+SEARCH_CONFIG = 'english'
+
+
+def instrument_search_vector() -> SearchVector:
+    return SearchVector(*INSTRUMENT_SEARCH_FIELDS, config=SEARCH_CONFIG)
+
+
+def history_search_vector() -> SearchVector:
+    return SearchVector('notes', config=SEARCH_CONFIG)
+
+
 class RentalItemBase(models.Model):
     """
     Contains common fields for database hygiene
@@ -48,6 +66,7 @@ class RentalItemInstrument(RentalItemBase):
     """
     class Meta:
         abstract = True
+        indexes = [GinIndex(instrument_search_vector(), name='%(app_label)s_%(class)s_search')]
 
     vdgsa_number = models.IntegerField(blank=True, null=True)
     maker = models.CharField(max_length=50, null=True)
@@ -166,6 +185,9 @@ class Case(RentalItemInstrument):
 
 
 class Image(models.Model):
+    class Meta:
+        indexes = [models.Index(fields=['type', 'vbc_number'])]
+
     picture_id = models.AutoField(primary_key=True)
     vbc_number = models.PositiveIntegerField()  # foreign key using type
     type = models.CharField(max_length=4)
@@ -187,6 +209,17 @@ class Image(models.Model):
             f'{self.image_file_name} '
         )
 
+    @property
+    def thumbnail(self) -> FieldFile | None:
+        """
+        The thumbnail generated by
+        vdgsa_backend.rental_viols.thumbnails.generate_thumbnail, stored
+        alongside the full image.
+        """
+        if not self.thumb_file_name:
+            return None
+        return FieldFile(self, self._meta.get_field('image_file_name'), self.thumb_file_name)
+
 
 class RentalContract(RentalItemBase):
     entry_num = models.AutoField(primary_key=True)
@@ -199,6 +232,7 @@ class RentalContract(RentalItemBase):
 class WaitingList(RentalItemBase):
     class Meta:
         ordering = ('-entry_num',)
+        indexes = [models.Index(fields=['size', 'date_req'])]
 
     entry_num = models.AutoField(primary_key=True)
     renter_num = models.ForeignKey(User, blank=True, null=True,
@@ -234,6 +268,9 @@ class WaitingList(RentalItemBase):
 
 
 class RentalHistory(RentalItemBase):
+    class Meta:
+        indexes = [GinIndex(history_search_vector(), name='rental_viols_history_search')]
+
     entry_num = models.AutoField(primary_key=True)
     viol_num = models.ForeignKey(
         Viol, db_column='viol_num',
@@ -269,3 +306,102 @@ class RentalHistory(RentalItemBase):
         return (
             f'{self.entry_num}: {self.event} '
         )
+
+
+class CurrentRental(models.Model):
+    """
+    The rental that a rented-out viol is currently on. This is a
+    projection of RentalHistory that the rent out, renew, and return
+    views keep up to date so that active rentals can be looked up
+    without scanning the history. Rebuild it from the history with
+    the rebuild_current_rentals command.
+    """
+    viol = models.OneToOneField(
+        Viol, primary_key=True, on_delete=models.CASCADE, related_name='current_rental')
+    renter = models.ForeignKey(User, on_delete=models.CASCADE, related_name='current_rentals')
+    rental_start = models.DateField(blank=True, null=True)
+    rental_end = models.DateField(blank=True, null=True, db_index=True)
+    # The "rented" or "renewed" RentalHistory entry for this rental.
+    rental = models.ForeignKey(
+        RentalHistory, blank=True, null=True, on_delete=models.SET_NULL, related_name='+')
+    contract = models.ForeignKey(
+        RentalContract, blank=True, null=True, on_delete=models.SET_NULL, related_name='+')
+
+    def __str__(self) -> str:
+        return f'{self.viol}: {self.renter}, until {self.rental_end}'
+
+
+class RentalReminderType(TextChoices):
+    ending = 'ending'
+    overdue = 'overdue'
+
+
+class RentalReminder(models.Model):
+    """
+    A reminder email sent by the rental_reminders command. A rental
+    gets at most one reminder of each type per end date, so running
+    the command again (or renewing a rental) doesn't repeat them.
+    """
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['rental', 'reminder_type', 'rental_end'],
+                name='unique_rental_reminder'
+            )
+        ]
+
+    # The "rented" or "renewed" RentalHistory entry for the rental.
+    rental = models.ForeignKey(
+        RentalHistory, on_delete=models.CASCADE, related_name='reminders')
+    reminder_type = models.CharField(max_length=20, choices=RentalReminderType.choices)
+    rental_end = models.DateField()
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return f'{self.reminder_type} reminder for {self.rental}, sent {self.sent_at}'
+
+
+class UtilizationBase(models.Model):
+    """
+    Contains the fields shared by the rental utilization summaries,
+    which the refresh_rental_utilization command rebuilds nightly from
+    the rental history (see vdgsa_backend.rental_viols.utilization).
+    """
+    class Meta:
+        abstract = True
+
+    owned_days = models.PositiveIntegerField()
+    rented_days = models.PositiveIntegerField()
+    num_rentals = models.PositiveIntegerField()
+    computed_at = models.DateTimeField()
+
+    @property
+    def utilization(self) -> float:
+        """The fraction of owned days spent rented out."""
+        return self.rented_days / self.owned_days if self.owned_days else 0.0
+
+    @property
+    def avg_rental_days(self) -> float | None:
+        return self.rented_days / self.num_rentals if self.num_rentals else None
+
+
+class ViolUtilization(UtilizationBase):
+    viol = models.OneToOneField(
+        Viol, primary_key=True, on_delete=models.CASCADE, related_name='utilization')
+    last_rented = models.DateField(blank=True, null=True)
+
+    def __str__(self) -> str:
+        return f'{self.viol}: rented {self.rented_days} of {self.owned_days} days'
+
+
+class SizeUtilization(UtilizationBase):
+    size = models.TextField(choices=ViolSize.choices, primary_key=True)
+    num_viols = models.PositiveIntegerField()
+    num_never_rented = models.PositiveIntegerField()
+    # Waiting list entries of this size whose renter has since rented
+    # a viol, and how long they waited on average.
+    num_waits = models.PositiveIntegerField()
+    avg_wait_days = models.FloatField(blank=True, null=True)
+
+    def __str__(self) -> str:
+        return f'{self.size}: rented {self.rented_days} of {self.owned_days} days'
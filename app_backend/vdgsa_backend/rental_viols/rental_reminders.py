@@ -0,0 +1,122 @@
+"""
+Contains RentalReminderEmails, which emails renters whose rentals are
+ending soon or overdue. Run it daily with the rental_reminders
+command.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Final
+
+from django.core.mail import EmailMessage, EmailMultiAlternatives, get_connection
+from django.db.models import Case, CharField, Exists, OuterRef, QuerySet, Value, When
+from django.template.loader import get_template
+
+from vdgsa_backend.emails.views import HTMLFilter
+from vdgsa_backend.rental_viols.models import CurrentRental, RentalReminder, RentalReminderType
+
+FROM_EMAIL: Final = 'rentalviol@vdgsa.org'
+BCC_TO_EMAIL: Final = 'rentalviol@vdgsa.org'
+JOB_NOTIFICATION_TO_EMAIL: Final = ['rentalviol@vdgsa.org']
+
+# Renters get an "ending" reminder this many days before the end of
+# their rental, unless the command says otherwise.
+DEFAULT_DAYS_BEFORE_END: Final = 30
+
+
+class RentalReminderEmails():
+    """
+    run_job finds the rentals that are due a reminder, sends them all
+    over one SMTP connection, and records them as RentalReminders.
+    """
+
+    def __init__(
+        self,
+        today: datetime.date | None = None,
+        days_before_end: int = DEFAULT_DAYS_BEFORE_END,
+    ) -> None:
+        self.today = today or datetime.date.today()
+        self.days_before_end = days_before_end
+        self.template = get_template('rental_reminder_email.html')
+
+    def list_due_rentals(self) -> QuerySet[CurrentRental]:
+        """
+        Returns the current rentals that end within days_before_end
+        days or have already ended and haven't had the corresponding
+        reminder yet. Each one is annotated with reminder_type.
+        """
+        already_sent = RentalReminder.objects.filter(
+            rental=OuterRef('rental'),
+            reminder_type=OuterRef('reminder_type'),
+            rental_end=OuterRef('rental_end'),
+        )
+        return CurrentRental.objects.filter(
+            rental_end__lte=self.today + datetime.timedelta(days=self.days_before_end),
+            rental__isnull=False,
+        ).annotate(
+            reminder_type=Case(
+                When(rental_end__lt=self.today, then=Value(RentalReminderType.overdue.value)),
+                default=Value(RentalReminderType.ending.value),
+                output_field=CharField(),
+            )
+        ).exclude(
+            Exists(already_sent)
+        ).select_related('viol', 'renter').order_by('rental_end', 'viol__vdgsa_number')
+
+    def make_email(self, current_rental: CurrentRental) -> EmailMultiAlternatives:
+        html_content = self.template.render({
+            'renter': current_rental.renter,
+            'viol': current_rental.viol,
+            'rental_end': current_rental.rental_end,
+            'overdue': current_rental.reminder_type == RentalReminderType.overdue,
+        })
+
+        f = HTMLFilter()
+        f.feed(html_content)
+
+        msg = EmailMultiAlternatives(
+            'VdGSA rental viol', f.text, FROM_EMAIL, [current_rental.renter.username],
+            bcc=[BCC_TO_EMAIL])
+        msg.attach_alternative(html_content, 'text/html')
+        return msg
+
+    def run_job(self, send: bool = True) -> list[str]:
+        """
+        Sends the reminders (if send is True) and a summary to the
+        rental manager. Returns a line describing each reminder.
+        """
+        due_rentals = list(self.list_due_rentals())
+        log = [
+            f'{rental.reminder_type}: {rental.renter.username}, {rental.viol}, '
+            f'ends {rental.rental_end.strftime("%m/%d/%Y")}'
+            for rental in due_rentals
+        ]
+        if not send or not due_rentals:
+            return log
+
+        emails = [self.make_email(rental) for rental in due_rentals]
+        sent = []
+        # Record whatever was sent even if the connection fails partway
+        # through, so that the next run doesn't repeat it.
+        try:
+            with get_connection() as connection:
+                for rental, email in zip(due_rentals, emails):
+                    connection.send_messages([email])
+                    sent.append(RentalReminder(
+                        rental_id=rental.rental_id,
+                        reminder_type=rental.reminder_type,
+                        rental_end=rental.rental_end,
+                    ))
+
+                EmailMessage(
+                    subject='Rental viol reminder emails have been sent',
+                    to=JOB_NOTIFICATION_TO_EMAIL,
+                    body=f'Results of rental reminder job {self.today.strftime("%B %d, %Y")}'
+                         + '\n\n' + '\n'.join(log),
+                    connection=connection,
+                ).send(fail_silently=True)
+        finally:
+            RentalReminder.objects.bulk_create(sent, ignore_conflicts=True)
+
+        return log
@@ -0,0 +1,68 @@
+"""
+Contains search_rentals, the full-text search over rental instruments
+(maker, provenance, description, and notes) and rental history notes.
+
+Queries use Postgres "websearch" syntax, so "jane doe" matches both
+words, '"jane doe"' matches the phrase, and "-bass" excludes a word.
+Each search is an index scan over the GIN indexes declared on the
+models.
+"""
+
+from __future__ import annotations
+
+from typing import Final, Type, TypedDict
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db.models import Model, QuerySet
+
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalState
+from vdgsa_backend.rental_viols.models import (
+    SEARCH_CONFIG, Bow, Case, RentalHistory, Viol, history_search_vector, instrument_search_vector
+)
+
+# The most results to show of each type.
+SEARCH_LIMIT: Final = 25
+
+
+class RentalSearchResults(TypedDict):
+    viols: list[Viol]
+    bows: list[Bow]
+    cases: list[Case]
+    history: list[RentalHistory]
+
+
+def search_rentals(query: str) -> RentalSearchResults:
+    """
+    Returns the items and history entries matching query, best
+    matches first.
+    """
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+    return {
+        'viols': _search(Viol, instrument_search_vector(), search_query),
+        'bows': _search(Bow, instrument_search_vector(), search_query, 'viol_num'),
+        'cases': _search(Case, instrument_search_vector(), search_query, 'viol_num'),
+        'history': _search(
+            RentalHistory, history_search_vector(), search_query,
+            'viol_num', 'bow_num', 'case_num', 'renter_num'
+        ),
+    }
+
+
+def _search(
+    model: Type[Model],
+    vector: SearchVector,
+    search_query: SearchQuery,
+    *select_related: str,
+) -> list:
+    queryset: QuerySet = model._base_manager.annotate(
+        search=vector
+    ).filter(
+        search=search_query
+    ).exclude(
+        status=RentalState.deleted
+    ).annotate(
+        rank=SearchRank(vector, search_query)
+    ).order_by('-rank', 'pk')
+    if select_related:
+        queryset = queryset.select_related(*select_related)
+    return list(queryset[:SEARCH_LIMIT])
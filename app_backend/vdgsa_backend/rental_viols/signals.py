@@ -0,0 +1,27 @@
+"""
+Signal handlers that keep cached rental inventory data up to date.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from vdgsa_backend.rental_viols.inventory_summary import invalidate_inventory_summary
+from vdgsa_backend.rental_viols.models import Bow, Case, Viol
+
+
+@receiver(post_save, sender=Viol)
+@receiver(post_save, sender=Bow)
+@receiver(post_save, sender=Case)
+@receiver(post_delete, sender=Viol)
+@receiver(post_delete, sender=Bow)
+@receiver(post_delete, sender=Case)
+def on_inventory_item_changed(sender: Any, **kwargs: Any) -> None:
+    # Wait for the change to be committed, otherwise another request
+    # could rebuild the summary from the old rows in the meantime and
+    # it would stay cached until the next change.
+    transaction.on_commit(invalidate_inventory_summary)
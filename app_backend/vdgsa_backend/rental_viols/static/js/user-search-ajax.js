@@ -1,33 +1,63 @@
-
-let user_input = $("#user-input")
-let userSelect = $('#replaceable-content')
-const endpoint = '/rentals/user/search'
-const delay_by_in_ms = 700
+// Typeahead for picking a user. Expects the #user-input text box and
+// the contents of templates/users/user-results-partial.html.
+const delay_by_in_ms = 300
 let scheduled_function = false
 
-
 $().ready(function() {
 
- user_input = $("#user-input")
- userPickList = $('#replaceable-content')
+const user_input = $("#user-input")
+const userPickList = $('#replaceable-content')
+const endpoint = userPickList.data('search-url')
+const results = $('#user-results')
 
+let describe = function (user) {
+	let description = `${user.first_name} ${user.last_name} (${user.email})`
+	if (user.city || user.state) {
+		description += ` - ${user.city}, ${user.state}`
+	}
+	return description
+}
 
-let ajax_call = function (endpoint, request_parameters) {
-	$.getJSON(endpoint, request_parameters)
-		.done(response => {
-			// fade out the userSelect, then:
-			userPickList.fadeTo('fast', 0).promise().then(() => {
-				// replace the HTML contents
-				userPickList.html(response['html_from_view'])
-				// fade-in the div with new contents
-				userPickList.fadeTo('fast', 1)
-			})
-		})
+let select_user = function (user) {
+	$('#user-select').empty().append($('<option>').val(user.id).text(describe(user))).show()
+	// Forms with fields for the person's details (e.g. the waiting
+	// list form) get them filled in.
+	$('#id_renter_num').val(user.id)
+	$('#id_first_name').val(user.first_name)
+	$('#id_last_name').val(user.last_name)
+	$('#id_email').val(user.email)
+	$('#id_address_city').val(user.city)
+	$('#id_address_state').val(user.state)
+
+	user_input.val('')
+	results.empty()
+	$('#clickToSelect').hide()
 }
 
+let show_results = function (response) {
+	results.empty()
+	if (response.results.length === 0) {
+		results.append($('<div class="user-dropdown-content">').text('No people found.'))
+		$('#clickToSelect').hide()
+		return
+	}
+
+	$('#clickToSelect').show()
+	for (const user of response.results) {
+		const link = $('<a href="#" class="user-dropdown-content">').text(describe(user))
+		link.click(function (event) {
+			event.preventDefault()
+			select_user(user)
+		})
+		results.append($('<div class="user-dropdown">').append(link))
+	}
+	if (response.truncated) {
+		results.append($('<div class="user-dropdown-content">').text(
+			'More people match. Keep typing to narrow the list.'))
+	}
+}
 
 user_input.on('keyup', function () {
-	
 	const request_parameters = {
 		q: $(this).val() // value of user_input: the HTML element with ID user-input
 	}
@@ -37,7 +67,14 @@ user_input.on('keyup', function () {
 		clearTimeout(scheduled_function)
 	}
 
+	if (!request_parameters.q.trim()) {
+		results.empty()
+		return
+	}
+
 	// setTimeout returns the ID of the function to be executed
-	scheduled_function = setTimeout(ajax_call, delay_by_in_ms, endpoint, request_parameters)
+	scheduled_function = setTimeout(function () {
+		$.getJSON(endpoint, request_parameters).done(show_results)
+	}, delay_by_in_ms)
 })
 })
@@ -1,6 +1,7 @@
 from typing import Any, List, Sequence, Union
 
 from django.contrib.auth.models import Permission
+from django.core.cache import cache
 from django.test import LiveServerTestCase
 from selenium.common.exceptions import NoSuchElementException  # type: ignore
 from selenium.webdriver.common.action_chains import ActionChains  # type: ignore
@@ -29,6 +30,9 @@ class SeleniumTestCaseBase(LiveServerTestCase):
 
     def setUp(self) -> None:
         super().setUp()
+        # The rentals home page caches an inventory summary, which
+        # would otherwise outlive the previous test's data.
+        cache.clear()
         self.wait = WebDriverWait(self.selenium, 5)
 
     def login_as(
@@ -0,0 +1,146 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.current_rentals import get_overdue_rentals
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent, RentalState
+from vdgsa_backend.rental_viols.models import CurrentRental, RentalHistory, Viol, ViolSize
+
+
+class CurrentRentalTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.rental_manager = User.objects.create_user(
+            username='rental_manager@wee.com', password='password')
+        self.rental_manager.user_permissions.add(
+            Permission.objects.get(codename='rental_manager'))
+        self.client.force_login(self.rental_manager)
+
+        self.renter = User.objects.create_user(
+            username='renter@wee.com', first_name='Rent', last_name='Er')
+        self.viol = Viol.objects.create(
+            vdgsa_number=1, size=ViolSize.bass, strings=6, status=RentalState.available)
+
+    def _rent_out(
+        self, event: RentalEvent = RentalEvent.rented,
+        rental_end: str = '2022-06-01'
+    ) -> RentalHistory:
+        response = self.client.post(reverse('rental-submit'), {
+            'viol_num': self.viol.pk,
+            'user_id': self.renter.pk,
+            'event': event,
+            'notes': '',
+            'rental_start': '2021-06-01',
+            'rental_end': rental_end,
+        })
+        self.assertEqual(302, response.status_code)
+        return RentalHistory.objects.filter(viol_num=self.viol).latest('entry_num')
+
+    def test_rent_renew_return(self) -> None:
+        rental = self._rent_out()
+        current_rental = CurrentRental.objects.get(viol=self.viol)
+        self.assertEqual(self.renter, current_rental.renter)
+        self.assertEqual(rental, current_rental.rental)
+        self.assertEqual(datetime.date(2022, 6, 1), current_rental.rental_end)
+
+        renewal = self._rent_out(RentalEvent.renewed, rental_end='2023-06-01')
+        current_rental = CurrentRental.objects.get(viol=self.viol)
+        self.assertEqual(renewal, current_rental.rental)
+        self.assertEqual(datetime.date(2023, 6, 1), current_rental.rental_end)
+
+        response = self.client.post(
+            reverse('rental-return', kwargs={'entry_num': renewal.pk}),
+            {'rental_end': '2023-05-01', 'notes': ''})
+        self.assertEqual(302, response.status_code)
+        self.assertFalse(CurrentRental.objects.exists())
+
+    def test_edit_rental_dates_synced(self) -> None:
+        rental = self._rent_out()
+        response = self.client.post(
+            reverse('rental-update', kwargs={'pk': rental.pk}),
+            {
+                'event': rental.event,
+                'viol_num': self.viol.pk,
+                'renter_num': self.renter.pk,
+                'notes': '',
+                'rental_start': '2021-06-01',
+                'rental_end': '2022-12-01',
+            }
+        )
+        self.assertEqual(302, response.status_code)
+        self.assertEqual(
+            datetime.date(2022, 12, 1), CurrentRental.objects.get(viol=self.viol).rental_end)
+
+    def test_soft_delete_rental_entry(self) -> None:
+        rental = self._rent_out()
+        renewal = self._rent_out(RentalEvent.renewed, rental_end='2023-06-01')
+
+        response = self.client.get(
+            reverse('soft-delete', kwargs={'class': 'RentalHistory', 'pk': renewal.pk}))
+        self.assertEqual(302, response.status_code)
+        self.assertEqual(rental, CurrentRental.objects.get(viol=self.viol).rental)
+
+        response = self.client.get(
+            reverse('soft-delete', kwargs={'class': 'RentalHistory', 'pk': rental.pk}))
+        self.assertEqual(302, response.status_code)
+        self.assertFalse(CurrentRental.objects.exists())
+
+    def test_soft_delete_viol(self) -> None:
+        self._rent_out()
+        response = self.client.get(
+            reverse('soft-delete', kwargs={'class': 'Viol', 'pk': self.viol.pk}))
+        self.assertEqual(302, response.status_code)
+        self.assertFalse(CurrentRental.objects.exists())
+
+    def test_renter_list(self) -> None:
+        self._rent_out()
+        former_renter = User.objects.create_user(username='former@wee.com')
+        RentalHistory.objects.create(
+            viol_num=self.viol, renter_num=former_renter, event=RentalEvent.rented)
+
+        response = self.client.get(reverse('list-renters'), {'status': 'active'})
+        self.assertEqual([self.renter], list(response.context['object_list']))
+        self.assertEqual(1, response.context['object_list'][0].num_rentals)
+        self.assertEqual(
+            datetime.date(2022, 6, 1), response.context['object_list'][0].rental_end_date)
+
+        response = self.client.get(reverse('list-renters'), {'status': 'inactive'})
+        self.assertEqual([former_renter], list(response.context['object_list']))
+
+        response = self.client.get(reverse('list-renters'), {'status': 'all'})
+        self.assertCountEqual(
+            [self.renter, former_renter], list(response.context['object_list']))
+
+    def test_overdue_rentals(self) -> None:
+        self._rent_out()
+        self.assertEqual(
+            [self.viol],
+            [rental.viol for rental in get_overdue_rentals(datetime.date(2022, 6, 2))]
+        )
+        self.assertFalse(get_overdue_rentals(datetime.date(2022, 6, 1)).exists())
+
+    def test_rebuild_command(self) -> None:
+        other_viol = Viol.objects.create(vdgsa_number=2, size=ViolSize.alto, strings=6)
+        RentalHistory.objects.create(
+            viol_num=self.viol, renter_num=self.renter, event=RentalEvent.rented,
+            rental_end=datetime.date(2021, 1, 1))
+        renewal = RentalHistory.objects.create(
+            viol_num=self.viol, renter_num=self.renter, event=RentalEvent.renewed,
+            rental_end=datetime.date(2022, 1, 1))
+        RentalHistory.objects.create(
+            viol_num=other_viol, renter_num=self.renter, event=RentalEvent.rented)
+        RentalHistory.objects.create(
+            viol_num=other_viol, renter_num=self.renter, event=RentalEvent.returned)
+
+        out = StringIO()
+        call_command('rebuild_current_rentals', stdout=out)
+        self.assertIn('Found 1 current rentals', out.getvalue())
+        current_rental = CurrentRental.objects.get()
+        self.assertEqual(self.viol, current_rental.viol)
+        self.assertEqual(renewal, current_rental.rental)
+        self.assertEqual(datetime.date(2022, 1, 1), current_rental.rental_end)
@@ -0,0 +1,91 @@
+import os
+import tempfile
+
+from django.contrib.auth.models import Permission
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.models import Image, RentalContract
+
+
+class ProtectedFileViewsTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(
+            MEDIA_ROOT=media_root.name, PROTECTED_FILE_OFFLOAD=None)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        os.mkdir(os.path.join(media_root.name, 'contracts'))
+        self.contents = bytes(range(256)) * 4
+        with open(os.path.join(media_root.name, 'contracts', 'contract.pdf'), 'wb') as f:
+            f.write(self.contents)
+        self.contract = RentalContract.objects.create(document='contracts/contract.pdf')
+        self.url = reverse('show-contract', kwargs={'entry_num': self.contract.pk})
+
+        self.rental_viewer = User.objects.create_user(
+            username='rental_viewer@wee.com', password='password')
+        self.rental_viewer.user_permissions.add(
+            Permission.objects.get(codename='rental_viewer'))
+        self.client.force_login(self.rental_viewer)
+
+    def test_full_file(self) -> None:
+        response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.contents, response.getvalue())
+        self.assertEqual('application/pdf', response['Content-Type'])
+        self.assertEqual('bytes', response['Accept-Ranges'])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+    def test_conditional_get(self) -> None:
+        etag = self.client.get(self.url)['ETag']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(304, response.status_code)
+        self.assertEqual(etag, response['ETag'])
+
+    def test_range(self) -> None:
+        response = self.client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(206, response.status_code)
+        self.assertEqual(self.contents[10:20], response.getvalue())
+        self.assertEqual('bytes 10-19/1024', response['Content-Range'])
+        self.assertEqual('10', response['Content-Length'])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-24')
+        self.assertEqual(self.contents[-24:], response.getvalue())
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=1000-')
+        self.assertEqual(self.contents[1000:], response.getvalue())
+
+    def test_range_not_satisfiable(self) -> None:
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2000-')
+        self.assertEqual(416, response.status_code)
+        self.assertEqual('bytes */1024', response['Content-Range'])
+
+    def test_stale_if_range_gets_whole_file(self) -> None:
+        response = self.client.get(
+            self.url, HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(self.contents, response.getvalue())
+
+    def test_nginx_offload(self) -> None:
+        with self.settings(PROTECTED_FILE_OFFLOAD='nginx'):
+            response = self.client.get(self.url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(b'', response.content)
+        self.assertEqual(
+            '/protected_uploads/contracts/contract.pdf', response['X-Accel-Redirect'])
+
+    def test_missing_image_not_found(self) -> None:
+        image = Image.objects.create(
+            vbc_number=1, type='viol', image_file_name='images/nope.png')
+        response = self.client.get(reverse('show-image', kwargs={'picture_id': image.pk}))
+        self.assertEqual(404, response.status_code)
+
+    def test_permission_required(self) -> None:
+        self.client.force_login(User.objects.create_user(username='rando@wee.com'))
+        self.assertEqual(403, self.client.get(self.url).status_code)
@@ -0,0 +1,151 @@
+import csv
+import datetime
+import io
+
+from django.contrib.auth.models import Permission
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent, RentalState
+from vdgsa_backend.rental_viols.models import (
+    Bow, Case, CurrentRental, RentalHistory, RentalProgram, Viol, ViolSize
+)
+
+
+class InventoryCsvTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.rental_manager = User.objects.create_user(
+            username='rental_manager@wee.com', password='password')
+        self.rental_manager.user_permissions.add(
+            Permission.objects.get(codename='rental_manager'))
+        self.client.force_login(self.rental_manager)
+
+        self.custodian = User.objects.create_user(username='Custodian@wee.com')
+
+    def _import(self, item_type: str, contents: str):
+        return self.client.post(
+            reverse('inventory-import', kwargs={'item_type': item_type}),
+            {'csv_file': SimpleUploadedFile('import.csv', contents.encode())}
+        )
+
+    def test_import_viols(self) -> None:
+        Viol.objects.create(vdgsa_number=41, size=ViolSize.bass, strings=6)
+        response = self._import(
+            'viol',
+            'maker,size,strings,value,program,accession_date,custodian\n'
+            'Jane,bass,6,1200.50,,2022-01-02,custodian@wee.com\n'
+            'John,treble,6,,Select Reserve,,\n'
+        )
+        self.assertRedirects(response, reverse('list-viols'), fetch_redirect_response=False)
+
+        jane_viol = Viol.objects.get(vdgsa_number=42)
+        self.assertEqual('Jane', jane_viol.maker)
+        self.assertEqual(ViolSize.bass, jane_viol.size)
+        self.assertEqual(RentalProgram.regular, jane_viol.program)
+        self.assertEqual(datetime.date(2022, 1, 2), jane_viol.accession_date)
+        self.assertEqual(self.custodian, jane_viol.storer)
+        john_viol = Viol.objects.get(vdgsa_number=43)
+        self.assertEqual(RentalProgram.select_reserve, john_viol.program)
+        self.assertIsNone(john_viol.storer)
+
+        self.assertCountEqual(
+            [jane_viol, john_viol],
+            [entry.viol_num for entry in RentalHistory.objects.filter(event=RentalEvent.new)]
+        )
+
+    def test_import_bows(self) -> None:
+        response = self._import('bow', 'size,maker\ntenor,Bob\n')
+        self.assertEqual(302, response.status_code)
+        bow = Bow.objects.get()
+        self.assertEqual(1, bow.vdgsa_number)
+        self.assertEqual(RentalState.unattached, bow.status)
+        self.assertEqual(bow, RentalHistory.objects.get(event=RentalEvent.new).bow_num)
+
+    def test_invalid_import_creates_nothing(self) -> None:
+        response = self._import(
+            'case',
+            'size,value,custodian\n'
+            'bass,100,\n'
+            'huge,lots,\n'
+            'bass,,nobody@wee.com\n'
+        )
+        self.assertEqual(200, response.status_code)
+        self.assertCountEqual(
+            [
+                (3, 'size: Select a valid choice. huge is not one of the available choices.'),
+                (3, 'value: Enter a number.'),
+                (4, 'custodian: No user with email nobody@wee.com'),
+            ],
+            [(error['line'], error['message']) for error in response.context['import_errors']]
+        )
+        self.assertFalse(Case.objects.exists())
+        self.assertFalse(RentalHistory.objects.exists())
+
+    def test_missing_required_column(self) -> None:
+        response = self._import('viol', 'maker,size\nJane,bass\n')
+        self.assertEqual(
+            [{'line': 1, 'message': 'Missing columns: strings'}],
+            response.context['import_errors']
+        )
+
+    def test_import_requires_manager(self) -> None:
+        rental_viewer = User.objects.create_user(username='rental_viewer@wee.com')
+        rental_viewer.user_permissions.add(Permission.objects.get(codename='rental_viewer'))
+        self.client.force_login(rental_viewer)
+        self.assertEqual(403, self._import('bow', 'size\nbass\n').status_code)
+
+    def test_unknown_item_type(self) -> None:
+        self.assertEqual(
+            404,
+            self.client.get(
+                reverse('inventory-export', kwargs={'item_type': 'harpsichord'})).status_code
+        )
+
+    def test_export_viols(self) -> None:
+        renter = User.objects.create_user(username='renter@wee.com')
+        viol = Viol.objects.create(
+            vdgsa_number=7, maker='Jane', size=ViolSize.bass, strings=6, storer=self.custodian)
+        Bow.objects.create(vdgsa_number=3, size=ViolSize.bass, viol_num=viol)
+        Case.objects.create(vdgsa_number=5, size=ViolSize.bass, viol_num=viol)
+        CurrentRental.objects.create(
+            viol=viol, renter=renter, rental_end=datetime.date(2022, 6, 1))
+        Viol.objects.create(
+            vdgsa_number=8, size=ViolSize.bass, strings=6, status=RentalState.deleted)
+
+        response = self.client.get(reverse('inventory-export', kwargs={'item_type': 'viol'}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('text/csv', response['Content-Type'])
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(1, len(rows))
+        self.assertEqual('7', rows[0]['vdgsa_number'])
+        self.assertEqual('Custodian@wee.com', rows[0]['custodian'])
+        self.assertEqual('3', rows[0]['bows'])
+        self.assertEqual('5', rows[0]['cases'])
+        self.assertEqual('renter@wee.com', rows[0]['renter'])
+        self.assertEqual('2022-06-01', rows[0]['rental_end'])
+
+        response = self.client.get(reverse('inventory-export', kwargs={'item_type': 'bow'}))
+        rows = list(csv.DictReader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual('7', rows[0]['attached_to'])
+
+    def test_add_view_allocates_number_on_save(self) -> None:
+        response = self.client.get(reverse('add-bow'))
+        Bow.objects.create(vdgsa_number=1, size=ViolSize.bass)
+        self.client.post(reverse('add-bow'), {
+            'vdgsa_number': response.context['form']['vdgsa_number'].value(),
+            'maker': 'Bob',
+            'size': ViolSize.bass,
+            'value': '10',
+            'program': RentalProgram.regular,
+        })
+        self.assertEqual([1, 2], sorted(Bow.objects.values_list('vdgsa_number', flat=True)))
+
+    def test_lock_next_vdgsa_num(self) -> None:
+        Viol.objects.create(
+            vdgsa_number=3, size=ViolSize.bass, strings=6, status=RentalState.retired)
+        with transaction.atomic():
+            self.assertEqual(4, Viol.objects.lock_next_vdgsa_num())
@@ -0,0 +1,113 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalState
+from vdgsa_backend.rental_viols.models import Bow, Case, RentalProgram, Viol, ViolSize
+
+
+class InventorySummaryTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.rental_viewer = User.objects.create_user(
+            username='rental_viewer@wee.com', password='password')
+        self.rental_viewer.user_permissions.add(
+            Permission.objects.get(codename='rental_viewer'))
+        self.client.force_login(self.rental_viewer)
+
+        self.bass = self._make_viol(ViolSize.bass, RentalState.available, '1000')
+        self._make_viol(ViolSize.bass, RentalState.rented, '2000.50')
+        self._make_viol(ViolSize.treble, RentalState.available, '500', RentalProgram.consort_loan)
+        self._make_viol(ViolSize.treble, RentalState.deleted, '500')
+        Bow.objects.create(size=ViolSize.bass, viol_num=self.bass, value='100')
+        Bow.objects.create(size=ViolSize.bass, value='150')
+        Case.objects.create(size=ViolSize.treble)
+
+    def _make_viol(
+        self, size: ViolSize, status: RentalState, value: str,
+        program: RentalProgram = RentalProgram.regular
+    ) -> Viol:
+        return Viol.objects.create(
+            size=size, status=status, value=value, strings=6, program=program)
+
+    def test_summary_json(self) -> None:
+        response = self.client.get(reverse('inventory-summary'))
+        self.assertEqual(200, response.status_code)
+        summary = response.json()
+        self.assertEqual(
+            [
+                {
+                    'size': 'bass', 'status': 'Available', 'program': 'Regular',
+                    'attached': None, 'count': 1, 'total_value': '1000.00',
+                },
+                {
+                    'size': 'bass', 'status': 'Rented', 'program': 'Regular',
+                    'attached': None, 'count': 1, 'total_value': '2000.50',
+                },
+                {
+                    'size': 'treble', 'status': 'Available', 'program': 'Consort Loan',
+                    'attached': None, 'count': 1, 'total_value': '500.00',
+                },
+            ],
+            summary['viol']
+        )
+        self.assertEqual(
+            [(False, 1, '150.00'), (True, 1, '100.00')],
+            [(group['attached'], group['count'], group['total_value'])
+             for group in summary['bow']]
+        )
+        self.assertEqual([(False, 1, '0')], [
+            (group['attached'], group['count'], group['total_value'])
+            for group in summary['case']
+        ])
+
+    def test_summary_cached_until_item_saved(self) -> None:
+        url = reverse('inventory-summary')
+        self.client.get(url)
+        # Session, user, and permissions only.
+        with self.assertNumQueries(4):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._make_viol(ViolSize.tenor, RentalState.available, '750')
+            # Not until the change is committed.
+            self.assertNotIn(
+                'tenor', [group['size'] for group in self.client.get(url).json()['viol']])
+        self.assertIn('tenor', [group['size'] for group in self.client.get(url).json()['viol']])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.bass.delete()
+        self.assertNotIn(
+            ('bass', 'Available'),
+            [(group['size'], group['status']) for group in self.client.get(url).json()['viol']]
+        )
+
+    def test_home_dashboard(self) -> None:
+        response = self.client.get(reverse('rentals'))
+        viol_table, bow_table, case_table = response.context['inventory_tables']
+        self.assertEqual(['Available', 'Rented'], viol_table['statuses'])
+        self.assertEqual(
+            [
+                {
+                    'size': 'Treble', 'status_counts': [1, 0], 'attached': 0,
+                    'unattached': 0, 'total': 1, 'total_value': Decimal('500'),
+                },
+                {
+                    'size': 'Bass', 'status_counts': [1, 1], 'attached': 0,
+                    'unattached': 0, 'total': 2, 'total_value': Decimal('3000.50'),
+                },
+            ],
+            viol_table['rows']
+        )
+        self.assertEqual(1, bow_table['rows'][0]['attached'])
+        self.assertEqual(1, bow_table['rows'][0]['unattached'])
+        self.assertContains(response, '$3000.50')
+
+        response = self.client.get(reverse('rentals'), {'program': 'consort_loan'})
+        viol_table = response.context['inventory_tables'][0]
+        self.assertEqual(['Treble'], [row['size'] for row in viol_table['rows']])
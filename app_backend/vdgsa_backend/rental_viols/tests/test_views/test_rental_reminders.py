@@ -0,0 +1,78 @@
+import datetime
+from io import StringIO
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.current_rentals import start_rental
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent
+from vdgsa_backend.rental_viols.models import (
+    RentalHistory, RentalReminder, RentalReminderType, Viol, ViolSize
+)
+from vdgsa_backend.rental_viols.rental_reminders import RentalReminderEmails
+
+
+class RentalRemindersTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.today = datetime.date(2022, 6, 1)
+        self.renter = User.objects.create_user(
+            username='renter@wee.com', first_name='Rent', last_name='Er')
+
+    def _rent(self, vdgsa_number: int, rental_end: datetime.date) -> RentalHistory:
+        viol = Viol.objects.create(vdgsa_number=vdgsa_number, size=ViolSize.bass, strings=6)
+        rental = RentalHistory.objects.create(
+            viol_num=viol, renter_num=self.renter, event=RentalEvent.rented,
+            rental_end=rental_end)
+        start_rental(rental)
+        return rental
+
+    def test_due_rentals(self) -> None:
+        overdue = self._rent(1, datetime.date(2022, 5, 31))
+        ending = self._rent(2, datetime.date(2022, 6, 30))
+        self._rent(3, datetime.date(2022, 8, 1))
+
+        due = RentalReminderEmails(today=self.today).list_due_rentals()
+        self.assertEqual(
+            [(overdue, RentalReminderType.overdue), (ending, RentalReminderType.ending)],
+            [(rental.rental, rental.reminder_type) for rental in due]
+        )
+
+    def test_run_job_is_idempotent(self) -> None:
+        overdue = self._rent(1, datetime.date(2022, 5, 31))
+        self._rent(2, datetime.date(2022, 6, 30))
+
+        log = RentalReminderEmails(today=self.today).run_job()
+        self.assertEqual(2, len(log))
+        # Two reminders plus the summary.
+        self.assertEqual(3, len(mail.outbox))
+        self.assertEqual(['renter@wee.com'], mail.outbox[0].to)
+        self.assertIn('ended on May 31, 2022', mail.outbox[0].body)
+        self.assertIn('ends on June 30, 2022', mail.outbox[1].body)
+        self.assertEqual(2, RentalReminder.objects.count())
+
+        self.assertEqual([], RentalReminderEmails(today=self.today).run_job())
+        self.assertEqual(3, len(mail.outbox))
+
+        # A new end date gets a new reminder.
+        overdue.rental_end = datetime.date(2022, 6, 15)
+        overdue.save()
+        start_rental(overdue)
+        log = RentalReminderEmails(today=self.today).run_job()
+        self.assertEqual(1, len(log))
+        self.assertEqual(5, len(mail.outbox))
+
+    def test_command_dry_run(self) -> None:
+        self._rent(1, datetime.date.today() - datetime.timedelta(days=1))
+        out = StringIO()
+        call_command('rental_reminders', '--dry-run', stdout=out)
+        self.assertIn('Would send 1 rental reminders', out.getvalue())
+        self.assertEqual(0, len(mail.outbox))
+        self.assertFalse(RentalReminder.objects.exists())
+
+        out = StringIO()
+        call_command('rental_reminders', '--days', '0', stdout=out)
+        self.assertIn('Sent 1 rental reminders', out.getvalue())
+        self.assertTrue(RentalReminder.objects.exists())
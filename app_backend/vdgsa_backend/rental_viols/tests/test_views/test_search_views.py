@@ -0,0 +1,75 @@
+from django.contrib.auth.models import Permission
+from django.contrib.postgres.search import SearchQuery
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent, RentalState
+from vdgsa_backend.rental_viols.models import (
+    SEARCH_CONFIG, Bow, RentalHistory, Viol, ViolSize, instrument_search_vector
+)
+from vdgsa_backend.rental_viols.search import search_rentals
+
+
+class RentalSearchTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.rental_viewer = User.objects.create_user(
+            username='rental_viewer@wee.com', password='password')
+        self.rental_viewer.user_permissions.add(
+            Permission.objects.get(codename='rental_viewer'))
+        self.client.force_login(self.rental_viewer)
+
+        self.jane_treble = Viol.objects.create(
+            vdgsa_number=1, size=ViolSize.treble, strings=6, maker='Jane Doe',
+            provenance='Made in 1998', description='Light varnish')
+        self.jane_bass = Viol.objects.create(
+            vdgsa_number=2, size=ViolSize.bass, strings=6, maker='Jane Doe',
+            notes='Crack repaired')
+        self.other = Viol.objects.create(
+            vdgsa_number=3, size=ViolSize.bass, strings=6, maker='John Smith',
+            notes='Jane Doe played this once')
+        Viol.objects.create(
+            vdgsa_number=4, size=ViolSize.bass, strings=6, maker='Jane Doe',
+            status=RentalState.deleted)
+        self.bow = Bow.objects.create(vdgsa_number=1, size=ViolSize.bass, maker='Jane Doe')
+        self.history = RentalHistory.objects.create(
+            viol_num=self.jane_bass, event=RentalEvent.returned,
+            notes='Returned with a cracked top')
+
+    def test_search(self) -> None:
+        results = search_rentals('jane doe 1998')
+        self.assertEqual([self.jane_treble], results['viols'])
+        self.assertEqual([], results['bows'])
+
+        results = search_rentals('jane doe')
+        # Maker matches rank above notes matches.
+        self.assertEqual([self.jane_treble, self.jane_bass, self.other], results['viols'])
+        self.assertEqual([self.bow], results['bows'])
+        self.assertEqual([], results['cases'])
+
+        # Stemming matches "cracked" and "crack".
+        results = search_rentals('cracks')
+        self.assertEqual([self.jane_bass], results['viols'])
+        self.assertEqual([self.history], results['history'])
+
+        self.assertEqual([self.jane_bass], search_rentals('jane -1998 -played')['viols'])
+
+    def test_search_uses_index(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = Viol.objects.annotate(search=instrument_search_vector()).filter(
+            search=SearchQuery('jane', config=SEARCH_CONFIG, search_type='websearch')
+        ).explain()
+        self.assertIn('rental_viols_viol_search', plan)
+
+    def test_search_view(self) -> None:
+        response = self.client.get(reverse('rental-search'), {'q': 'jane'})
+        self.assertEqual(200, response.status_code)
+        self.assertContains(response, 'search-results-viols')
+        self.assertContains(response, self.jane_treble.get_absolute_url())
+
+        response = self.client.get(reverse('rental-search'))
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn('results', response.context)
@@ -0,0 +1,82 @@
+import os
+import tempfile
+from io import BytesIO, StringIO
+
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image as PILImage
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.models import Image
+from vdgsa_backend.rental_viols.thumbnails import generate_thumbnail
+
+
+class ThumbnailTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root.name, PROTECTED_FILE_OFFLOAD=None)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        os.mkdir(os.path.join(self.media_root.name, 'images'))
+
+        self.rental_viewer = User.objects.create_user(
+            username='rental_viewer@wee.com', password='password')
+        self.rental_viewer.user_permissions.add(
+            Permission.objects.get(codename='rental_viewer'))
+        self.client.force_login(self.rental_viewer)
+
+    def _make_image(self, name: str, size: tuple[int, int] = (1200, 800)) -> Image:
+        PILImage.new('RGB', size, 'blue').save(
+            os.path.join(self.media_root.name, 'images', name))
+        return Image.objects.create(vbc_number=1, type='viol', image_file_name=f'images/{name}')
+
+    def test_generate_thumbnail(self) -> None:
+        image = self._make_image('viol.png')
+        generate_thumbnail(image)
+        image.refresh_from_db()
+
+        self.assertEqual((1200, 800), (image.image_width, image.image_height))
+        self.assertEqual((300, 200), (image.thumb_width, image.thumb_height))
+        self.assertEqual('images/thumbs/viol.webp', image.thumb_file_name)
+        with PILImage.open(image.thumbnail.path) as thumbnail:
+            self.assertEqual('WEBP', thumbnail.format)
+            self.assertEqual((300, 200), thumbnail.size)
+
+    def test_thumbnail_view(self) -> None:
+        image = self._make_image('viol.png')
+        url = reverse('show-thumbnail', kwargs={'picture_id': image.pk})
+
+        # Falls back to the full image until a thumbnail exists.
+        response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('image/png', response['Content-Type'])
+
+        generate_thumbnail(image)
+        response = self.client.get(url)
+        self.assertEqual(200, response.status_code)
+        self.assertEqual('image/webp', response['Content-Type'])
+        with PILImage.open(BytesIO(response.getvalue())) as thumbnail:
+            self.assertEqual((300, 200), thumbnail.size)
+
+    def test_generate_thumbnails_command(self) -> None:
+        self._make_image('one.png')
+        done = self._make_image('two.png')
+        generate_thumbnail(done)
+        Image.objects.create(vbc_number=1, type='viol', image_file_name='images/missing.png')
+
+        out = StringIO()
+        err = StringIO()
+        call_command('generate_thumbnails', stdout=out, stderr=err)
+        self.assertIn('Generated 1 thumbnails', out.getvalue())
+        self.assertIn('missing.png', err.getvalue())
+        self.assertFalse(Image.objects.filter(
+            image_file_name='images/one.png', thumb_file_name__isnull=True).exists())
+
+        out = StringIO()
+        call_command('generate_thumbnails', '--all', stdout=out, stderr=StringIO())
+        self.assertIn('Generated 2 thumbnails', out.getvalue())
@@ -0,0 +1,89 @@
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.models import WaitingList
+from vdgsa_backend.rental_viols.user_search import USER_SEARCH_LIMIT, search_users
+
+
+class UserSearchTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.rental_manager = User.objects.create_user(
+            username='rental_manager@wee.com', password='password')
+        self.rental_manager.user_permissions.add(
+            Permission.objects.get(codename='rental_manager'))
+        self.client.force_login(self.rental_manager)
+
+        self.jane = User.objects.create_user(
+            username='jane@wee.com', first_name='Jane', last_name='Doe',
+            address_city='Boston', address_state='MA')
+        self.john = User.objects.create_user(
+            username='jdoe@wee.com', first_name='John', last_name='Doe')
+        self.doris = User.objects.create_user(
+            username='doris@wee.com', first_name='Doris', last_name='Smith')
+
+    def test_search_json(self) -> None:
+        response = self.client.get(reverse('user-search'), {'q': 'jan'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            {
+                'results': [{
+                    'id': self.jane.pk,
+                    'first_name': 'Jane',
+                    'last_name': 'Doe',
+                    'email': 'jane@wee.com',
+                    'city': 'Boston',
+                    'state': 'MA',
+                }],
+                'truncated': False,
+            },
+            response.json()
+        )
+
+    def test_prefix_match_on_each_word(self) -> None:
+        def _ids(query: str) -> list[int]:
+            return [user['id'] for user in search_users(query)['results']]
+
+        self.assertEqual([self.jane.pk, self.john.pk], _ids('DOE'))
+        self.assertEqual([self.john.pk], _ids('doe jo'))
+        self.assertEqual([self.john.pk], _ids('jdoe@'))
+        # Prefix matches only.
+        self.assertEqual([], _ids('oe'))
+        self.assertEqual([], _ids('  '))
+
+    def test_results_capped(self) -> None:
+        for i in range(USER_SEARCH_LIMIT + 1):
+            User.objects.create_user(username=f'many{i}@wee.com', last_name='Many')
+        results = search_users('many')
+        self.assertEqual(USER_SEARCH_LIMIT, len(results['results']))
+        self.assertTrue(results['truncated'])
+
+    def test_results_cached(self) -> None:
+        search_users('Jane ')
+        with self.assertNumQueries(0):
+            self.assertEqual(1, len(search_users('jane')['results']))
+
+    def test_rental_viewer_required(self) -> None:
+        self.client.force_login(User.objects.create_user(username='rando@wee.com'))
+        self.assertEqual(403, self.client.get(reverse('user-search'), {'q': 'jan'}).status_code)
+
+    def test_waiting_list_form_sets_renter(self) -> None:
+        response = self.client.get(reverse('add-waiting'))
+        self.assertEqual(200, response.status_code)
+        self.assertNotContains(response, 'doris@wee.com')
+
+        response = self.client.post(reverse('add-waiting'), {
+            'date_req': '2022-01-01',
+            'size': 'bass',
+            'first_name': 'Jane',
+            'last_name': 'Doe',
+            'email': 'jane@wee.com',
+            'address_line_1': '1 Main St',
+            'renter_num': self.jane.pk,
+        })
+        self.assertEqual(302, response.status_code)
+        self.assertEqual(self.jane, WaitingList.objects.get().renter_num)
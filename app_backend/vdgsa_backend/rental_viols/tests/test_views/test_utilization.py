@@ -0,0 +1,152 @@
+import datetime
+from io import StringIO
+
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent, RentalState
+from vdgsa_backend.rental_viols.models import (
+    RentalHistory, SizeUtilization, Viol, ViolSize, ViolUtilization, WaitingList
+)
+from vdgsa_backend.rental_viols.utilization import refresh_rental_utilization
+
+
+def _at(year: int, month: int, day: int) -> datetime.datetime:
+    return timezone.make_aware(datetime.datetime(year, month, day, 12))
+
+
+class RentalUtilizationTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.rental_viewer = User.objects.create_user(
+            username='rental_viewer@wee.com', password='password')
+        self.rental_viewer.user_permissions.add(
+            Permission.objects.get(codename='rental_viewer'))
+        self.renter = User.objects.create_user(username='renter@wee.com')
+        self.today = datetime.date(2022, 1, 1)
+
+        self.tenor = Viol.objects.create(
+            vdgsa_number=1, size=ViolSize.tenor, strings=6, status=RentalState.rented,
+            accession_date=datetime.date(2021, 1, 1))
+        self.idle_tenor = Viol.objects.create(
+            vdgsa_number=2, size=ViolSize.tenor, strings=6, status=RentalState.available,
+            accession_date=datetime.date(2021, 1, 1))
+        self.retired_bass = Viol.objects.create(
+            vdgsa_number=3, size=ViolSize.bass, strings=6, status=RentalState.retired,
+            accession_date=datetime.date(2021, 1, 1))
+        Viol.objects.create(
+            vdgsa_number=4, size=ViolSize.bass, strings=6, status=RentalState.deleted,
+            accession_date=datetime.date(2021, 1, 1))
+
+        # The tenor was rented for 31 days in January, then from
+        # December 1 until today (31 days). The renewal doesn't start a
+        # new rental.
+        self._history(self.tenor, RentalEvent.rented, _at(2021, 1, 1), self.renter)
+        self._history(self.tenor, RentalEvent.returned, _at(2021, 2, 1))
+        self._history(self.tenor, RentalEvent.rented, _at(2021, 11, 25), self.renter,
+                      rental_start=datetime.date(2021, 12, 1))
+        self._history(self.tenor, RentalEvent.renewed, _at(2021, 12, 15), self.renter)
+        self._history(
+            self.tenor, RentalEvent.returned, _at(2021, 3, 1), status=RentalState.deleted)
+
+        # The bass was rented for 59 days, then retired on July 1.
+        self._history(self.retired_bass, RentalEvent.rented, _at(2021, 1, 1))
+        self._history(self.retired_bass, RentalEvent.returned, _at(2021, 3, 1))
+        self._history(self.retired_bass, RentalEvent.retired, _at(2021, 7, 1))
+
+        # The renter waited 14 days for the tenor they rented in
+        # November.
+        WaitingList.objects.create(
+            renter_num=self.renter, size=ViolSize.tenor, date_req=datetime.date(2021, 11, 11),
+            status=RentalState.deleted)
+        # Nobody has rented anything since this one.
+        WaitingList.objects.create(
+            renter_num=self.rental_viewer, size=ViolSize.tenor,
+            date_req=datetime.date(2021, 10, 1))
+
+    def _history(
+        self,
+        viol: Viol,
+        event: str,
+        created_at: datetime.datetime,
+        renter: User | None = None,
+        **kwargs: object,
+    ) -> None:
+        entry = RentalHistory.objects.create(
+            viol_num=viol, event=event, renter_num=renter, **kwargs)
+        # created_at is set automatically on create.
+        RentalHistory.objects.filter(pk=entry.pk).update(created_at=created_at)
+
+    def test_refresh_rental_utilization(self) -> None:
+        with self.assertNumQueries(8):
+            self.assertEqual(3, refresh_rental_utilization(today=self.today))
+
+        tenor = ViolUtilization.objects.get(viol=self.tenor)
+        self.assertEqual(365, tenor.owned_days)
+        self.assertEqual(62, tenor.rented_days)
+        self.assertEqual(2, tenor.num_rentals)
+        self.assertEqual(31, tenor.avg_rental_days)
+        self.assertEqual(datetime.date(2021, 12, 1), tenor.last_rented)
+
+        idle_tenor = ViolUtilization.objects.get(viol=self.idle_tenor)
+        self.assertEqual(0, idle_tenor.num_rentals)
+        self.assertEqual(0, idle_tenor.utilization)
+        self.assertIsNone(idle_tenor.avg_rental_days)
+        self.assertIsNone(idle_tenor.last_rented)
+
+        retired_bass = ViolUtilization.objects.get(viol=self.retired_bass)
+        self.assertEqual(181, retired_bass.owned_days)
+        self.assertEqual(59, retired_bass.rented_days)
+
+        tenors = SizeUtilization.objects.get(size=ViolSize.tenor)
+        self.assertEqual(2, tenors.num_viols)
+        self.assertEqual(1, tenors.num_never_rented)
+        self.assertEqual(730, tenors.owned_days)
+        self.assertEqual(62, tenors.rented_days)
+        self.assertEqual(1, tenors.num_waits)
+        self.assertEqual(14, tenors.avg_wait_days)
+
+        basses = SizeUtilization.objects.get(size=ViolSize.bass)
+        self.assertEqual(1, basses.num_viols)
+        self.assertEqual(0, basses.num_waits)
+        self.assertIsNone(basses.avg_wait_days)
+
+    def test_refresh_replaces_previous_summary(self) -> None:
+        refresh_rental_utilization(today=self.today)
+        self.tenor.history.all().delete()
+
+        refresh_rental_utilization(today=self.today)
+        self.assertEqual(0, ViolUtilization.objects.get(viol=self.tenor).num_rentals)
+        self.assertEqual(3, ViolUtilization.objects.count())
+
+    def test_command(self) -> None:
+        out = StringIO()
+        call_command('refresh_rental_utilization', stdout=out)
+        self.assertIn('Summarized utilization of 3 viols', out.getvalue())
+
+    def test_report(self) -> None:
+        refresh_rental_utilization(today=self.today)
+        self.client.force_login(self.rental_viewer)
+        response = self.client.get(reverse('rental-utilization'))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            [ViolSize.tenor, ViolSize.bass], [row.size for row in response.context['sizes']])
+        self.assertEqual(
+            [self.idle_tenor, self.tenor, self.retired_bass],
+            [row.viol for row in response.context['viols']])
+        self.assertContains(response, '17%')
+
+    def test_report_before_first_refresh(self) -> None:
+        self.client.force_login(self.rental_viewer)
+        response = self.client.get(reverse('rental-utilization'))
+        self.assertEqual(200, response.status_code)
+        self.assertContains(response, "hasn't been generated yet")
+
+    def test_report_requires_permission(self) -> None:
+        self.client.force_login(self.renter)
+        response = self.client.get(reverse('rental-utilization'))
+        self.assertEqual(403, response.status_code)
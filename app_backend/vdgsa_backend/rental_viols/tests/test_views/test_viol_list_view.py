@@ -0,0 +1,135 @@
+import datetime
+
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.query_budget import QueryBudgetTestMixin
+from vdgsa_backend.rental_viols.current_rentals import start_rental
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent
+from vdgsa_backend.rental_viols.models import (
+    Bow, Case, RentalHistory, RentalProgram, Viol, ViolSize, WaitingList
+)
+
+
+class ViolListViewTestCase(QueryBudgetTestMixin, TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.rental_viewer = User.objects.create_user(
+            username='rental_viewer@wee.com', password='password')
+        self.rental_viewer.user_permissions.add(
+            Permission.objects.get(codename='rental_viewer'))
+        self.client.force_login(self.rental_viewer)
+        self.url = reverse('list-viols')
+
+    def _make_viols(self, num_viols: int) -> None:
+        custodian = User.objects.create_user(
+            username=f'custodian{num_viols}@wee.com', first_name='Cus', last_name='Todian')
+        renter = User.objects.create_user(username=f'renter{num_viols}@wee.com')
+        sizes = list(ViolSize)
+        for i in range(num_viols):
+            viol = Viol.objects.create(
+                vdgsa_number=Viol.objects.get_next_vdgsa_num(),
+                maker=f'maker {i}',
+                size=sizes[i % len(sizes)],
+                strings=6,
+                accession_date=timezone.now(),
+                program=RentalProgram.regular,
+                storer=custodian,
+            )
+            WaitingList.objects.create(viol_num=viol, renter_num=renter)
+
+    def test_query_count_independent_of_num_viols(self) -> None:
+        query = {'state': 'all', 'program': 'all', 'size': 'all'}
+        self._make_viols(3)
+        # The first request saves the filter to the session.
+        self.client.get(self.url, query)
+        with CaptureQueriesContext(connection) as few_viols_queries:
+            self.client.get(self.url, query)
+
+        self._make_viols(30)
+        with CaptureQueriesContext(connection) as many_viols_queries:
+            response = self.client.get(self.url, query)
+        self.assertEqual(33, len(response.context['object_list']))
+        self.assertEqual(len(few_viols_queries), len(many_viols_queries))
+        self.assertFalse(
+            any('django_session' in captured['sql'] and 'UPDATE' in captured['sql']
+                for captured in many_viols_queries)
+        )
+
+    def test_list_query_budgets(self) -> None:
+        self._make_viols(30)
+        for viol in Viol.objects.all():
+            Bow.objects.create(
+                vdgsa_number=viol.vdgsa_number, viol_num=viol, storer=viol.storer, value=1)
+            Case.objects.create(
+                vdgsa_number=viol.vdgsa_number, viol_num=viol, storer=viol.storer, value=1)
+        budgets = {
+            'list-viols': 12,
+            'list-bows': 10,
+            'list-cases': 10,
+            'list-renters': 10,
+            'list-cust': 9,
+            'list-waiting': 8,
+        }
+        for url_name, budget in budgets.items():
+            with self.subTest(url_name):
+                with self.assertQueryBudget(budget):
+                    response = self.client.get(reverse(url_name))
+                self.assertEqual(200, response.status_code)
+
+    def test_paginated(self) -> None:
+        self._make_viols(55)
+        response = self.client.get(self.url, {'state': 'all', 'program': 'all', 'size': 'all'})
+        self.assertEqual(50, len(response.context['object_list']))
+        self.assertContains(response, 'Page 1 of 2.')
+
+        response = self.client.get(
+            self.url, {'state': 'all', 'program': 'all', 'size': 'all', 'page': 2})
+        self.assertEqual(5, len(response.context['object_list']))
+
+    def test_sort(self) -> None:
+        self._make_viols(7)
+        response = self.client.get(self.url, {'state': 'all', 'sort': '-size'})
+        self.assertEqual(
+            list(reversed(ViolSize)),
+            [viol.size for viol in response.context['object_list']]
+        )
+        self.assertEqual('size', response.context['sort_links']['size'])
+
+        response = self.client.get(self.url, {'state': 'all', 'sort': 'bad_field'})
+        self.assertEqual(
+            sorted(viol.vdgsa_number for viol in Viol.objects.all()),
+            [viol.vdgsa_number for viol in response.context['object_list']]
+        )
+
+    def test_rental_end_date(self) -> None:
+        self._make_viols(2)
+        rented, returned = Viol.objects.order_by('vdgsa_number')
+        renter = User.objects.create_user(username='renter@wee.com')
+        start_rental(RentalHistory.objects.create(
+            viol_num=rented, renter_num=renter, event=RentalEvent.rented,
+            rental_end=datetime.date(2023, 6, 1)))
+        RentalHistory.objects.create(
+            viol_num=returned, renter_num=renter, event=RentalEvent.rented,
+            rental_end=datetime.date(2022, 6, 1))
+        RentalHistory.objects.create(
+            viol_num=returned, renter_num=renter, event=RentalEvent.returned,
+            rental_end=datetime.date(2022, 5, 1))
+
+        response = self.client.get(self.url, {'state': 'all', 'program': 'all', 'size': 'all'})
+        self.assertEqual(
+            {rented: datetime.date(2023, 6, 1), returned: datetime.date(2022, 6, 1)},
+            {viol: viol.rental_end_date for viol in response.context['object_list']}
+        )
+
+    def test_filter_remembered_in_session(self) -> None:
+        self._make_viols(2)
+        self.client.get(self.url, {'state': 'retired', 'program': 'all', 'size': 'all'})
+        response = self.client.get(self.url)
+        self.assertEqual('retired', response.context['filter']['state'])
+        self.assertEqual(0, len(response.context['object_list']))
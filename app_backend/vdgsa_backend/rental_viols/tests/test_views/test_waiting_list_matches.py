@@ -0,0 +1,99 @@
+import datetime
+
+from django.contrib.auth.models import Permission
+from django.test import TestCase
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalState
+from vdgsa_backend.rental_viols.models import Viol, ViolSize, WaitingList
+from vdgsa_backend.rental_viols.waiting_list import match_waiting_list
+
+
+class WaitingListMatchesTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.rental_viewer = User.objects.create_user(
+            username='rental_viewer@wee.com', password='password')
+        self.rental_viewer.user_permissions.add(
+            Permission.objects.get(codename='rental_viewer'))
+        self.client.force_login(self.rental_viewer)
+
+        self.bass = Viol.objects.create(
+            vdgsa_number=1, size=ViolSize.bass, strings=6, status=RentalState.available)
+        self.seven_string = Viol.objects.create(
+            vdgsa_number=2, size=ViolSize.seven_string_bass, strings=7,
+            status=RentalState.available)
+        self.treble = Viol.objects.create(
+            vdgsa_number=3, size=ViolSize.treble, strings=6, status=RentalState.available)
+        self.rented_tenor = Viol.objects.create(
+            vdgsa_number=4, size=ViolSize.tenor, strings=6, status=RentalState.rented)
+
+        self.newer_bass_request = WaitingList.objects.create(
+            size=ViolSize.bass, date_req=datetime.date(2022, 3, 1), last_name='Newer')
+        self.older_seven_string_request = WaitingList.objects.create(
+            size=ViolSize.seven_string_bass, date_req=datetime.date(2022, 1, 1),
+            last_name='Older')
+        self.specific_request = WaitingList.objects.create(
+            viol_num=self.bass, size=ViolSize.bass, date_req=datetime.date(2022, 2, 1),
+            last_name='Specific')
+        self.tenor_request = WaitingList.objects.create(
+            size=ViolSize.tenor, date_req=datetime.date(2021, 1, 1), last_name='Tenor')
+        WaitingList.objects.create(
+            size=ViolSize.bass, date_req=datetime.date(2020, 1, 1), status=RentalState.deleted)
+
+    def test_match_available_viols(self) -> None:
+        with self.assertNumQueries(2):
+            matches = match_waiting_list()
+
+        self.assertEqual(
+            {
+                self.bass.pk: [
+                    self.older_seven_string_request,
+                    self.specific_request,
+                    self.newer_bass_request,
+                ],
+                self.seven_string.pk: [
+                    self.older_seven_string_request,
+                    self.newer_bass_request,
+                ],
+            },
+            matches['by_viol']
+        )
+        self.assertEqual(
+            {
+                self.older_seven_string_request.pk: [self.bass, self.seven_string],
+                self.specific_request.pk: [self.bass],
+                self.newer_bass_request.pk: [self.bass, self.seven_string],
+            },
+            matches['by_entry']
+        )
+
+    def test_match_given_viols(self) -> None:
+        matches = match_waiting_list([self.rented_tenor])
+        self.assertEqual({self.rented_tenor.pk: [self.tenor_request]}, matches['by_viol'])
+        self.assertEqual({'by_viol': {}, 'by_entry': {}}, match_waiting_list([]))
+
+    def test_viol_detail_shows_matches(self) -> None:
+        response = self.client.get(reverse('viol-detail', kwargs={'pk': self.seven_string.pk}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            [self.older_seven_string_request, self.newer_bass_request],
+            response.context['waiting_list_matches']
+        )
+        self.assertContains(response, 'waiting-list-matches')
+
+    def test_rented_viol_detail_shows_no_matches(self) -> None:
+        response = self.client.get(reverse('viol-detail', kwargs={'pk': self.rented_tenor.pk}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([], response.context['waiting_list_matches'])
+        self.assertNotContains(response, 'waiting-list-matches')
+
+    def test_waiting_list_shows_matches(self) -> None:
+        response = self.client.get(reverse('list-waiting'))
+        self.assertEqual(200, response.status_code)
+        available_viols = {
+            entry.pk: entry.available_viols for entry in response.context['object_list']
+        }
+        self.assertEqual([self.bass], available_viols[self.specific_request.pk])
+        self.assertEqual([], available_viols[self.tenor_request.pk])
@@ -0,0 +1,54 @@
+"""
+Contains generate_thumbnail, which records a rental Image's
+dimensions and stores a small WebP thumbnail next to it so that
+detail pages don't load full-resolution photos.
+"""
+
+from __future__ import annotations
+
+import os
+from io import BytesIO
+from typing import Final
+
+from django.core.files.base import ContentFile
+from PIL import Image as PILImage
+from PIL import ImageOps
+
+from vdgsa_backend.rental_viols.models import Image
+
+# Thumbnails fit in a box of this size, keeping their aspect ratio.
+THUMBNAIL_SIZE: Final = (300, 300)
+THUMBNAIL_DIR: Final = 'images/thumbs'
+
+
+def generate_thumbnail(image: Image) -> None:
+    """
+    Fills in image's dimensions and thumbnail fields, replacing any
+    existing thumbnail. Raises OSError (including
+    PIL.UnidentifiedImageError) if the image file can't be read.
+    """
+    with image.image_file_name.open('rb') as f:
+        with PILImage.open(f) as original:
+            # Photos from phones are often stored sideways with an
+            # EXIF tag saying which way is up.
+            original = ImageOps.exif_transpose(original)
+            image.image_width, image.image_height = original.size
+
+            thumbnail = original.copy()
+            thumbnail.thumbnail(THUMBNAIL_SIZE)
+            if thumbnail.mode not in ('RGB', 'RGBA'):
+                thumbnail = thumbnail.convert('RGBA')
+
+    contents = BytesIO()
+    thumbnail.save(contents, format='WEBP', quality=80)
+
+    storage = image.image_file_name.storage
+    if image.thumb_file_name:
+        storage.delete(image.thumb_file_name)
+    stem = os.path.splitext(os.path.basename(image.image_file_name.name))[0]
+    image.thumb_file_name = storage.save(
+        f'{THUMBNAIL_DIR}/{stem}.webp', ContentFile(contents.getvalue()))
+    image.thumb_width, image.thumb_height = thumbnail.size
+    image.save(update_fields=[
+        'image_width', 'image_height', 'thumb_file_name', 'thumb_width', 'thumb_height'
+    ])
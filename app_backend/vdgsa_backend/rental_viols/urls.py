@@ -4,7 +4,15 @@ from . import views
 
 urlpatterns = [
     path('', views.RentalHomeView.as_view(), name='rentals'),
-
+    path('inventory/', views.InventorySummaryView.as_view(), name='inventory-summary'),
+    path('inventory/<str:item_type>/export', views.InventoryExportView.as_view(),
+         name='inventory-export'),
+    path('inventory/<str:item_type>/import', views.InventoryImportView.as_view(),
+         name='inventory-import'),
+
+    path('search/', views.RentalSearchView.as_view(), name='rental-search'),
+    path('reports/utilization/', views.RentalUtilizationView.as_view(),
+         name='rental-utilization'),
     path('user/search', views.UserSearchViewAjax.as_view(), name='user-search'),
     path('viol/rentOut/', views.RentOutView.as_view(), name='viol-rentOut'),
     path('rentals/', views.ListRentersView.as_view(), name='list-renters'),
@@ -23,6 +31,8 @@ urlpatterns = [
 
     path('contract/<int:entry_num>', views.RentalContractView.as_view(), name='show-contract'),
     path('image/<int:picture_id>', views.ImageView.as_view(), name='show-image'),
+    path('image/<int:picture_id>/thumbnail', views.ThumbnailView.as_view(),
+         name='show-thumbnail'),
     path('attachImage/<str:to>/<int:pk>', views.AttachImageView.as_view(), name='add-image'),
     path('deleteImage/<int:picture_id>', views.DeleteImageView.as_view(), name='delete-image'),
 
@@ -0,0 +1,83 @@
+"""
+Contains search_users, which backs the user typeahead on the rental
+forms.
+
+Each word typed must be a case-insensitive prefix of the user's first
+name, last name, or email, which lets the database use the prefix
+indexes from accounts migration 0026. Results are capped at
+USER_SEARCH_LIMIT and cached briefly, since the first few letters of
+popular names are searched over and over.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Final, TypedDict
+
+from django.core.cache import cache
+from django.db.models import Q
+
+from vdgsa_backend.accounts.models import User
+
+USER_SEARCH_LIMIT: Final = 20
+# Long enough to absorb repeated keystrokes, short enough that new
+# accounts show up without any invalidation.
+USER_SEARCH_CACHE_TIMEOUT: Final = 60
+_MAX_QUERY_LENGTH: Final = 100
+
+
+class UserSearchResult(TypedDict):
+    id: int
+    first_name: str
+    last_name: str
+    email: str
+    city: str
+    state: str
+
+
+class UserSearchResults(TypedDict):
+    results: list[UserSearchResult]
+    # True if there were more than USER_SEARCH_LIMIT matches.
+    truncated: bool
+
+
+def search_users(query: str) -> UserSearchResults:
+    terms = query[:_MAX_QUERY_LENGTH].lower().split()
+    if not terms:
+        return {'results': [], 'truncated': False}
+
+    cache_key = 'user_search:' + hashlib.md5(' '.join(terms).encode()).hexdigest()
+    results: UserSearchResults | None = cache.get(cache_key)
+    if results is None:
+        results = _search_users(terms)
+        cache.set(cache_key, results, timeout=USER_SEARCH_CACHE_TIMEOUT)
+    return results
+
+
+def _search_users(terms: list[str]) -> UserSearchResults:
+    users = User.objects.all()
+    for term in terms:
+        users = users.filter(
+            Q(first_name__istartswith=term)
+            | Q(last_name__istartswith=term)
+            | Q(username__istartswith=term)
+        )
+
+    # Fetch one extra row to find out whether there are more matches.
+    rows = list(users.order_by('last_name', 'first_name', 'username').values_list(
+        'pk', 'first_name', 'last_name', 'username', 'address_city', 'address_state'
+    )[:USER_SEARCH_LIMIT + 1])
+    return {
+        'results': [
+            {
+                'id': pk,
+                'first_name': first_name,
+                'last_name': last_name,
+                'email': email,
+                'city': city,
+                'state': state,
+            }
+            for pk, first_name, last_name, email, city, state in rows[:USER_SEARCH_LIMIT]
+        ],
+        'truncated': len(rows) > USER_SEARCH_LIMIT,
+    }
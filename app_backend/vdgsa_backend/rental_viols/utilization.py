@@ -0,0 +1,178 @@
+"""
+Contains refresh_rental_utilization, which summarizes the rental
+history into the ViolUtilization and SizeUtilization tables for the
+utilization report. Run it nightly with the refresh_rental_utilization
+command.
+
+A rental runs from a "Rented" history entry to the viol's next
+"Returned" (or "Rented") entry, or to today if there isn't one yet.
+Renewals don't start a new rental. Pairing up those entries is done in
+the database with a window function, so the history is read once no
+matter how many viols there are.
+
+A viol is owned from its accession date (or when it was entered, if
+that's unknown) until today, or until it was retired.
+"""
+
+from __future__ import annotations
+
+import datetime
+from typing import Final, Iterable
+
+from django.db import connection, transaction
+from django.utils import timezone
+
+from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent, RentalState
+from vdgsa_backend.rental_viols.models import SizeUtilization, ViolUtilization
+
+_VIOL_RENTALS_SQL: Final = '''
+WITH rental_events AS (
+    SELECT
+        viol_num,
+        event,
+        COALESCE(rental_start, created_at::date) AS start_date,
+        LEAD(created_at::date) OVER (
+            PARTITION BY viol_num ORDER BY created_at, entry_num
+        ) AS next_event_date
+    FROM rental_viols_rentalhistory
+    WHERE viol_num IS NOT NULL
+        AND event IN (%(rented)s, %(returned)s)
+        AND status != %(deleted)s
+),
+rentals AS (
+    SELECT viol_num, start_date, COALESCE(next_event_date, %(today)s) AS end_date
+    FROM rental_events
+    WHERE event = %(rented)s
+),
+retirements AS (
+    SELECT viol_num, MAX(created_at)::date AS retired_on
+    FROM rental_viols_rentalhistory
+    WHERE viol_num IS NOT NULL AND event = %(retired)s AND status != %(deleted)s
+    GROUP BY viol_num
+)
+SELECT
+    viol.viol_num,
+    viol.size,
+    COALESCE(viol.accession_date, viol.created_at::date),
+    CASE WHEN viol.status = %(retired)s THEN retirements.retired_on END,
+    COUNT(rentals.viol_num),
+    COALESCE(SUM(GREATEST(rentals.end_date - rentals.start_date, 0)), 0),
+    MAX(rentals.start_date)
+FROM rental_viols_viol viol
+LEFT JOIN rentals ON rentals.viol_num = viol.viol_num
+LEFT JOIN retirements ON retirements.viol_num = viol.viol_num
+WHERE viol.status != %(deleted)s
+GROUP BY viol.viol_num, retirements.retired_on
+'''
+
+# How long each waiting list entry's renter waited for their first
+# rental after the request, by requested size (or the size of the
+# requested viol). Entries that were filled are usually deleted, so
+# deleted entries count too.
+_WAIT_TIMES_SQL: Final = '''
+SELECT
+    COALESCE(viol.size, entry.size) AS size,
+    COUNT(*),
+    AVG(first_rental.rented_on - entry.date_req)
+FROM rental_viols_waitinglist entry
+LEFT JOIN rental_viols_viol viol ON viol.viol_num = entry.viol_num
+CROSS JOIN LATERAL (
+    SELECT MIN(history.created_at::date) AS rented_on
+    FROM rental_viols_rentalhistory history
+    WHERE history.renter_num_id = entry.renter_num_id
+        AND history.event = %(rented)s
+        AND history.status != %(deleted)s
+        AND history.created_at::date >= entry.date_req
+) first_rental
+WHERE entry.date_req IS NOT NULL AND first_rental.rented_on IS NOT NULL
+GROUP BY 1
+'''
+
+
+def refresh_rental_utilization(today: datetime.date | None = None) -> int:
+    """
+    Replaces the contents of the utilization summary tables with
+    figures computed as of today. Returns the number of viols
+    summarized.
+    """
+    if today is None:
+        today = timezone.localdate()
+    params = {
+        'today': today,
+        'rented': RentalEvent.rented.value,
+        'returned': RentalEvent.returned.value,
+        'retired': RentalEvent.retired.value,
+        'deleted': RentalState.deleted.value,
+    }
+    computed_at = timezone.now()
+
+    with connection.cursor() as cursor:
+        cursor.execute(_VIOL_RENTALS_SQL, params)
+        viol_rows = cursor.fetchall()
+        cursor.execute(_WAIT_TIMES_SQL, params)
+        wait_rows = cursor.fetchall()
+
+    viol_summaries = []
+    sizes_by_viol = {}
+    for viol_num, size, owned_since, retired_on, num_rentals, rented_days, last_rented \
+            in viol_rows:
+        owned_days = max(((retired_on or today) - owned_since).days, 0)
+        viol_summaries.append(ViolUtilization(
+            viol_id=viol_num,
+            owned_days=owned_days,
+            # Rentals recorded before the accession date would otherwise
+            # put a viol over 100%.
+            rented_days=min(rented_days, owned_days),
+            num_rentals=num_rentals,
+            last_rented=last_rented,
+            computed_at=computed_at,
+        ))
+        sizes_by_viol[viol_num] = size
+
+    size_summaries = _summarize_sizes(viol_summaries, sizes_by_viol, wait_rows, computed_at)
+
+    with transaction.atomic():
+        ViolUtilization.objects.all().delete()
+        SizeUtilization.objects.all().delete()
+        ViolUtilization.objects.bulk_create(viol_summaries)
+        SizeUtilization.objects.bulk_create(size_summaries)
+
+    return len(viol_summaries)
+
+
+def _summarize_sizes(
+    viol_summaries: Iterable[ViolUtilization],
+    sizes_by_viol: dict[int, str],
+    wait_rows: Iterable[tuple[str, int, float]],
+    computed_at: datetime.datetime,
+) -> list[SizeUtilization]:
+    def _new(size: str) -> SizeUtilization:
+        return SizeUtilization(
+            size=size,
+            num_viols=0,
+            num_never_rented=0,
+            owned_days=0,
+            rented_days=0,
+            num_rentals=0,
+            num_waits=0,
+            computed_at=computed_at,
+        )
+
+    by_size: dict[str, SizeUtilization] = {}
+    for viol_summary in viol_summaries:
+        size = sizes_by_viol[viol_summary.viol_id]
+        size_summary = by_size.setdefault(size, _new(size))
+        size_summary.num_viols += 1
+        size_summary.num_never_rented += viol_summary.num_rentals == 0
+        size_summary.owned_days += viol_summary.owned_days
+        size_summary.rented_days += viol_summary.rented_days
+        size_summary.num_rentals += viol_summary.num_rentals
+
+    for size, num_waits, avg_wait_days in wait_rows:
+        if size is None:
+            continue
+        size_summary = by_size.setdefault(size, _new(size))
+        size_summary.num_waits = num_waits
+        size_summary.avg_wait_days = float(avg_wait_days)
+
+    return list(by_size.values())
@@ -14,9 +14,15 @@ from .images import AttachImageView as AttachImageView
 from .images import DeleteImageView as DeleteImageView
 from .images import ImageView as ImageView
 from .images import RentalContractView as RentalContractView
+from .images import ThumbnailView as ThumbnailView
+from .inventory import InventoryExportView as InventoryExportView
+from .inventory import InventoryImportView as InventoryImportView
+from .reports import RentalUtilizationView as RentalUtilizationView
+from .search import RentalSearchView as RentalSearchView
 from .views import AttachToRentalView as AttachToRentalView
 from .views import AttachToViolView as AttachToViolView
 from .views import CustodianDetailView as CustodianDetailView
+from .views import InventorySummaryView as InventorySummaryView
 from .views import ListCustodianView as ListCustodianView
 from .views import ListRentersView as ListRentersView
 from .views import NotesOnlyHistoryForm as NotesOnlyHistoryForm
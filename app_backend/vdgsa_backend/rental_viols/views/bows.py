@@ -8,6 +8,7 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.files.storage import FileSystemStorage
+from django.db import transaction
 from django.db.models import Count, F, Max, OuterRef, Q, Subquery
 from django.forms.widgets import DateTimeBaseInput, HiddenInput
 from django.http import Http404, JsonResponse, response
@@ -75,7 +76,7 @@ class ListBowsView(RentalViewBase, ListView):
         else:
             queryset = Bow.objects.get_all()
 
-        return queryset
+        return queryset.select_related('viol_num__storer', 'storer')
 
 
 # CRUD
@@ -117,6 +118,13 @@ class AddBowView(RentalEditBase, SuccessMessageMixin, CreateView):
     success_message = "%(size)s bow was created successfully"
     template_name = 'bows/add_bow.html'
 
+    @transaction.atomic
+    def form_valid(self, form):
+        # The number shown on the form may have been taken since it
+        # was rendered.
+        form.instance.vdgsa_number = Bow.objects.lock_next_vdgsa_num()
+        return super().form_valid(form)
+
 
 class UpdateBowView(RentalEditBase, SuccessMessageMixin, UpdateView):
     model = Bow
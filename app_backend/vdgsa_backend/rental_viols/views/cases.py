@@ -8,6 +8,7 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.files.storage import FileSystemStorage
+from django.db import transaction
 from django.db.models import Count, F, Max, Q
 from django.forms.widgets import DateTimeBaseInput, HiddenInput
 from django.http import Http404, JsonResponse, response
@@ -76,7 +77,7 @@ class ListCasesView(RentalViewBase, ListView):
         else:
             queryset = Case.objects.get_all()
 
-        return queryset
+        return queryset.select_related('viol_num__storer', 'storer')
 
 
 class CaseForm(forms.ModelForm):
@@ -117,6 +118,13 @@ class AddCaseView(RentalEditBase, SuccessMessageMixin, CreateView):
     success_message = "%(size)s case was created successfully"
     template_name = 'cases/add.html'
 
+    @transaction.atomic
+    def form_valid(self, form):
+        # The number shown on the form may have been taken since it
+        # was rendered.
+        form.instance.vdgsa_number = Case.objects.lock_next_vdgsa_num()
+        return super().form_valid(form)
+
 
 class UpdateCaseView(RentalEditBase, SuccessMessageMixin, UpdateView):
     model = Case
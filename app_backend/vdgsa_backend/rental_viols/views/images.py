@@ -1,5 +1,4 @@
 import datetime
-import mimetypes
 from functools import cached_property
 from typing import Any, Dict, Iterable, Literal
 
@@ -26,6 +25,7 @@ from django.views.generic.edit import CreateView, FormView, UpdateView
 from django.views.generic.list import ListView
 
 from vdgsa_backend.accounts.models import User
+from vdgsa_backend.protected_files import serve_protected_file
 from vdgsa_backend.rental_viols.managers.InstrumentManager import AccessoryManager, ViolManager
 from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import (
     RentalEvent, RentalItemBaseManager, RentalState
@@ -35,6 +35,7 @@ from vdgsa_backend.rental_viols.models import (
     WaitingList
 )
 from vdgsa_backend.rental_viols.permissions import is_rental_manager
+from vdgsa_backend.rental_viols.thumbnails import generate_thumbnail
 from vdgsa_backend.rental_viols.views.utils import (
     NotesOnlyHistoryForm, RentalEditBase, RentalViewBase, ReserveViolModelForm, _createUserStamp
 )
@@ -49,31 +50,24 @@ class ImageForm(forms.ModelForm):
 class RentalContractView(RentalViewBase, View):
 
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any):
-        try:
-            context = {"picture_id": self.kwargs['entry_num']}
-            contract = RentalContract.objects.get(entry_num=self.kwargs['entry_num'])
-            file_mime, encoding = mimetypes.guess_type(contract.document.name)
-            return HttpResponse(contract.document.open(mode='rb'), content_type=file_mime)
-        except IOError:
-            red = Image.new('RGBA', (1, 1), (255, 0, 0, 0))
-            response = HttpResponse(content_type="image/jpeg")
-            red.save(response, "JPEG")
-            return response
+        contract = get_object_or_404(RentalContract, entry_num=self.kwargs['entry_num'])
+        return serve_protected_file(request, contract.document)
 
 
 class ImageView(RentalViewBase, View):
 
     def get(self, request: HttpRequest, *args: Any, **kwargs: Any):
-        try:
-            context = {"picture_id": self.kwargs['picture_id']}
-            image = Image.objects.get(picture_id=self.kwargs['picture_id'])
-            file_mime, encoding = mimetypes.guess_type(image.image_file_name.name)
-            return HttpResponse(image.image_file_name.open(mode='rb'), content_type=file_mime)
-        except IOError:
-            red = Image.new('RGBA', (1, 1), (255, 0, 0, 0))
-            response = HttpResponse(content_type="image/jpeg")
-            red.save(response, "JPEG")
-            return response
+        image = get_object_or_404(Image, picture_id=self.kwargs['picture_id'])
+        return serve_protected_file(request, image.image_file_name)
+
+
+class ThumbnailView(RentalViewBase, View):
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any):
+        image = get_object_or_404(Image, picture_id=self.kwargs['picture_id'])
+        # Images whose thumbnails haven't been generated yet get the
+        # full image.
+        return serve_protected_file(request, image.thumbnail or image.image_file_name)
 
 
 class DeleteImageView(RentalEditBase, View):
@@ -115,6 +109,11 @@ class AttachImageView(RentalEditBase, FormView):
             vbc_number=self.request.POST.get('vbc_number'),
             type=self.request.POST.get('type'))
         image.save()
+        try:
+            generate_thumbnail(image)
+        except OSError:
+            messages.add_message(
+                self.request, messages.WARNING, 'Could not make a thumbnail for this image.')
 
         messages.add_message(self.request, messages.SUCCESS, 'Image Saved!')
         return super().form_valid(form)
@@ -0,0 +1,72 @@
+import io
+from typing import Any
+
+from django import forms
+from django.contrib import messages
+from django.http import Http404, StreamingHttpResponse
+from django.http.request import HttpRequest
+from django.http.response import HttpResponseRedirect
+from django.urls.base import reverse
+from django.views.generic.base import View
+from django.views.generic.edit import FormView
+
+from vdgsa_backend.rental_viols.inventory_csv import export_inventory_csv, import_inventory_csv
+from vdgsa_backend.rental_viols.models import ItemType
+from vdgsa_backend.rental_viols.views.utils import RentalEditBase, RentalViewBase
+
+_LIST_URLS = {
+    ItemType.viol: 'list-viols',
+    ItemType.bow: 'list-bows',
+    ItemType.case: 'list-cases',
+}
+
+
+def _getItemType(kwargs: dict[str, Any]) -> str:
+    if kwargs['item_type'] not in ItemType.values:
+        raise Http404('No such item type')
+    return kwargs['item_type']
+
+
+class InventoryExportView(RentalViewBase, View):
+    """Download all viols, bows, or cases as CSV"""
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any):
+        item_type = _getItemType(self.kwargs)
+        response = StreamingHttpResponse(
+            export_inventory_csv(item_type), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="rental_{item_type}s.csv"'
+        return response
+
+
+class InventoryImportForm(forms.Form):
+    csv_file = forms.FileField(label='CSV File')
+
+
+class InventoryImportView(RentalEditBase, FormView):
+    """Add viols, bows, or cases in bulk from a CSV file"""
+    template_name = 'inventory_import.html'
+    form_class = InventoryImportForm
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['item_type'] = _getItemType(self.kwargs)
+        return context
+
+    def form_valid(self, form: InventoryImportForm):
+        item_type = _getItemType(self.kwargs)
+        csv_file = io.TextIOWrapper(form.cleaned_data['csv_file'], encoding='utf-8-sig')
+        try:
+            result = import_inventory_csv(item_type, csv_file)
+        except UnicodeDecodeError:
+            form.add_error('csv_file', 'The file must be a UTF-8 encoded CSV file.')
+            return self.form_invalid(form)
+
+        if result['errors']:
+            return self.render_to_response(
+                self.get_context_data(form=form, import_errors=result['errors']))
+
+        numbers = result['vdgsa_numbers']
+        messages.add_message(
+            self.request, messages.SUCCESS,
+            f'Imported {len(numbers)} {item_type}s (VdGSA #{numbers[0]} to #{numbers[-1]})')
+        return HttpResponseRedirect(reverse(_LIST_URLS[item_type]))
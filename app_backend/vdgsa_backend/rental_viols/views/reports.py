@@ -0,0 +1,25 @@
+from typing import Any
+
+from django.views.generic.base import TemplateView
+
+from vdgsa_backend.rental_viols.managers.InstrumentManager import ViolSize
+from vdgsa_backend.rental_viols.models import SizeUtilization, ViolUtilization
+from vdgsa_backend.rental_viols.views.utils import RentalViewBase
+
+
+class RentalUtilizationView(RentalViewBase, TemplateView):
+    """Show how much of the time each viol and size spends rented out"""
+    template_name = 'utilization.html'
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        size_order = list(ViolSize.values)
+        context['sizes'] = sorted(
+            SizeUtilization.objects.all(), key=lambda row: size_order.index(row.size))
+        # Least used first.
+        context['viols'] = sorted(
+            ViolUtilization.objects.select_related('viol'),
+            key=lambda row: (row.utilization, row.viol.vdgsa_number or 0))
+        context['computed_at'] = max(
+            (row.computed_at for row in context['sizes']), default=None)
+        return context
@@ -0,0 +1,19 @@
+from typing import Any
+
+from django.views.generic.base import TemplateView
+
+from vdgsa_backend.rental_viols.search import SEARCH_LIMIT, search_rentals
+from vdgsa_backend.rental_viols.views.utils import RentalViewBase
+
+
+class RentalSearchView(RentalViewBase, TemplateView):
+    """Search viols, bows, cases, and rental history notes"""
+    template_name = 'search.html'
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['q'] = self.request.GET.get('q', '').strip()
+        context['search_limit'] = SEARCH_LIMIT
+        if context['q']:
+            context['results'] = search_rentals(context['q'])
+        return context
@@ -104,9 +104,14 @@ class ReserveViolModelForm(forms.ModelForm):
             'address_postal_code',
             'phone1',
             'notes',
+            'renter_num',
         ]
         labels = {'phone1': 'Contact Phone', 'address_line_1': 'Mailing Address',
-                  'date_req': 'Date added', 'first_name': 'First Name', 'last_name': 'Last Name'}
+                  'date_req': 'Date added', 'first_name': 'First Name', 'last_name': 'Last Name',
+                  'renter_num': ''}
+        # Filled in by the user typeahead, so that the form doesn't
+        # have to list every user.
+        widgets = {'renter_num': HiddenInput()}
 
 
 class AjaxFormResponse(JsonResponse):
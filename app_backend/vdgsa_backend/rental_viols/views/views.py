@@ -8,33 +8,39 @@ from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.files.storage import FileSystemStorage
-from django.db.models import Count, F, IntegerField, Max, Q
-from django.db.models.functions import Cast
+from django.db import transaction
+from django.db.models import Count, Exists, F, IntegerField, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Cast, Coalesce
 from django.forms.widgets import DateTimeBaseInput, HiddenInput
 from django.http import Http404, JsonResponse, response
 from django.http.request import HttpRequest
 from django.http.response import HttpResponse, HttpResponseNotFound, HttpResponseRedirect
 from django.shortcuts import get_object_or_404, redirect, render
-from django.template.loader import render_to_string
 from django.urls.base import reverse, reverse_lazy
 from django.utils import timezone
 from django.utils.http import urlencode
-from django.views.decorators.csrf import csrf_exempt
 from django.views.generic.base import TemplateView, View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, FormView, UpdateView
 from django.views.generic.list import ListView
 
 from vdgsa_backend.accounts.models import User
+from vdgsa_backend.rental_viols.current_rentals import (
+    RENTAL_EVENTS, end_rental, get_overdue_rentals, rederive_rental, start_rental, sync_rental
+)
+from vdgsa_backend.rental_viols.inventory_summary import (
+    get_inventory_summary, make_inventory_tables
+)
 from vdgsa_backend.rental_viols.managers.InstrumentManager import AccessoryManager, ViolManager
 from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import (
     RentalEvent, RentalItemBaseManager, RentalState
 )
 from vdgsa_backend.rental_viols.models import (
-    Bow, Case, Image, ItemType, RentalContract, RentalHistory, RentalProgram, Viol, ViolSize,
-    WaitingList
+    Bow, Case, CurrentRental, Image, ItemType, RentalContract, RentalHistory, RentalProgram, Viol,
+    ViolSize, WaitingList
 )
 from vdgsa_backend.rental_viols.permissions import is_rental_manager
+from vdgsa_backend.rental_viols.user_search import search_users
 from vdgsa_backend.rental_viols.views.utils import (
     NotesOnlyHistoryForm, RentalEditBase, RentalViewBase, ReserveViolModelForm, _createUserStamp
 )
@@ -180,6 +186,29 @@ class AttachToViolView(RentalEditBase, View):
 class RentalHomeView(RentalViewBase, TemplateView):
     template_name = 'home.html'
 
+    def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        program = self.request.GET.get('program', 'all')
+        if program not in RentalProgram.names:
+            program = 'all'
+        context['program'] = program
+        context['program_choices'] = [(choice.name, choice.label) for choice in RentalProgram]
+        context['inventory_tables'] = make_inventory_tables(
+            get_inventory_summary(),
+            None if program == 'all' else RentalProgram[program].value
+        )
+        context['overdue_rentals'] = get_overdue_rentals().order_by('rental_end')
+        return context
+
+
+class InventorySummaryView(RentalViewBase, View):
+    """
+    Returns counts and total value of viols, bows, and cases grouped
+    by size, status, and program as JSON.
+    """
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> JsonResponse:
+        return JsonResponse(get_inventory_summary())
+
 
 class RentOutForm(forms.Form):
     viol_num = forms.IntegerField()
@@ -321,6 +350,7 @@ class RentalReturnView(RentalEditBase, FormView):
             context['form'] = form
         return render(request, 'renters/return.html', context)
 
+    @transaction.atomic
     def form_valid(self, form):
         oldrental = RentalHistory.objects.get(pk=self.kwargs['entry_num'])
 
@@ -336,6 +366,7 @@ class RentalReturnView(RentalEditBase, FormView):
             event=RentalEvent.returned,
             notes=form.cleaned_data['notes'])
         history.save()
+        end_rental(viol)
 
         messages.add_message(self.request, messages.SUCCESS, 'Rental Returned!')
         return super().form_valid(form)
@@ -360,27 +391,30 @@ class RentalSubmitView(RentalViewBase, View):
             return render(request, 'renters/rentOut.html', context)
         else:
             if self.request.POST.get('viol_num'):
-                viol = Viol.objects.get(pk=self.request.POST['viol_num'])
-                user = User.objects.get(pk=self.request.POST['user_id'])
-                viol.renter = user
-                viol.status = RentalState.rented
-                viol.save()
-                history = RentalHistory.objects.create(
-                    event=form.cleaned_data['event'],
-                    notes=form.cleaned_data['notes'],
-                    viol_num=viol,
-                    renter_num=user,
-                    rental_start=form.cleaned_data['rental_start'],
-                    rental_end=form.cleaned_data['rental_end'],
-                    case_num=viol.cases.first() if viol.cases.exists() else None,
-                    bow_num=viol.bows.first() if viol.bows.exists() else None)
-
-                if request.FILES and request.FILES["contract"]:
-                    contract = RentalContract.objects.create(document=request.FILES["contract"])
-                    history.contract_scan = contract
-                    contract.save()
-
-                history.save()
+                with transaction.atomic():
+                    viol = Viol.objects.get(pk=self.request.POST['viol_num'])
+                    user = User.objects.get(pk=self.request.POST['user_id'])
+                    viol.renter = user
+                    viol.status = RentalState.rented
+                    viol.save()
+                    history = RentalHistory.objects.create(
+                        event=form.cleaned_data['event'],
+                        notes=form.cleaned_data['notes'],
+                        viol_num=viol,
+                        renter_num=user,
+                        rental_start=form.cleaned_data['rental_start'],
+                        rental_end=form.cleaned_data['rental_end'],
+                        case_num=viol.cases.first() if viol.cases.exists() else None,
+                        bow_num=viol.bows.first() if viol.bows.exists() else None)
+
+                    if request.FILES and request.FILES["contract"]:
+                        contract = RentalContract.objects.create(
+                            document=request.FILES["contract"])
+                        history.contract_scan = contract
+                        contract.save()
+
+                    history.save()
+                    start_rental(history)
                 messages.add_message(self.request, messages.SUCCESS, 'Rented!')
 
             return redirect(reverse('viol-detail', args=[self.request.POST.get('viol_num')]))
@@ -411,8 +445,11 @@ class UploadRentalView(RentalEditBase, CreateView):
 
     def form_valid(self, form):
         rh = RentalHistory.objects.get(pk=self.kwargs['entry_num'])
-        response = super().form_valid(form)
-        form.instance.rental.set([rh])
+        with transaction.atomic():
+            response = super().form_valid(form)
+            form.instance.rental.set([rh])
+            rh.refresh_from_db()
+            sync_rental(rh)
         if rh.viol_num.pk:
             return redirect(reverse('viol-detail', args=[rh.viol_num.pk]))
         return redirect(reverse('list-viols'))
@@ -429,6 +466,12 @@ class UpdateRentalView(RentalEditBase, SuccessMessageMixin, UpdateView):
     template_name = 'renters/updateRental.html'
     success_message = "Rental was updated successfully"
 
+    @transaction.atomic
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        sync_rental(self.object)
+        return response
+
     def get_success_url(self, **kwargs) -> str:
         return reverse('rental-detail', args=[self.object.entry_num])
 
@@ -454,28 +497,32 @@ class ListRentersView(RentalViewBase, ListView):
         return context
 
     def get_queryset(self, *args: Any, **kwargs: Any):
-        queryset = []
         filter = self.getFilter()
-        self.request.session[self.filterSessionName] = filter
+        if self.request.session.get(self.filterSessionName) != filter:
+            self.request.session[self.filterSessionName] = filter
+
+        rentals = RentalHistory.objects.filter(
+            renter_num=OuterRef('pk'), event__in=RENTAL_EVENTS
+        ).order_by()
+        current_rentals = CurrentRental.objects.filter(renter=OuterRef('pk')).order_by()
+        queryset = User.objects.annotate(
+            num_rentals=Coalesce(
+                Subquery(rentals.values('renter_num').annotate(
+                    count=Count('pk')).values('count')),
+                0
+            ),
+            rental_end_date=Subquery(
+                current_rentals.order_by('-rental_end').values('rental_end')[:1]),
+        )
+
         if filter['status'] == 'active':
-            queryset = User.objects.filter(
-                (Q(rentalhistory__event=RentalEvent.rented)
-                 | Q(rentalhistory__event=RentalEvent.renewed))
-                & Q(pk=F('rentalhistory__viol_num__renter')))
+            queryset = queryset.filter(Exists(current_rentals))
         elif filter['status'] == 'inactive':
-            queryset = User.objects.filter((Q(
-                rentalhistory__event=RentalEvent.returned)) & (Q(
-                    rentalhistory__viol_num__renter__isnull=True) | ~Q(
-                        pk=F('rentalhistory__viol_num__renter')))
-            )
+            queryset = queryset.filter(Exists(rentals) & ~Exists(current_rentals))
         else:
-            queryset = User.objects.filter(
-                (Q(rentalhistory__event=RentalEvent.rented) | Q(
-                    rentalhistory__event=RentalEvent.renewed)))
+            queryset = queryset.filter(Exists(rentals))
 
-        return queryset.annotate(num_rentals=Count('rentalhistory')).annotate(
-            rental_end_date=Max('rentalhistory__rental_end', filter=Q(
-                pk=F('rentalhistory__viol_num__renter'))))
+        return queryset.order_by('last_name', 'first_name')
 
 
 class ListCustodianView(RentalViewBase, ListView):
@@ -527,6 +574,7 @@ class RentersDetailView(RentalViewBase, DetailView):
                                   Q(renter_num=rental.renter_num)
                                   & Q(viol_num=rental.viol_num))
                               )
+        context['current_rental'] = CurrentRental.objects.filter(rental=rental).first()
         return context
 
 
@@ -545,8 +593,15 @@ class SoftDeleteView(RentalEditBase, View):
             mymodel = apps.get_model('rental_viols', self.kwargs['class'])
             obj = mymodel.objects.get(pk=self.kwargs['pk'])
 
-            obj.status = RentalState.deleted
-            obj.save()
+            with transaction.atomic():
+                obj.status = RentalState.deleted
+                obj.save()
+                # Deleted entries no longer count towards the viol's
+                # current rental.
+                if isinstance(obj, RentalHistory) and obj.viol_num_id is not None:
+                    rederive_rental(obj.viol_num)
+                elif isinstance(obj, Viol):
+                    end_rental(obj)
 
         except RentalHistory.DoesNotExist:
             raise Http404("No MyModel matches the given query.")
@@ -572,20 +627,7 @@ class ViewUserInfo(RentalViewBase, DetailView):
 
 
 class UserSearchViewAjax(RentalViewBase, View):
-    """Filter list of users """
-    @csrf_exempt
-    def get(self, request: HttpRequest, *args: Any, **kwargs: Any):
-        search_str = request.GET.get("q")
-        context = {}
-        if search_str:
-            users = User.objects.filter(Q(first_name__icontains=search_str)
-                                        | Q(last_name__icontains=search_str))
-        else:
-            users = User.objects.all()
+    """Users matching the typeahead query in "q", as JSON"""
 
-        context["users"] = users
-        html = render_to_string(
-            template_name="users/user-results-partial.html", context={"users": users}
-        )
-        data_dict = {"html_from_view": html}
-        return JsonResponse(data=data_dict, safe=False)
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any):
+        return JsonResponse(search_users(request.GET.get('q', '')))
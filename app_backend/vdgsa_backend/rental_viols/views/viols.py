@@ -4,13 +4,16 @@ from typing import Any
 from django import forms
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
-from django.db.models import Max
+from django.db import models, transaction
+from django.db.models import F, IntegerField, Max, Prefetch, Value, When
+from django.db.models.functions import Coalesce
 from django.forms.widgets import HiddenInput
 from django.http.request import HttpRequest
 from django.http.response import HttpResponseRedirect
 from django.shortcuts import redirect, render
 from django.urls.base import reverse
 from django.utils import timezone
+from django.utils.http import urlencode
 from django.views.generic.base import View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, FormView, UpdateView
@@ -19,20 +22,33 @@ from django.views.generic.list import ListView
 from vdgsa_backend.accounts.models import User
 from vdgsa_backend.rental_viols.managers.RentalItemBaseManager import RentalEvent, RentalState
 from vdgsa_backend.rental_viols.models import (
-    Bow, Case, Image, RentalHistory, RentalProgram, Viol, ViolSize, WaitingList
+    Bow, Case, CurrentRental, Image, RentalHistory, RentalProgram, Viol, ViolSize, WaitingList
 )
 from vdgsa_backend.rental_viols.views.utils import (
     NotesOnlyHistoryForm, RentalEditBase, RentalViewBase, ReserveViolModelForm
 )
+from vdgsa_backend.rental_viols.waiting_list import match_waiting_list
 
 
 class ViolsMultiListView(RentalViewBase, ListView):
     template_name = 'viols/list.html'
     filterSessionName = 'viol_filter'
     filter = None
+    paginate_by = 50
+
+    defaultSort = 'vdgsa_number'
+    # Maps the "sort" query param to the field it orders by.
+    # Prefix the param with "-" to sort descending.
+    sortFields = {
+        'vdgsa_number': 'vdgsa_number',
+        'size': 'size_order',
+        'maker': 'maker',
+        'rental_end': 'rental_end_date',
+    }
 
     def getFilter(self, **kwargs):
-        filter = {}
+        if self.filter is not None:
+            return self.filter
 
         if self.request.GET.get('state') is None:
             filter = self.request.session.get(self.filterSessionName, None)
@@ -42,17 +58,35 @@ class ViolsMultiListView(RentalViewBase, ListView):
             filter = {'state': self.request.GET.get('state') or 'all',
                       'program': self.request.GET.get('program') or 'all',
                       'size': self.request.GET.get('size') or 'all', }
+        self.filter = filter
         return filter
 
+    def getSort(self):
+        sort = self.request.GET.get('sort', self.defaultSort)
+        if sort.lstrip('-') not in self.sortFields:
+            return self.defaultSort
+        return sort
+
     def get_context_data(self, **kwargs):
         context = super(ViolsMultiListView, self).get_context_data(**kwargs)
-        context['filter'] = self.getFilter()
+        filter = self.getFilter()
+        sort = self.getSort()
+        context['filter'] = filter
+        context['filter_query'] = urlencode(filter)
+        context['sort'] = sort
+        # The sort param for each column header link. Clicking the
+        # column that is already sorted on reverses its direction.
+        context['sort_links'] = {
+            key: f'-{key}' if sort == key else key for key in self.sortFields
+        }
         context['ViolSize'] = ViolSize
         return context
 
     def get_queryset(self, *args: Any, **kwargs: Any):
         filter = self.getFilter()
-        self.request.session[self.filterSessionName] = filter
+        # Avoid saving the session on every page of the list.
+        if self.request.session.get(self.filterSessionName) != filter:
+            self.request.session[self.filterSessionName] = filter
 
         size = None if filter['size'] == 'all' else filter['size']
         if filter['state'] == 'available':
@@ -67,7 +101,24 @@ class ViolsMultiListView(RentalViewBase, ListView):
         if filter['program'] != 'all':
             queryset = queryset.filter(program=RentalProgram[filter['program']])
 
-        return queryset.annotate(rental_end_date=Max('history__rental_end'))
+        sort = self.getSort()
+        sortField = F(self.sortFields[sort.lstrip('-')])
+        ordering = (sortField.desc(nulls_last=True) if sort.startswith('-')
+                    else sortField.asc(nulls_last=True))
+        return queryset.select_related(
+            'storer', 'renter'
+        ).prefetch_related(
+            Prefetch('waitingList', queryset=WaitingList.objects.select_related('renter_num'))
+        ).annotate(
+            # Viols that aren't rented out show when their last rental ended.
+            rental_end_date=Coalesce(
+                F('current_rental__rental_end'), Max('history__rental_end')),
+            size_order=models.Case(
+                *[When(size=size, then=Value(index)) for index, size in enumerate(ViolSize)],
+                default=Value(len(ViolSize)),
+                output_field=IntegerField(),
+            ),
+        ).order_by(ordering, 'vdgsa_number', 'pk')
 
 
 class ViolForm(forms.ModelForm):
@@ -185,13 +236,12 @@ class ReserveViolView(RentalEditBase, FormView):
 
         if self.request.GET.get('viol_num'):
             context['viol'] = Viol.objects.get(pk=request.GET.get('viol_num'))
-            context['users'] = User.objects.all()
 
         return self.render_to_response(context)
 
     def form_valid(self, form):
         waitinglist, created = WaitingList.objects.update_or_create(
-            # renter_num=form.cleaned_data['renter_num'],
+            renter_num=form.cleaned_data['renter_num'],
             viol_num=form.cleaned_data['viol_num'],
             date_req=form.cleaned_data['date_req'],
             size=form.cleaned_data['size'],
@@ -222,6 +272,13 @@ class AddViolView(RentalEditBase, SuccessMessageMixin, CreateView):
     template_name = 'viols/add.html'
     success_message = "%(size)s viol was created successfully"
 
+    @transaction.atomic
+    def form_valid(self, form):
+        # The number shown on the form may have been taken since it
+        # was rendered.
+        form.instance.vdgsa_number = Viol.objects.lock_next_vdgsa_num()
+        return super().form_valid(form)
+
 
 class UpdateViolView(RentalEditBase, SuccessMessageMixin, UpdateView):
     model = Viol
@@ -243,8 +300,14 @@ class ViolDetailView(RentalViewBase, DetailView):
         context['RentalState'] = RentalState
         context['now'] = timezone.now()
         context['images'] = Image.objects.get_images('viol', context['viol'].pk)
-        context['last_rental'] = (context['viol'].history.filter(event=RentalEvent.rented)
-                                  .order_by('-created_at').first())
+        current_rental = CurrentRental.objects.filter(
+            viol=context['viol']).select_related('rental').first()
+        context['last_rental'] = current_rental.rental if current_rental else None
+        # Only a viol that's free to rent can fill a request.
+        context['waiting_list_matches'] = (
+            match_waiting_list([context['viol']])['by_viol'].get(context['viol'].pk, [])
+            if context['viol'].status == RentalState.available else []
+        )
         return context
 
 
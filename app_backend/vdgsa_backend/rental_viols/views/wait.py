@@ -37,13 +37,22 @@ from vdgsa_backend.rental_viols.permissions import is_rental_manager
 from vdgsa_backend.rental_viols.views.utils import (
     NotesOnlyHistoryForm, RentalEditBase, RentalViewBase, ReserveViolModelForm, _createUserStamp
 )
+from vdgsa_backend.rental_viols.waiting_list import match_waiting_list
 
 
 class ListWaitingView(RentalViewBase, ListView):
     def get_queryset(self, *args: Any, **kwargs: Any):
-        queryset = WaitingList.objects.all()
+        queryset = WaitingList.objects.all().select_related('renter_num', 'viol_num')
         return queryset
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        matches = match_waiting_list()['by_entry']
+        context['object_list'] = list(context['object_list'])
+        for entry in context['object_list']:
+            entry.available_viols = matches.get(entry.pk, [])
+        return context
+
     template_name = 'wait/waitinglist.html'
 
 
@@ -0,0 +1,75 @@
+"""
+Contains match_waiting_list, which pairs viols with the waiting list
+entries they could fill.
+
+An entry for a specific viol only matches that viol. Other entries
+match any viol of the requested size, where seven-string basses and
+basses are interchangeable (as in AccessoryManager.sizeMatch).
+Matches are listed oldest request first.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Final, Iterable, TypedDict
+
+from django.db.models import F, Q
+
+from vdgsa_backend.rental_viols.managers.InstrumentManager import ViolSize
+from vdgsa_backend.rental_viols.models import Viol, WaitingList
+
+# Sizes that can stand in for each other.
+_SIZE_GROUPS: Final = {
+    ViolSize.seven_string_bass: [ViolSize.bass, ViolSize.seven_string_bass],
+    ViolSize.bass: [ViolSize.bass, ViolSize.seven_string_bass],
+}
+
+
+def matching_sizes(size: str) -> list[str]:
+    return _SIZE_GROUPS.get(size, [size])
+
+
+class WaitingListMatches(TypedDict):
+    # Viol pk -> waiting list entries that viol could fill.
+    by_viol: dict[int, list[WaitingList]]
+    # Waiting list entry pk -> viols that could fill that entry.
+    by_entry: dict[int, list[Viol]]
+
+
+def match_waiting_list(viols: Iterable[Viol] | None = None) -> WaitingListMatches:
+    """
+    Matches viols (by default, all available viols) with waiting list
+    entries, using one query for the entries no matter how many viols
+    there are.
+    """
+    if viols is None:
+        viols = Viol.objects.get_available().order_by('size', 'vdgsa_number')
+    viols = list(viols)
+
+    viols_by_pk = {viol.pk: viol for viol in viols}
+    viols_by_size: dict[str, list[Viol]] = defaultdict(list)
+    for viol in viols:
+        for size in matching_sizes(viol.size):
+            viols_by_size[size].append(viol)
+
+    matches: WaitingListMatches = {'by_viol': {}, 'by_entry': {}}
+    if not viols:
+        return matches
+
+    entries = WaitingList.objects.filter(
+        Q(viol_num__in=viols_by_pk) | Q(viol_num__isnull=True, size__in=viols_by_size)
+    ).select_related(
+        'renter_num'
+    ).order_by(F('date_req').asc(nulls_last=True), 'entry_num')
+
+    for entry in entries:
+        if entry.viol_num_id is not None:
+            entry_viols = [viols_by_pk[entry.viol_num_id]]
+        else:
+            entry_viols = viols_by_size[entry.size]
+
+        matches['by_entry'][entry.pk] = entry_viols
+        for viol in entry_viols:
+            matches['by_viol'].setdefault(viol.pk, []).append(entry)
+
+    return matches
@@ -0,0 +1,234 @@
+"""
+Contains the pieces of our logging setup (see settings.LOGGING):
+    - QueueingFileHandler only puts records on a queue, so that logging
+      never waits on the disk in a request thread. A QueueListener
+      thread appends them to a file as JSON lines (see JsonFormatter).
+      Every uwsgi worker and cron job appends to the same file, so none
+      of them rotate it. logrotate does (see
+      deployment/prod/logrotate.conf), and each process starts a new
+      file once it notices the old one was moved.
+    - RequestContextFilter adds the current request's id, user id, and
+      view name to every record logged while handling it.
+    - AccessLogMiddleware gives each request an id (taken from the
+      X-Request-ID header if the front server set one, and sent back
+      in the response's X-Request-ID header) and logs one
+      "vdgsa_backend.access" line per request with its status and
+      duration.
+
+This module is imported by logging.config while settings are being
+loaded, so it must not import models.
+"""
+
+from __future__ import annotations
+
+import atexit
+import contextvars
+import copy
+import datetime
+import json
+import logging
+import os
+import queue
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener, WatchedFileHandler
+from typing import Any, Callable, Final, Iterator
+
+from django.http import HttpRequest
+from django.http.response import HttpResponseBase
+from django.utils.functional import empty
+
+from vdgsa_backend.streaming import when_content_done
+
+access_logger = logging.getLogger('vdgsa_backend.access')
+
+REQUEST_ID_HEADER: Final = 'X-Request-ID'
+# Request ids from the X-Request-ID header that don't match this are
+# replaced, so that clients can't put arbitrary text in our logs.
+_REQUEST_ID_RE: Final = re.compile(r'^[\w.-]{1,64}$')
+
+# Attributes every LogRecord has. Anything else on a record came from
+# the "extra" argument or RequestContextFilter and is written as its
+# own JSON field.
+_STANDARD_RECORD_ATTRS: Final = set(
+    logging.LogRecord('', 0, '', 0, '', None, None).__dict__) | {'message', 'asctime'}
+
+_current_request: contextvars.ContextVar[HttpRequest | None] = contextvars.ContextVar(
+    'current_request', default=None)
+
+
+def get_request_id(request: HttpRequest) -> str:
+    return getattr(request, 'request_id', '')
+
+
+def _loaded_user_id(request: HttpRequest) -> int | None:
+    """
+    The id of request's user if it's logged in and has already been
+    loaded. Logging shouldn't be what triggers loading the user, since
+    that's a database query.
+    """
+    user = getattr(request, 'user', None)
+    if user is None or getattr(user, '_wrapped', None) is empty:
+        return None
+    return user.pk if user.is_authenticated else None
+
+
+def _view_name(request: HttpRequest) -> str:
+    resolver_match = getattr(request, 'resolver_match', None)
+    return resolver_match.view_name if resolver_match is not None else ''
+
+
+@contextmanager
+def _request_context(request: HttpRequest) -> Iterator[None]:
+    token = _current_request.set(request)
+    try:
+        yield
+    finally:
+        _current_request.reset(token)
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Adds request_id, user_id, and view attributes to records logged
+    while a request is being handled, or that were given the request.
+    Attach it to handlers, not loggers, so that it sees records from
+    every logger.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        request = _current_request.get()
+        if request is None:
+            # Django logs failed responses to "django.request" after the
+            # middleware has returned, passing the request along.
+            request = getattr(record, 'request', None)
+        if isinstance(request, HttpRequest):
+            for name, value in [
+                ('request_id', get_request_id(request)),
+                ('user_id', _loaded_user_id(request)),
+                ('view', _view_name(request)),
+            ]:
+                if not hasattr(record, name):
+                    setattr(record, name, value)
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line, with the time, level,
+    logger name, message, traceback if any, and any extra attributes.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: dict[str, Any] = {
+            'time': datetime.datetime.fromtimestamp(
+                record.created, datetime.timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(
+            (name, value) for name, value in record.__dict__.items()
+            if name not in _STANDARD_RECORD_ATTRS)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc_info'] = record.exc_text
+        if record.stack_info:
+            entry['stack_info'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str)
+
+
+class QueueingFileHandler(QueueHandler):
+    """
+    Appends JSON lines to filename from a background thread, reopening
+    it if it's moved or deleted (e.g. by logrotate).
+
+    The thread is started again in processes forked after this is
+    created (uwsgi loads the app, and so configures logging, before
+    forking its workers), and stopped at exit after writing what's left
+    in the queue.
+    """
+
+    def __init__(self, filename: str) -> None:
+        super().__init__(queue.SimpleQueue())
+        self.file_handler = WatchedFileHandler(filename, delay=True)
+        self.file_handler.setFormatter(JsonFormatter())
+        self._start_listener()
+        os.register_at_fork(after_in_child=self._restart_after_fork)
+        atexit.register(self.stop)
+
+    def _start_listener(self) -> None:
+        self.listener = QueueListener(self.queue, self.file_handler, respect_handler_level=True)
+        self.listener.start()
+        self._listening = True
+
+    def _restart_after_fork(self) -> None:
+        # The listener thread wasn't copied into this process, and the
+        # parent may have left records in the queue that it will write
+        # itself.
+        self.queue = queue.SimpleQueue()
+        self._start_listener()
+
+    def stop(self) -> None:
+        """Writes the records still in the queue and stops the thread."""
+        if self._listening:
+            self._listening = False
+            self.listener.stop()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Unlike QueueHandler.prepare, this keeps the traceback out of
+        # the message so that it gets its own JSON field.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class AccessLogMiddleware:
+    """
+    Install this first in settings.MIDDLEWARE so that the durations it
+    logs include the other middleware and so that everything logged
+    while handling a request gets its id.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponseBase]) -> None:
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponseBase:
+        request_id = request.headers.get(REQUEST_ID_HEADER, '')
+        if not _REQUEST_ID_RE.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id  # type: ignore
+
+        start = time.perf_counter()
+        with _request_context(request):
+            response = self.get_response(request)
+        response[REQUEST_ID_HEADER] = request_id
+
+        # Streaming responses (e.g. CSV exports) do most of their work
+        # after this returns.
+        return when_content_done(
+            response,
+            lambda: _log_access(request, response, time.perf_counter() - start),
+            context=lambda: _request_context(request),
+        )
+
+
+def _log_access(request: HttpRequest, response: HttpResponseBase, elapsed: float) -> None:
+    duration_ms = round(elapsed * 1000, 1)
+    access_logger.info(
+        '%s %s %s %.1fms', request.method, request.path, response.status_code, duration_ms,
+        extra={
+            'request_id': get_request_id(request),
+            'user_id': _loaded_user_id(request),
+            'view': _view_name(request),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': duration_ms,
+        })
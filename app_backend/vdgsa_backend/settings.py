@@ -14,8 +14,6 @@ from pathlib import Path
 from typing import List
 import os
 
-import stripe  # type: ignore
-from bleach.sanitizer import ALLOWED_ATTRIBUTES  # type: ignore
 from django.urls.base import reverse_lazy
 
 
@@ -52,8 +50,10 @@ elif _deployment_mode in ['dev', 'unit_test']:
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-stripe.api_key = get_docker_secret('stripe_private_key')
-stripe.api_version = '2013-12-03'
+# See vdgsa_backend.stripe_client, which hands these to the stripe
+# library when it's first imported.
+STRIPE_PRIVATE_KEY = get_docker_secret('stripe_private_key')
+STRIPE_API_VERSION = '2013-12-03'
 STRIPE_PUBLIC_KEY = os.environ.get('STRIPE_PUBLIC_KEY')
 
 # Quick-start development settings - unsuitable for production
@@ -112,13 +112,29 @@ INSTALLED_APPS = [
     'markdownify.apps.MarkdownifyConfig',
 ]
 
+# The order of our middleware matters:
+# - AccessLogMiddleware is first, so that the durations it logs include
+#   all the other middleware, and everything logged while handling a
+#   request gets the request's id.
+# - InstrumentationMiddleware is next, so that the metrics, query
+#   budget, and slow query log include the queries made by the rest of
+#   the middleware (e.g. loading the session and user).
+# - ReplicaRoutingMiddleware is before SessionMiddleware and
+#   AuthenticationMiddleware, so that their writes (e.g. logging in)
+#   pin the user to the primary database.
+# - ProfilingMiddleware is after AuthenticationMiddleware, since only
+#   staff can turn profiling on.
 MIDDLEWARE = [
+    'vdgsa_backend.request_logging.AccessLogMiddleware',
+    'vdgsa_backend.instrumentation.InstrumentationMiddleware',
+    'vdgsa_backend.db_routing.ReplicaRoutingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'vdgsa_backend.profiling.ProfilingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -161,6 +177,32 @@ DATABASES = {
     }
 }
 
+# A read-only replica of the default database that reports and exports
+# read from, if DATABASE_REPLICA_HOST is set. See
+# vdgsa_backend/db_routing.py. In unit tests this can be any second
+# Postgres server; the tests that use it are skipped without one.
+if os.environ.get('DATABASE_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DATABASE_REPLICA_HOST'],
+        'PORT': os.environ.get('DATABASE_REPLICA_PORT', '5432'),
+    }
+DATABASE_ROUTERS = ['vdgsa_backend.db_routing.ReplicaRouter']
+
+# The file-based cache is shared by all of the app server processes,
+# so invalidating an entry in one process is seen by the others.
+# Unit tests use an in-memory cache instead. It lasts for the whole test
+# run, so tests that read cached values (e.g. the who's coming list or
+# the rental inventory summary) clear it in setUp.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': '/tmp/vdgsa_cache',
+    } if _deployment_mode != 'unit_test' else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
 DEFAULT_FROM_EMAIL = 'VdGSA Website <webmaster@vdgsa.org>'
 SERVER_EMAIL = DEFAULT_FROM_EMAIL
 
@@ -208,6 +250,12 @@ STATICFILES_FINDERS = (
     "django.contrib.staticfiles.finders.AppDirectoriesFinder",
 )
 
+# Hashed file names and precompressed copies, see
+# vdgsa_backend.static_files. Not used in dev or tests, since
+# {% static %} fails for files that collectstatic hasn't processed.
+if _deployment_mode == 'prod':
+    STATICFILES_STORAGE = 'vdgsa_backend.static_files.CompressedManifestStaticFilesStorage'
+
 MARKDOWNIFY = {
     "default": {
         "WHITELIST_TAGS": [
@@ -225,9 +273,12 @@ MARKDOWNIFY = {
             'ul',
             'br',
         ],
+        # bleach's default ALLOWED_ATTRIBUTES plus "target" on links.
+        # Copied here so that loading settings doesn't import bleach.
         "WHITELIST_ATTRS": {
-            **ALLOWED_ATTRIBUTES,
-            'a': ALLOWED_ATTRIBUTES.get('a') + ['target']
+            'a': ['href', 'title', 'target'],
+            'abbr': ['title'],
+            'acronym': ['title'],
         },
         "MARKDOWN_EXTENSIONS": [
             'markdown.extensions.attr_list',
@@ -235,6 +286,8 @@ MARKDOWNIFY = {
     }
 }
 
+# Log files are written as JSON lines by a background thread, so that
+# logging doesn't block requests. See vdgsa_backend/request_logging.py.
 LOGGING = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -243,6 +296,11 @@ LOGGING = {
             'format': '[contactor] %(levelname)s %(asctime)s %(message)s'
         },
     },
+    'filters': {
+        'request_context': {
+            '()': 'vdgsa_backend.request_logging.RequestContextFilter',
+        },
+    },
     'handlers': {
         # Send all messages to console
         'console': {
@@ -251,8 +309,16 @@ LOGGING = {
         },
         'file': {
             'level': 'DEBUG',
-            'class': 'logging.FileHandler',
+            'class': 'vdgsa_backend.request_logging.QueueingFileHandler',
             'filename': 'vdgsa_app.log',
+            'filters': ['request_context'],
+        },
+        # See vdgsa_backend/slow_queries.py
+        'slow_queries': {
+            'level': 'DEBUG',
+            'class': 'vdgsa_backend.request_logging.QueueingFileHandler',
+            'filename': 'slow_queries.log',
+            'filters': ['request_context'],
         },
     },
     'loggers': {
@@ -261,6 +327,17 @@ LOGGING = {
             'handlers': ['file'],
             'propagate': False,
         },
+        # One line per request. See AccessLogMiddleware.
+        'vdgsa_backend.access': {
+            'handlers': ['file'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+        'vdgsa_backend.slow_queries': {
+            'handlers': ['slow_queries'],
+            'level': 'INFO',
+            'propagate': False,
+        },
     }
 }
 
@@ -270,3 +347,55 @@ MAX_NUM_FAMILY_MEMBERS = 3
 
 MEDIA_ROOT = BASE_DIR.parent / 'uploads'
 MEDIA_URL = '/uploads/'
+
+# How views that check permissions before sending an uploaded file hand
+# the transfer off to the front server: 'nginx', 'uwsgi', or unset to
+# stream from Django. See vdgsa_backend/protected_files.py.
+PROTECTED_FILE_OFFLOAD = os.environ.get('PROTECTED_FILE_OFFLOAD') or None
+PROTECTED_FILE_ACCEL_PREFIX = '/protected_uploads/'
+
+# Per-request SQL query counting. See vdgsa_backend/query_budget.py.
+QUERY_BUDGET_ENABLED = (
+    _deployment_mode == 'dev' or os.environ.get('QUERY_BUDGET_ENABLED', '').lower() == 'true')
+# Whether to add X-Query-Count and X-Query-Time-Ms headers to responses.
+QUERY_BUDGET_HEADERS = DEBUG
+# Requests that take at least this long or make at least this many
+# queries are logged with a summary of their queries.
+QUERY_BUDGET_SLOW_REQUEST_MS = 1000
+QUERY_BUDGET_MAX_QUERIES = 50
+
+# Queries that take at least this long are logged to slow_queries.log
+# along with the code that made them, and the last
+# SLOW_QUERY_BUFFER_SIZE of them are listed for staff at /slow_queries/.
+# See vdgsa_backend/slow_queries.py.
+SLOW_QUERY_THRESHOLD_MS = int(os.environ.get('SLOW_QUERY_THRESHOLD_MS', '200'))
+SLOW_QUERY_BUFFER_SIZE = 500
+
+# The database alias that views using ReadFromReplicaMixin read from, or
+# None to use the primary. Users read from the primary for
+# REPLICA_STICKY_SECONDS after they change something, and everyone does
+# while the replica is more than REPLICA_MAX_LAG_SECONDS behind. See
+# vdgsa_backend/db_routing.py. Unit tests that use the replica set this
+# themselves.
+REPLICA_DATABASE = (
+    'replica' if 'replica' in DATABASES and _deployment_mode != 'unit_test' else None)
+REPLICA_STICKY_SECONDS = 30
+REPLICA_MAX_LAG_SECONDS = 10
+
+# Whether staff can profile requests, and how many saved profiles to
+# keep for how long. See vdgsa_backend/profiling.py.
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'true').lower() == 'true'
+PROFILE_MAX_COUNT = 50
+PROFILE_MAX_AGE_DAYS = 14
+
+# If set, clients must send this as a bearer token to read the
+# Prometheus metrics at /metrics, and METRICS_ALLOWED_IPS is ignored.
+# See vdgsa_backend/metrics.py.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+# Otherwise, the addresses and networks (comma-separated in the
+# environment variable) that can read them.
+METRICS_ALLOWED_IPS = [
+    network.strip()
+    for network in os.environ.get('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+    if network.strip()
+]
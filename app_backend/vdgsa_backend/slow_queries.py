@@ -0,0 +1,197 @@
+"""
+Contains tools for finding which of our code makes slow database
+queries:
+    - InstrumentationMiddleware (see vdgsa_backend/instrumentation.py)
+      times every query a request makes. Queries that take at least
+      settings.SLOW_QUERY_THRESHOLD_MS are recorded by record_slow_query
+      with the line of our code that made them (the innermost frame
+      inside vdgsa_backend), the URL name of the view, and their
+      parameters with anything but numbers redacted.
+    - Recorded queries are logged to slow_queries.log (see
+      settings.LOGGING) and kept in a ring buffer of the last
+      settings.SLOW_QUERY_BUFFER_SIZE queries.
+    - SlowQueryView shows staff the buffer grouped by call site, worst
+      first.
+
+uwsgi runs several worker processes and each has its own buffer, so
+the page only shows what the worker that served it has seen. The log
+file has every slow query.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+import traceback
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+from typing import Any, Final, Iterator, TypedDict
+
+from django.conf import settings
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
+from django.http import HttpRequest
+from django.utils import timezone
+from django.views.generic.base import TemplateView
+
+from vdgsa_backend import query_budget
+from vdgsa_backend.query_budget import QueryStats
+
+logger = logging.getLogger(__name__)
+
+UNKNOWN_CALL_SITE: Final = '<unknown>'
+
+_PACKAGE_DIR: Final = Path(__file__).resolve().parent
+# Frames in these files are our instrumentation wrapping the query,
+# not the code that made the query.
+_INSTRUMENTATION_FILES: Final = {
+    str(Path(query_budget.__file__).resolve()),  # type: ignore
+    str(Path(__file__).resolve()),
+}
+
+
+class SlowQuery(TypedDict):
+    sql: str
+    params: str
+    duration_ms: float
+    call_site: str
+    view: str
+    recorded_at: datetime.datetime
+
+
+class CallSiteSummary(TypedDict):
+    call_site: str
+    count: int
+    total_ms: float
+    max_ms: float
+    views: list[str]
+    # The SQL of the slowest query made here.
+    slowest_sql: str
+
+
+_slow_queries: deque[SlowQuery] = deque(maxlen=settings.SLOW_QUERY_BUFFER_SIZE)
+
+
+def recent_slow_queries() -> list[SlowQuery]:
+    """The slow queries in this process's buffer, oldest first."""
+    return list(_slow_queries)
+
+
+def clear_slow_queries() -> None:
+    _slow_queries.clear()
+
+
+def summarize_by_call_site(slow_queries: list[SlowQuery]) -> list[CallSiteSummary]:
+    """Groups slow_queries by call site, most total time first."""
+    summaries: dict[str, CallSiteSummary] = {}
+    for query in slow_queries:
+        summary = summaries.setdefault(query['call_site'], {
+            'call_site': query['call_site'],
+            'count': 0,
+            'total_ms': 0.0,
+            'max_ms': 0.0,
+            'views': [],
+            'slowest_sql': '',
+        })
+        summary['count'] += 1
+        summary['total_ms'] += query['duration_ms']
+        if query['duration_ms'] >= summary['max_ms']:
+            summary['max_ms'] = query['duration_ms']
+            summary['slowest_sql'] = query['sql']
+        if query['view'] not in summary['views']:
+            summary['views'].append(query['view'])
+
+    return sorted(summaries.values(), key=lambda summary: summary['total_ms'], reverse=True)
+
+
+def redact_params(params: Any, many: bool = False) -> str:
+    """
+    Replaces everything in params but numbers, booleans, and None with
+    the name of its type, so that names, email addresses, and the like
+    don't end up in the log.
+    """
+    if params is None:
+        return ''
+    if many:
+        return f'<{len(params)} rows>'
+    if isinstance(params, dict):
+        items = [f'{key!r}: {_redact_value(value)}' for key, value in params.items()]
+        return '{' + ', '.join(items) + '}'
+    return '[' + ', '.join(_redact_value(value) for value in params) + ']'
+
+
+def _redact_value(value: Any) -> str:
+    if value is None or isinstance(value, (bool, int, float)):
+        return repr(value)
+    return f'<{type(value).__name__}>'
+
+
+def find_call_site() -> str:
+    """
+    Returns "path/to/file.py:line in function" for the innermost frame
+    of the current stack that's in vdgsa_backend, not counting our
+    instrumentation.
+    """
+    for frame, lineno in traceback.walk_stack(None):
+        path = Path(frame.f_code.co_filename).resolve()
+        if str(path) in _INSTRUMENTATION_FILES:
+            continue
+        try:
+            relative_path = path.relative_to(_PACKAGE_DIR)
+        except ValueError:
+            continue
+        return f'{relative_path}:{lineno} in {frame.f_code.co_name}'
+    return UNKNOWN_CALL_SITE
+
+
+@contextmanager
+def capture_slow_queries(request: HttpRequest | None = None) -> Iterator[None]:
+    """
+    Records the slow queries made on every database connection while
+    this is active, for code that runs outside of a request.
+    """
+    stats = QueryStats(
+        track_shapes=False, on_slow_query=partial(record_slow_query, request=request))
+    with stats.record():
+        yield
+
+
+def record_slow_query(
+    sql: str, params: Any, many: bool, duration_ms: float, request: HttpRequest | None = None
+) -> None:
+    """
+    Logs a slow query and adds it to the buffer. The view name is
+    taken from request once it has been resolved.
+    """
+    resolver_match = getattr(request, 'resolver_match', None)
+    slow_query: SlowQuery = {
+        'sql': sql,
+        'params': redact_params(params, many),
+        'duration_ms': duration_ms,
+        'call_site': find_call_site(),
+        'view': resolver_match.view_name if resolver_match is not None else '',
+        'recorded_at': timezone.now(),
+    }
+    _slow_queries.append(slow_query)
+    logger.warning(
+        'Slow query (%.1f ms) at %s, view %s: %s params=%s',
+        duration_ms, slow_query['call_site'], slow_query['view'] or '-',
+        sql, slow_query['params'])
+
+
+class SlowQueryView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """Show staff the slow queries this process has seen, by call site"""
+    template_name = 'slow_queries.html'
+
+    def test_func(self) -> bool:
+        return self.request.user.is_staff
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        slow_queries = recent_slow_queries()
+        context['call_sites'] = summarize_by_call_site(slow_queries)
+        context['num_slow_queries'] = len(slow_queries)
+        context['threshold_ms'] = settings.SLOW_QUERY_THRESHOLD_MS
+        context['buffer_size'] = settings.SLOW_QUERY_BUFFER_SIZE
+        return context
@@ -0,0 +1,75 @@
+"""
+Contains CompressedManifestStaticFilesStorage (used in production, see
+settings.STATICFILES_STORAGE), which makes collectstatic add a hash of
+each file's contents to its name (e.g. "base.1a2b3c4d5e6f.css"), which
+{% static %} then links to, and write gzip (and, if the brotli package
+is installed, brotli) compressed copies of each file next to it, e.g.
+"base.1a2b3c4d5e6f.css.gz".
+
+uwsgi serves them without going through Django (see the [static]
+section of deployment/prod/uwsgi.ini). It sends the compressed copy if
+the browser accepts it, and lets browsers cache files with hashed names
+for a year, since those never change.
+"""
+
+from __future__ import annotations
+
+import gzip
+import os
+from types import ModuleType
+from typing import Any, Final, Iterator
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+# Formats that are already compressed.
+_INCOMPRESSIBLE_EXTENSIONS: Final = {
+    '.gif', '.png', '.jpg', '.jpeg', '.webp', '.woff', '.woff2', '.zip', '.gz', '.br',
+}
+# Compressed copies that don't save at least this fraction of the
+# original's size aren't kept.
+_MIN_SAVINGS: Final = 0.05
+
+
+def _brotli() -> ModuleType | None:
+    try:
+        import brotli  # type: ignore
+    except ImportError:
+        return None
+    return brotli
+
+
+def _compress(path: str) -> list[str]:
+    """
+    Writes compressed copies of the file at path next to it and returns
+    the suffixes added to their names.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    # mtime=0 so that compressing the same file again gives the same bytes.
+    compressed = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    brotli = _brotli()
+    if brotli is not None:
+        compressed['.br'] = brotli.compress(data, quality=11)
+
+    written = []
+    for suffix, content in compressed.items():
+        if len(content) > len(data) * (1 - _MIN_SAVINGS):
+            continue
+        with open(path + suffix, 'wb') as f:
+            f.write(content)
+        written.append(suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        yield from super().post_process(*args, **kwargs)
+        if kwargs.get('dry_run'):
+            return
+
+        for name in sorted(set(self.hashed_files.values())):
+            if os.path.splitext(name)[1].lower() in _INCOMPRESSIBLE_EXTENSIONS:
+                continue
+            for suffix in _compress(self.path(name)):
+                yield name, name + suffix, True
@@ -0,0 +1,47 @@
+"""
+Contains when_content_done, for middleware that need to do something
+once a response's content has been produced. Streaming responses
+(e.g. CSV exports) produce theirs, and make most of their queries,
+after the middleware have returned, while the server sends them.
+"""
+
+from __future__ import annotations
+
+from contextlib import AbstractContextManager, nullcontext
+from typing import Callable, Iterator
+
+from django.http.response import HttpResponseBase
+
+
+def when_content_done(
+    response: HttpResponseBase,
+    callback: Callable[[], None] | None = None,
+    *,
+    context: Callable[[], AbstractContextManager[object]] | None = None,
+) -> HttpResponseBase:
+    """
+    Calls callback once response's content has been produced: right
+    away, or for a streaming response, after its last chunk. If
+    context is given, a streaming response's content is produced
+    inside context() (e.g. so that its queries are still recorded).
+    Returns response.
+    """
+    if not response.streaming:
+        if callback is not None:
+            callback()
+        return response
+
+    response.streaming_content = _wrap_stream(  # type: ignore
+        response.streaming_content, callback, context)  # type: ignore
+    return response
+
+
+def _wrap_stream(
+    content: Iterator[bytes],
+    callback: Callable[[], None] | None,
+    context: Callable[[], AbstractContextManager[object]] | None,
+) -> Iterator[bytes]:
+    with context() if context is not None else nullcontext():
+        yield from content
+    if callback is not None:
+        callback()
@@ -0,0 +1,28 @@
+"""
+Contains get_stripe, which imports and configures the stripe library
+the first time it's needed.
+
+stripe is a large package and most requests (and every worker at boot)
+never talk to Stripe, so views that do should call get_stripe() instead
+of importing stripe at module level.
+"""
+
+from __future__ import annotations
+
+import functools
+from typing import Any
+
+from django.conf import settings
+
+
+@functools.cache
+def get_stripe() -> Any:
+    """
+    Returns the stripe module with its API key and version set from
+    settings.STRIPE_PRIVATE_KEY and settings.STRIPE_API_VERSION.
+    """
+    import stripe  # type: ignore
+
+    stripe.api_key = settings.STRIPE_PRIVATE_KEY
+    stripe.api_version = settings.STRIPE_API_VERSION
+    return stripe
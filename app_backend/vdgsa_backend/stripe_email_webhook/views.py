@@ -3,12 +3,14 @@ from __future__ import annotations
 import json
 from typing import Any, Dict, Final, List
 
-import stripe  # type: ignore
 from django.core.mail import EmailMessage
 from django.http.request import HttpRequest
 from django.http.response import HttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
+from vdgsa_backend.metrics import STRIPE_WEBHOOK_EVENTS
+from vdgsa_backend.stripe_client import get_stripe
+
 LINE_ITEM_NAMES_TO_OFFICER_EMAILS: Final[Dict[str, List[str]]] = {
     'advertising': ['advertising@vdgsa.org'],
     'Rental Viol': ['rentalviol@vdgsa.org'],
@@ -26,12 +28,14 @@ def stripe_officer_email_view(request: HttpRequest, *args: Any, **kwargs: Any) -
     Send emails to the right officers (treasurer, rental viol manager)
     upon receiving payments from stripe.
     """
+    stripe = get_stripe()
     try:
         request_data = json.loads(request.body)
         event = stripe.Event.construct_from(
             request_data, stripe.api_key
         )
     except (ValueError, stripe.error.SignatureVerificationError) as e:
+        STRIPE_WEBHOOK_EVENTS.labels('officer_email', '', 'invalid').inc()
         return HttpResponse(str(e), status=400)
 
     if event.type == 'checkout.session.completed':
@@ -64,6 +68,8 @@ def stripe_officer_email_view(request: HttpRequest, *args: Any, **kwargs: Any) -
             )
             email.send(fail_silently=True)
 
+        STRIPE_WEBHOOK_EVENTS.labels('officer_email', event.type, 'emails_sent').inc()
         return HttpResponse('Emails sent')
 
+    STRIPE_WEBHOOK_EVENTS.labels('officer_email', event.type, 'ignored').inc()
     return HttpResponse(f'No action taken for "{event.type}" event')
@@ -0,0 +1,108 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from vdgsa_backend.accounts.models import MembershipSubscription, User
+from vdgsa_backend.benchmarks import (
+    BENCHMARK_CONCLAVE_YEAR, BENCHMARK_EMAIL_DOMAIN, BENCHMARK_MAKER, has_benchmark_data
+)
+from vdgsa_backend.conclave_registration.models import ConclaveRegistrationConfig
+from vdgsa_backend.conclave_registration.summary_and_charges import get_charges_summary
+from vdgsa_backend.rental_viols.models import CurrentRental, Viol
+
+
+class BenchmarkCommandsTestCase(TestCase):
+    def _seed(self, *args: str) -> str:
+        out = StringIO()
+        call_command(
+            'seed_benchmark_data', '--users=60', '--registrations=30', '--viols=20', *args,
+            stdout=out)
+        return out.getvalue()
+
+    def test_seed_benchmark_data(self) -> None:
+        output = self._seed()
+        self.assertIn('60 users', output)
+        self.assertIn('30 registration_entries', output)
+        self.assertIn('48 classes', output)
+
+        # Plus the staff user.
+        self.assertEqual(
+            61, User.objects.filter(username__endswith=BENCHMARK_EMAIL_DOMAIN).count())
+        self.assertTrue(User.objects.filter(subscription_is_family_member_for__isnull=False))
+        self.assertTrue(MembershipSubscription.objects.filter(valid_until=None))
+
+        conclave_config = ConclaveRegistrationConfig.objects.get(year=BENCHMARK_CONCLAVE_YEAR)
+        entries = conclave_config.registration_entries.all()
+        self.assertEqual(30, len(entries))
+        for entry in entries:
+            self.assertTrue(entry.is_finalized)
+            self.assertTrue(hasattr(entry, 'housing'))
+            self.assertTrue(hasattr(entry, 'tshirts'))
+            self.assertEqual(
+                entry.class_selection_is_required, hasattr(entry, 'regular_class_choices'))
+            get_charges_summary(entry)
+
+        viols = Viol.objects.filter(maker=BENCHMARK_MAKER)
+        self.assertEqual(20, viols.count())
+        self.assertEqual(
+            viols.filter(renter__isnull=False).count(),
+            CurrentRental.objects.filter(viol__in=viols).count())
+
+    def test_same_seed_same_data(self) -> None:
+        self._seed()
+        first = list(User.objects.order_by('username').values_list('username', flat=True))
+        self._seed('--clear')
+        self.assertEqual(
+            first, list(User.objects.order_by('username').values_list('username', flat=True)))
+
+    def test_refuses_to_seed_twice(self) -> None:
+        self._seed()
+        with self.assertRaisesMessage(CommandError, 'Use --clear'):
+            self._seed()
+
+    def test_clear(self) -> None:
+        self._seed()
+        self._seed('--clear')
+        self.assertEqual(1, ConclaveRegistrationConfig.objects.count())
+        self.assertEqual(20, Viol.objects.filter(maker=BENCHMARK_MAKER).count())
+
+    def test_run_benchmarks(self) -> None:
+        self._seed()
+        out = StringIO()
+        call_command('run_benchmarks', '--repeat=1', stdout=out)
+        results = json.loads(out.getvalue())
+
+        self.assertEqual(
+            [
+                'directory_search',
+                'all_users_csv',
+                'registration_entries_csv',
+                'list_registration_entries',
+                'list_viols',
+                'conclave_payment',
+            ],
+            [result['name'] for result in results]
+        )
+        for result in results:
+            self.assertEqual(200, result['status_code'], result['name'])
+            self.assertGreater(result['response_bytes'], 0)
+            self.assertGreater(result['num_queries'], 0)
+            self.assertGreater(result['wall_time_ms']['median'], 0)
+            self.assertGreater(result['peak_memory_kb'], 0)
+
+    def test_run_benchmarks_only(self) -> None:
+        self._seed()
+        out = StringIO()
+        call_command('run_benchmarks', '--repeat=1', '--only', 'list_viols', stdout=out)
+        self.assertEqual(['list_viols'], [result['name'] for result in json.loads(out.getvalue())])
+
+        with self.assertRaisesMessage(CommandError, 'Unknown benchmark(s): spam'):
+            call_command('run_benchmarks', '--only', 'spam', stdout=out)
+
+    def test_run_benchmarks_without_data(self) -> None:
+        self.assertFalse(has_benchmark_data())
+        with self.assertRaisesMessage(CommandError, 'Run seed_benchmark_data first'):
+            call_command('run_benchmarks', stdout=StringIO())
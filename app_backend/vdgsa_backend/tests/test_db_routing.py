@@ -0,0 +1,141 @@
+import time
+import unittest
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.db_routing import (
+    REPLICA_PIN_COOKIE, ReplicaRouter, replica_reads, reset_replica_lag_check
+)
+
+# See DATABASE_REPLICA_HOST in settings.py.
+_HAS_REPLICA = 'replica' in settings.DATABASES
+
+
+def _make_membership_secretary(username: str) -> User:
+    user = User.objects.create_user(username, password='password')
+    user.user_permissions.add(Permission.objects.get(codename='membership_secretary'))
+    return user
+
+
+class ReplicaRouterTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        reset_replica_lag_check()
+        self.addCleanup(reset_replica_lag_check)
+        self.router = ReplicaRouter()
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_no_replica_configured(self) -> None:
+        with replica_reads():
+            self.assertIsNone(self.router.db_for_read(User))
+
+    # Routing to the default database as if it were a replica lets us
+    # check the routing decisions without a second database.
+    @override_settings(REPLICA_DATABASE='default')
+    def test_replica_reads(self) -> None:
+        self.assertIsNone(self.router.db_for_read(User))
+        with replica_reads():
+            self.assertEqual('default', self.router.db_for_read(User))
+            User.objects.create_user('spam@wee.com')
+            # Read your own writes.
+            self.assertIsNone(self.router.db_for_read(User))
+
+    @override_settings(REPLICA_DATABASE='default', REPLICA_MAX_LAG_SECONDS=-1)
+    def test_replica_too_far_behind(self) -> None:
+        with self.assertLogs('vdgsa_backend.db_routing', 'WARNING'), replica_reads():
+            self.assertIsNone(self.router.db_for_read(User))
+
+
+@override_settings(REPLICA_DATABASE='default')
+class ReplicaStickinessTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        reset_replica_lag_check()
+        self.addCleanup(reset_replica_lag_check)
+        self.secretary = _make_membership_secretary('memsec@wee.com')
+
+    def _uses_replica(self) -> bool:
+        # The replica's lag is only checked when a read might go to it.
+        reset_replica_lag_check()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('all-users-csv'))
+        self.assertEqual(200, response.status_code)
+        return any('pg_is_in_recovery' in query['sql'] for query in queries)
+
+    def test_write_pins_user_to_primary(self) -> None:
+        self.client.force_login(self.secretary)
+        self.assertTrue(self._uses_replica())
+        self.assertNotIn(REPLICA_PIN_COOKIE, self.client.cookies)
+
+        # Logging in writes the session and last_login.
+        response = self.client.post(
+            reverse('login'), {'username': 'memsec@wee.com', 'password': 'password'})
+        self.assertGreater(
+            float(response.cookies[REPLICA_PIN_COOKIE].value),
+            time.time() + settings.REPLICA_STICKY_SECONDS - 5)
+        self.assertFalse(self._uses_replica())
+
+        self.client.cookies[REPLICA_PIN_COOKIE] = str(time.time() - 1)
+        self.assertTrue(self._uses_replica())
+
+    def test_unmarked_views_use_primary(self) -> None:
+        self.client.force_login(self.secretary)
+        reset_replica_lag_check()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('membership-secretary'))
+        self.assertFalse(any('pg_is_in_recovery' in query['sql'] for query in queries))
+
+    @override_settings(REPLICA_DATABASE=None)
+    def test_no_cookie_without_replica(self) -> None:
+        response = self.client.post(
+            reverse('login'), {'username': 'memsec@wee.com', 'password': 'password'})
+        self.assertNotIn(REPLICA_PIN_COOKIE, response.cookies)
+
+
+@unittest.skipUnless(_HAS_REPLICA, 'Set DATABASE_REPLICA_HOST to a second Postgres server')
+@override_settings(REPLICA_DATABASE='replica')
+class SecondDatabaseTestCase(TestCase):
+    """
+    The test "replica" is an independent database rather than a copy
+    of the primary, so which one a query read from shows in its
+    results.
+    """
+    databases = {'default', 'replica'} if _HAS_REPLICA else {'default'}
+
+    def setUp(self) -> None:
+        super().setUp()
+        reset_replica_lag_check()
+        self.addCleanup(reset_replica_lag_check)
+        self.secretary = _make_membership_secretary('memsec@wee.com')
+        User.objects.db_manager('replica').create_user('replica_only@wee.com')
+
+    def _all_users_csv(self) -> str:
+        response = self.client.get(reverse('all-users-csv'), {'all_users': 'true'})
+        self.assertEqual(200, response.status_code)
+        return response.content.decode()
+
+    def test_report_reads_from_replica(self) -> None:
+        self.client.force_login(self.secretary)
+        content = self._all_users_csv()
+        self.assertIn('replica_only@wee.com', content)
+        self.assertNotIn('memsec@wee.com', content)
+
+    def test_read_your_writes(self) -> None:
+        self.client.post(
+            reverse('login'), {'username': 'memsec@wee.com', 'password': 'password'})
+        content = self._all_users_csv()
+        self.assertIn('memsec@wee.com', content)
+        self.assertNotIn('replica_only@wee.com', content)
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=-1)
+    def test_falls_back_to_primary_when_replica_behind(self) -> None:
+        self.client.force_login(self.secretary)
+        with self.assertLogs('vdgsa_backend.db_routing', 'WARNING'):
+            content = self._all_users_csv()
+        self.assertIn('memsec@wee.com', content)
@@ -0,0 +1,49 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from vdgsa_backend.import_time import measure_startup, parse_import_times, totals_by_package
+
+REPORT = '''\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     spam.eggs
+import time:       300 |        420 |   spam
+import time:      1000 |       1000 |   ham
+Some other output
+import time:        50 |       1470 | vdgsa_backend.urls
+'''
+
+
+class ImportTimeTestCase(SimpleTestCase):
+    def test_parse_import_times(self) -> None:
+        self.assertEqual(
+            [
+                {'module': 'spam.eggs', 'self_us': 120, 'cumulative_us': 120, 'depth': 2},
+                {'module': 'spam', 'self_us': 300, 'cumulative_us': 420, 'depth': 1},
+                {'module': 'ham', 'self_us': 1000, 'cumulative_us': 1000, 'depth': 1},
+                {'module': 'vdgsa_backend.urls', 'self_us': 50, 'cumulative_us': 1470,
+                 'depth': 0},
+            ],
+            parse_import_times(REPORT))
+
+    def test_totals_by_package(self) -> None:
+        self.assertEqual(
+            [('ham', 1000), ('spam', 420), ('vdgsa_backend', 50)],
+            list(totals_by_package(parse_import_times(REPORT)).items()))
+
+    def test_startup_skips_deferred_imports(self) -> None:
+        profile = measure_startup()
+        self.assertGreater(profile['wall_time_s'], 0)
+        imported = {module['module'] for module in profile['modules']}
+        self.assertIn('vdgsa_backend.urls', imported)
+        # These are imported the first time a view needs them.
+        for deferred in ['stripe', 'bleach', 'pycountry']:
+            self.assertNotIn(deferred, imported)
+
+    def test_profile_imports_command(self) -> None:
+        out = StringIO()
+        call_command('profile_imports', '--top', '3', '--packages', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(5, len(lines))
+        self.assertIn('startup took', lines[-1])
@@ -0,0 +1,37 @@
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.slow_queries import clear_slow_queries, recent_slow_queries
+
+
+@override_settings(QUERY_BUDGET_ENABLED=True, QUERY_BUDGET_HEADERS=True)
+class InstrumentationMiddlewareTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = User.objects.create_user('secretary@wee.com')
+        self.user.user_permissions.add(Permission.objects.get(codename='membership_secretary'))
+        self.client.force_login(self.user)
+        clear_slow_queries()
+        self.addCleanup(clear_slow_queries)
+
+    def test_queries_wrapped_once(self) -> None:
+        execute_wrapper = BaseDatabaseWrapper.execute_wrapper
+        with mock.patch.object(
+            BaseDatabaseWrapper, 'execute_wrapper', autospec=True, side_effect=execute_wrapper
+        ) as wrapper_mock:
+            response = self.client.get(reverse('membership-secretary'))
+        self.assertEqual(200, response.status_code)
+        wrapped = [call.args[0].alias for call in wrapper_mock.call_args_list]
+        self.assertIn('default', wrapped)
+        self.assertEqual(sorted(set(wrapped)), sorted(wrapped))
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_one_recording_for_everything(self) -> None:
+        with self.assertLogs('vdgsa_backend.slow_queries'):
+            response = self.client.get(reverse('membership-secretary'))
+        self.assertEqual(int(response['X-Query-Count']), len(recent_slow_queries()))
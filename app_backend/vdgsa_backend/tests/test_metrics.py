@@ -0,0 +1,131 @@
+import json
+from unittest import mock
+
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.emails.views import ExpiringEmails
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.membership_secretary = User.objects.create_user('secretary@wee.com')
+        self.membership_secretary.user_permissions.add(
+            Permission.objects.get(codename='membership_secretary'))
+        self.client.force_login(self.membership_secretary)
+
+    def test_request_metrics(self) -> None:
+        labels = {'view': 'membership-secretary', 'method': 'GET'}
+        num_requests = _sample('vdgsa_request_duration_seconds_count', **labels)
+        num_ok = _sample('vdgsa_responses_total', status='200', **labels)
+        num_queries = _sample('vdgsa_request_db_queries_sum', view='membership-secretary')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('membership-secretary'))
+
+        self.assertEqual(
+            num_requests + 1, _sample('vdgsa_request_duration_seconds_count', **labels))
+        self.assertEqual(num_ok + 1, _sample('vdgsa_responses_total', status='200', **labels))
+        self.assertEqual(
+            num_queries + len(queries),
+            _sample('vdgsa_request_db_queries_sum', view='membership-secretary'))
+
+    def test_streaming_response_recorded_when_finished(self) -> None:
+        self.membership_secretary.user_permissions.add(
+            Permission.objects.get(codename='rental_viewer'))
+        labels = {'view': 'inventory-export', 'method': 'GET'}
+        num_requests = _sample('vdgsa_request_duration_seconds_count', **labels)
+
+        response = self.client.get(reverse('inventory-export', args=['viol']))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(num_requests, _sample('vdgsa_request_duration_seconds_count', **labels))
+        b''.join(response.streaming_content)
+        self.assertEqual(
+            num_requests + 1, _sample('vdgsa_request_duration_seconds_count', **labels))
+
+    def test_unresolved_requests_share_a_label(self) -> None:
+        labels = {'view': '<unresolved>', 'method': 'GET', 'status': '404'}
+        num_not_found = _sample('vdgsa_responses_total', **labels)
+        self.client.get('/no/such/page/')
+        self.client.get('/no/such/page/either/')
+        self.assertEqual(num_not_found + 2, _sample('vdgsa_responses_total', **labels))
+
+    def test_metrics_view(self) -> None:
+        self.client.get(reverse('membership-secretary'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(200, response.status_code)
+        self.assertIn('text/plain', response['Content-Type'])
+        self.assertContains(
+            response,
+            'vdgsa_request_duration_seconds_count{method="GET",view="membership-secretary"}')
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8'])
+    def test_metrics_view_allowed_network(self) -> None:
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.1.2.3')
+        self.assertEqual(200, response.status_code)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.0/8'])
+    def test_metrics_view_not_allowed(self) -> None:
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(404, response.status_code)
+
+    @override_settings(METRICS_TOKEN='spam', METRICS_ALLOWED_IPS=['10.0.0.0/8'])
+    def test_metrics_view_token(self) -> None:
+        # With a token, requests from the proxy's address need it too.
+        response = self.client.get(reverse('metrics'), REMOTE_ADDR='10.1.2.3')
+        self.assertEqual(404, response.status_code)
+        response = self.client.get(
+            reverse('metrics'), REMOTE_ADDR='10.1.2.3', HTTP_AUTHORIZATION='Bearer eggs')
+        self.assertEqual(404, response.status_code)
+
+        response = self.client.get(reverse('metrics'), HTTP_AUTHORIZATION='Bearer spam')
+        self.assertEqual(200, response.status_code)
+
+    def test_membership_email_job_metrics(self) -> None:
+        num_runs = _sample('vdgsa_membership_email_job_runs_total', outcome='success')
+        ExpiringEmails().runJob()
+        self.assertEqual(
+            num_runs + 1, _sample('vdgsa_membership_email_job_runs_total', outcome='success'))
+        self.assertGreater(
+            _sample('vdgsa_membership_email_job_last_success_timestamp_seconds'), 0)
+
+    def test_membership_email_job_failure_metrics(self) -> None:
+        num_failures = _sample('vdgsa_membership_email_job_runs_total', outcome='failure')
+        with mock.patch.object(
+                ExpiringEmails, 'list_expiring_members', side_effect=RuntimeError('oops')):
+            with self.assertRaises(RuntimeError):
+                ExpiringEmails().runJob()
+        self.assertEqual(
+            num_failures + 1,
+            _sample('vdgsa_membership_email_job_runs_total', outcome='failure'))
+
+    def test_stripe_webhook_metrics(self) -> None:
+        ignored = {
+            'webhook': 'officer_email', 'event_type': 'invoice.paid', 'outcome': 'ignored'}
+        invalid = {'webhook': 'membership', 'event_type': '', 'outcome': 'invalid'}
+        num_ignored = _sample('vdgsa_stripe_webhook_events_total', **ignored)
+        num_invalid = _sample('vdgsa_stripe_webhook_events_total', **invalid)
+
+        response = self.client.post(
+            '/stripe_emails/send_officer_emails/',
+            json.dumps({'id': 'evt_1', 'object': 'event', 'type': 'invoice.paid'}),
+            content_type='application/json')
+        self.assertEqual(200, response.status_code)
+        response = self.client.post(
+            '/accounts/stripe_webhook/', 'not json', content_type='application/json')
+        self.assertEqual(400, response.status_code)
+
+        self.assertEqual(
+            num_ignored + 1, _sample('vdgsa_stripe_webhook_events_total', **ignored))
+        self.assertEqual(
+            num_invalid + 1, _sample('vdgsa_stripe_webhook_events_total', **invalid))
@@ -0,0 +1,160 @@
+import datetime
+import json
+import pstats
+import shutil
+import tempfile
+import time
+
+from django.contrib.auth.models import Permission
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.profiling import (
+    PROFILE_COOKIE, StackSampler, list_profiles, profile_dir, prune_profiles
+)
+
+
+class ProfilingTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user('staff@wee.com', is_staff=True)
+        self.user = User.objects.create_user('user@wee.com')
+
+    def test_query_param_profiles_request(self) -> None:
+        self.client.force_login(self.staff)
+        response = self.client.get(self._account_url(), {'_profile': '1'})
+        self.assertEqual(200, response.status_code)
+
+        [profile] = list_profiles()
+        self.assertEqual('user-account', profile['view'])
+        self.assertEqual('GET', profile['method'])
+        self.assertEqual(f'/accounts/{self.staff.pk}/?_profile=1', profile['path'])
+        self.assertEqual('staff@wee.com', profile['user'])
+        self.assertEqual(200, profile['status_code'])
+
+        stats = pstats.Stats(str(profile_dir() / f'{profile["name"]}.prof'))
+        self.assertTrue(stats.stats)  # type: ignore
+        self.assertTrue((profile_dir() / f'{profile["name"]}.collapsed').exists())
+
+    def test_cookie_profiles_request(self) -> None:
+        self.client.force_login(self.staff)
+        response = self.client.post(reverse('profile-cookie'), {'enable': '1'})
+        self.assertRedirects(response, reverse('profiles'), fetch_redirect_response=False)
+        self.assertIn(PROFILE_COOKIE, self.client.cookies)
+
+        self.client.get(self._account_url())
+        self.assertEqual(1, len(list_profiles()))
+
+        # The request that turns profiling off is still profiled.
+        self.client.post(reverse('profile-cookie'))
+        self.assertEqual('', self.client.cookies[PROFILE_COOKIE].value)
+        self.client.get(self._account_url())
+        self.assertEqual(2, len(list_profiles()))
+
+    def test_streaming_response_profiled(self) -> None:
+        self.staff.user_permissions.add(Permission.objects.get(codename='rental_viewer'))
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            reverse('inventory-export', args=['viol']), {'_profile': '1'})
+        self.assertEqual([], list_profiles())
+        b''.join(response.streaming_content)  # type: ignore
+        [profile] = list_profiles()
+        self.assertEqual('inventory-export', profile['view'])
+
+    def test_non_staff_not_profiled(self) -> None:
+        self.client.force_login(self.user)
+        response = self.client.get(self._account_url(), {'_profile': '1'})
+        self.assertEqual(200, response.status_code)
+        self.assertEqual([], list_profiles())
+
+    def test_not_profiled_without_switch(self) -> None:
+        self.client.force_login(self.staff)
+        self.client.get(self._account_url())
+        self.assertEqual([], list_profiles())
+
+    @override_settings(PROFILE_MAX_COUNT=2, PROFILE_MAX_AGE_DAYS=14)
+    def test_prune_profiles(self) -> None:
+        profile_dir().mkdir(parents=True)
+        now = datetime.datetime.now(datetime.timezone.utc)
+        names = [
+            f'{now - datetime.timedelta(days=15):%Y%m%d-%H%M%S}-old-00000000',
+            f'{now - datetime.timedelta(days=3):%Y%m%d-%H%M%S}-older-00000001',
+            f'{now - datetime.timedelta(days=2):%Y%m%d-%H%M%S}-newer-00000002',
+            f'{now - datetime.timedelta(days=1):%Y%m%d-%H%M%S}-newest-00000003',
+        ]
+        for name in names:
+            for suffix in ['.prof', '.collapsed', '.json']:
+                (profile_dir() / (name + suffix)).write_text(json.dumps({'name': name}))
+
+        prune_profiles()
+        self.assertEqual(
+            sorted(
+                name + suffix
+                for name in names[2:] for suffix in ['.prof', '.collapsed', '.json']),
+            sorted(path.name for path in profile_dir().iterdir()))
+
+    def test_stack_sampler(self) -> None:
+        def inner() -> None:
+            end = time.perf_counter() + 0.1
+            while time.perf_counter() < end:
+                pass
+
+        def outer() -> None:
+            inner()
+
+        sampler = StackSampler()
+        with sampler.sample():
+            outer()
+        sampler.stop()
+
+        lines = sampler.collapsed_stacks()
+        self.assertTrue(lines)
+        stack, count = lines[0].rsplit(' ', 1)
+        self.assertTrue(
+            stack.endswith(
+                ';outer (test_profiling.py:{});inner (test_profiling.py:{})'.format(
+                    outer.__code__.co_firstlineno, inner.__code__.co_firstlineno)),
+            stack)
+        self.assertGreater(int(count), 0)
+
+    def test_profile_list_and_download(self) -> None:
+        self.client.force_login(self.staff)
+        self.client.get(self._account_url(), {'_profile': '1'})
+        [profile] = list_profiles()
+
+        response = self.client.get(reverse('profiles'))
+        self.assertContains(response, profile['name'] + '.prof')
+        self.assertContains(response, profile['name'] + '.collapsed')
+
+        response = self.client.get(
+            reverse('profile-download', kwargs={'filename': profile['name'] + '.collapsed'}))
+        self.assertEqual(200, response.status_code)
+        self.assertEqual(
+            f'attachment; filename="{profile["name"]}.collapsed"',
+            response['Content-Disposition'])
+
+        response = self.client.get(
+            reverse('profile-download', kwargs={'filename': '..secret.prof'}))
+        self.assertEqual(404, response.status_code)
+        response = self.client.get(
+            reverse('profile-download', kwargs={'filename': profile['name'] + '.txt'}))
+        self.assertEqual(404, response.status_code)
+
+    def test_profile_pages_staff_only(self) -> None:
+        self.client.force_login(self.user)
+        self.assertEqual(403, self.client.get(reverse('profiles')).status_code)
+        self.assertEqual(
+            403,
+            self.client.get(
+                reverse('profile-download', kwargs={'filename': 'spam.prof'})).status_code)
+        self.assertEqual(403, self.client.post(reverse('profile-cookie')).status_code)
+
+    def _account_url(self) -> str:
+        return reverse('user-account', kwargs={'pk': self.client.session['_auth_user_id']})
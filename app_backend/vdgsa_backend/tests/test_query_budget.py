@@ -0,0 +1,63 @@
+from django.contrib.auth.models import Permission
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.query_budget import query_shape
+
+
+@override_settings(
+    QUERY_BUDGET_ENABLED=True,
+    QUERY_BUDGET_HEADERS=True,
+    QUERY_BUDGET_SLOW_REQUEST_MS=60_000,
+    QUERY_BUDGET_MAX_QUERIES=1000,
+)
+class QueryBudgetTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.membership_secretary = User.objects.create_user('secretary@wee.com')
+        self.membership_secretary.user_permissions.add(
+            Permission.objects.get(codename='membership_secretary'))
+        for i in range(5):
+            User.objects.create_user(f'user{i}@wee.com')
+        self.client.force_login(self.membership_secretary)
+
+    def test_headers(self) -> None:
+        with self.assertNumQueries(6):
+            response = self.client.get(reverse('membership-secretary') + '?all_users=true')
+        self.assertEqual('6', response['X-Query-Count'])
+        self.assertGreater(float(response['X-Query-Time-Ms']), 0)
+
+    @override_settings(QUERY_BUDGET_HEADERS=False)
+    def test_no_headers(self) -> None:
+        response = self.client.get(reverse('membership-secretary'))
+        self.assertNotIn('X-Query-Count', response)
+
+    @override_settings(QUERY_BUDGET_MAX_QUERIES=3)
+    def test_too_many_queries_logged(self) -> None:
+        with self.assertLogs('vdgsa_backend.query_budget', 'WARNING') as logs:
+            self.client.get(reverse('membership-secretary'))
+        self.assertEqual(1, len(logs.output))
+        self.assertIn('GET /accounts/directory/', logs.output[0])
+        self.assertIn('6 queries', logs.output[0])
+
+    def test_fast_request_not_logged(self) -> None:
+        with self.assertNoLogs('vdgsa_backend.query_budget'):
+            self.client.get(reverse('membership-secretary'))
+
+    @override_settings(QUERY_BUDGET_ENABLED=False)
+    def test_disabled(self) -> None:
+        response = self.client.get(reverse('membership-secretary'))
+        self.assertEqual(200, response.status_code)
+        self.assertNotIn('X-Query-Count', response)
+
+
+class QueryShapeTestCase(TestCase):
+    def test_query_shape(self) -> None:
+        self.assertEqual(
+            'SELECT ... FROM "accounts_user" WHERE "id" IN (?, ...) AND "name" = ? LIMIT ?',
+            query_shape(
+                'SELECT "id", "name"\nFROM "accounts_user" '
+                'WHERE "id" IN (%s, %s, %s) AND "name" = \'it\'\'s\' LIMIT 21'
+            )
+        )
@@ -0,0 +1,142 @@
+import json
+import logging
+import os
+import tempfile
+import time
+
+from django.contrib.auth.models import Permission
+from django.test import TestCase
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.request_logging import (
+    JsonFormatter, QueueingFileHandler, RequestContextFilter, _request_context
+)
+
+
+class AccessLogTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.user = User.objects.create_user('user@wee.com')
+        self.client.force_login(self.user)
+
+    def test_access_log(self) -> None:
+        url = reverse('user-account', kwargs={'pk': self.user.pk})
+        with self.assertLogs('vdgsa_backend.access') as logs:
+            response = self.client.get(url, {'q': 'secret'})
+
+        [record] = logs.records
+        self.assertEqual(f'GET {url} 200 {record.duration_ms:.1f}ms',  # type: ignore
+                         record.getMessage())
+        self.assertEqual(response['X-Request-ID'], record.request_id)  # type: ignore
+        self.assertEqual(32, len(record.request_id))  # type: ignore
+        self.assertEqual(self.user.pk, record.user_id)  # type: ignore
+        self.assertEqual('user-account', record.view)  # type: ignore
+        self.assertEqual('GET', record.method)  # type: ignore
+        self.assertEqual(url, record.path)  # type: ignore
+        self.assertEqual(200, record.status)  # type: ignore
+        self.assertGreater(record.duration_ms, 0)  # type: ignore
+
+    def test_request_id_from_header(self) -> None:
+        with self.assertLogs('vdgsa_backend.access') as logs:
+            response = self.client.get(
+                reverse('current-user-account'), HTTP_X_REQUEST_ID='abc-123')
+        self.assertEqual('abc-123', response['X-Request-ID'])
+        self.assertEqual('abc-123', logs.records[0].request_id)  # type: ignore
+
+        with self.assertLogs('vdgsa_backend.access') as logs:
+            response = self.client.get(
+                reverse('current-user-account'), HTTP_X_REQUEST_ID='bad id\n')
+        self.assertNotEqual('bad id\n', response['X-Request-ID'])
+        self.assertEqual(response['X-Request-ID'], logs.records[0].request_id)  # type: ignore
+
+    def test_streaming_response_logged_when_finished(self) -> None:
+        self.user.user_permissions.add(Permission.objects.get(codename='rental_viewer'))
+
+        with self.assertLogs('vdgsa_backend.access') as logs:
+            response = self.client.get(reverse('inventory-export', args=['viol']))
+            logging.getLogger('vdgsa_backend.access').info('marker')
+            b''.join(response.streaming_content)  # type: ignore
+
+        self.assertEqual('marker', logs.records[0].getMessage())
+        self.assertEqual('inventory-export', logs.records[1].view)  # type: ignore
+
+
+class LoggingPipelineTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        self.filename = os.path.join(self.tempdir.name, 'test.log')
+
+        self.handler = QueueingFileHandler(self.filename)
+        self.handler.addFilter(RequestContextFilter())
+        self.addCleanup(self.handler.stop)
+        self.logger = logging.getLogger('vdgsa_backend.tests.request_logging')
+        self.logger.addHandler(self.handler)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        self.addCleanup(self.logger.removeHandler, self.handler)
+
+    def _read_lines(self, filename: str) -> list[dict]:  # type: ignore
+        with open(filename) as f:
+            return [json.loads(line) for line in f]
+
+    def test_writes_json_lines(self) -> None:
+        request = self.client.get(reverse('login')).wsgi_request
+        request.request_id = 'req-1'  # type: ignore
+        with _request_context(request):
+            self.logger.info('hello %s', 'world', extra={'duration_ms': 12.5})
+        try:
+            raise ValueError('oops')
+        except ValueError:
+            self.logger.exception('failed')
+        self.handler.stop()
+
+        hello, failed = self._read_lines(self.filename)
+        self.assertEqual('hello world', hello['message'])
+        self.assertEqual('INFO', hello['level'])
+        self.assertEqual('vdgsa_backend.tests.request_logging', hello['logger'])
+        self.assertEqual('req-1', hello['request_id'])
+        self.assertIsNone(hello['user_id'])
+        self.assertEqual('login', hello['view'])
+        self.assertEqual(12.5, hello['duration_ms'])
+        self.assertIn('time', hello)
+
+        self.assertEqual('failed', failed['message'])
+        self.assertIn('ValueError: oops', failed['exc_info'])
+        self.assertNotIn('request_id', failed)
+
+    def test_request_from_record(self) -> None:
+        request = self.client.get(reverse('login')).wsgi_request
+        request.request_id = 'req-2'  # type: ignore
+        self.logger.warning('Not Found', extra={'request': request})
+        self.handler.stop()
+
+        [entry] = self._read_lines(self.filename)
+        self.assertEqual('req-2', entry['request_id'])
+
+    def test_reopens_after_rotation(self) -> None:
+        self.logger.info('before')
+        # Wait for the listener thread to write it.
+        deadline = time.monotonic() + 5
+        while not (os.path.exists(self.filename) and os.path.getsize(self.filename)):
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.01)
+
+        # What logrotate does.
+        os.rename(self.filename, self.filename + '.1')
+        self.logger.info('after')
+        self.handler.stop()
+
+        [before] = self._read_lines(self.filename + '.1')
+        self.assertEqual('before', before['message'])
+        [after] = self._read_lines(self.filename)
+        self.assertEqual('after', after['message'])
+
+    def test_json_formatter_non_json_extra(self) -> None:
+        record = logging.LogRecord('spam', logging.WARNING, __file__, 1, 'msg', None, None)
+        record.thing = object()
+        entry = json.loads(JsonFormatter().format(record))
+        self.assertEqual('msg', entry['message'])
+        self.assertTrue(entry['thing'].startswith('<object object'))
@@ -0,0 +1,99 @@
+import datetime
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from vdgsa_backend.accounts.models import User
+from vdgsa_backend.slow_queries import (
+    capture_slow_queries, clear_slow_queries, recent_slow_queries, redact_params,
+    summarize_by_call_site
+)
+
+
+@override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+class SlowQueryTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.staff = User.objects.create_user('staff@wee.com', is_staff=True)
+        self.user = User.objects.create_user('user@wee.com')
+        clear_slow_queries()
+
+    def tearDown(self) -> None:
+        clear_slow_queries()
+        super().tearDown()
+
+    def test_capture_call_site_and_redacted_params(self) -> None:
+        with self.assertLogs('vdgsa_backend.slow_queries') as logs:
+            with capture_slow_queries():
+                User.objects.filter(username='user@wee.com', pk__gt=0).first()
+
+        [slow_query] = recent_slow_queries()
+        self.assertIn('"username"', slow_query['sql'])
+        self.assertEqual('[0, <str>]', slow_query['params'])
+        self.assertRegex(
+            slow_query['call_site'],
+            r'^tests/test_slow_queries\.py:\d+ in '
+            r'test_capture_call_site_and_redacted_params$')
+        self.assertEqual('', slow_query['view'])
+
+        [message] = logs.output
+        self.assertIn(slow_query['call_site'], message)
+        self.assertNotIn('user@wee.com', message)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=60 * 1000)
+    def test_fast_queries_not_captured(self) -> None:
+        with capture_slow_queries():
+            User.objects.count()
+        self.assertEqual([], recent_slow_queries())
+
+    def test_middleware_records_view_name(self) -> None:
+        self.client.force_login(self.user)
+        with self.assertLogs('vdgsa_backend.slow_queries'):
+            self.client.get(reverse('current-user-account'))
+
+        slow_queries = recent_slow_queries()
+        self.assertIn('current-user-account', {slow_query['view'] for slow_query in slow_queries})
+        for slow_query in slow_queries:
+            self.assertNotIn('@wee.com', slow_query['params'])
+
+    def test_redact_params(self) -> None:
+        self.assertEqual('', redact_params(None))
+        self.assertEqual(
+            '[1, 2.5, True, None, <str>, <date>]',
+            redact_params([1, 2.5, True, None, 'secret', datetime.date(2020, 1, 1)]))
+        self.assertEqual("{'id': 3, 'email': <str>}", redact_params({'id': 3, 'email': 'a@b.c'}))
+        self.assertEqual('<2 rows>', redact_params([['a'], ['b']], many=True))
+
+    def test_summarize_by_call_site(self) -> None:
+        now = datetime.datetime.now()
+        summaries = summarize_by_call_site([
+            {'sql': 'fast', 'params': '', 'duration_ms': 300, 'call_site': 'a.py:1 in f',
+             'view': 'spam', 'recorded_at': now},
+            {'sql': 'slow', 'params': '', 'duration_ms': 400, 'call_site': 'a.py:1 in f',
+             'view': 'egg', 'recorded_at': now},
+            {'sql': 'other', 'params': '', 'duration_ms': 500, 'call_site': 'b.py:2 in g',
+             'view': 'spam', 'recorded_at': now},
+        ])
+        self.assertEqual(['a.py:1 in f', 'b.py:2 in g'], [s['call_site'] for s in summaries])
+        self.assertEqual(2, summaries[0]['count'])
+        self.assertEqual(700, summaries[0]['total_ms'])
+        self.assertEqual(400, summaries[0]['max_ms'])
+        self.assertEqual('slow', summaries[0]['slowest_sql'])
+        self.assertEqual(['spam', 'egg'], summaries[0]['views'])
+
+    def test_slow_query_view(self) -> None:
+        with self.assertLogs('vdgsa_backend.slow_queries'):
+            with capture_slow_queries():
+                User.objects.count()
+
+        self.client.force_login(self.staff)
+        with self.assertLogs('vdgsa_backend.slow_queries'):
+            response = self.client.get(reverse('slow-queries'))
+        self.assertEqual(200, response.status_code)
+        self.assertContains(response, 'tests/test_slow_queries.py:')
+
+    def test_slow_query_view_staff_only(self) -> None:
+        self.client.force_login(self.user)
+        with self.assertLogs('vdgsa_backend.slow_queries'):
+            response = self.client.get(reverse('slow-queries'))
+        self.assertEqual(403, response.status_code)
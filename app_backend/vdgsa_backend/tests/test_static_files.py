@@ -0,0 +1,131 @@
+import gzip
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import time
+import unittest
+from http.client import HTTPConnection, HTTPResponse
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase, TestCase
+
+from vdgsa_backend.static_files import CompressedManifestStaticFilesStorage
+
+CSS = b'body { background: url("logo.png"); }\n' + b'.spam { color: red; }\n' * 100
+
+
+class CompressedManifestStaticFilesStorageTestCase(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.source_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.source_dir)
+        self.static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.static_root)
+
+        source = FileSystemStorage(location=self.source_dir)
+        with open(os.path.join(self.source_dir, 'base.css'), 'wb') as f:
+            f.write(CSS)
+        with open(os.path.join(self.source_dir, 'logo.png'), 'wb') as f:
+            f.write(b'\x89PNG' + bytes(range(256)))
+
+        self.storage = CompressedManifestStaticFilesStorage(
+            location=self.static_root, base_url='/static/')
+        # What collectstatic does.
+        paths = {}
+        for name in ['base.css', 'logo.png']:
+            with source.open(name) as f:
+                self.storage.save(name, f)
+            paths[name] = (source, name)
+        self.processed = list(self.storage.post_process(paths, dry_run=False))
+
+    def test_hashed_and_compressed(self) -> None:
+        css_name = self.storage.stored_name('base.css')
+        png_name = self.storage.stored_name('logo.png')
+        self.assertRegex(css_name, r'^base\.[0-9a-f]{12}\.css$')
+        self.assertIn((css_name, css_name + '.gz', True), self.processed)
+
+        with open(self.storage.path(css_name), 'rb') as f:
+            css = f.read()
+        self.assertIn(png_name.encode(), css)
+        with gzip.open(self.storage.path(css_name + '.gz')) as f:
+            self.assertEqual(css, f.read())
+
+        # Not worth compressing.
+        self.assertFalse(self.storage.exists(png_name + '.gz'))
+
+
+# See the [static] section of uwsgi.ini.
+UWSGI_INI = settings.BASE_DIR.parent / 'deployment' / 'prod' / 'uwsgi.ini'
+
+
+@unittest.skipUnless(
+    shutil.which('uwsgi') and UWSGI_INI.exists(), 'uwsgi and deployment/prod are needed')
+class UwsgiStaticTestCase(SimpleTestCase):
+    """
+    Runs uwsgi with our static file settings to check the headers it
+    sends.
+    """
+
+    def setUp(self) -> None:
+        super().setUp()
+        static_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, static_root)
+        self.hashed_name = 'base.0123456789ab.css'
+        for name, content in [
+            (self.hashed_name, CSS),
+            (self.hashed_name + '.gz', gzip.compress(CSS)),
+            ('favicon.ico', b'icon'),
+        ]:
+            with open(os.path.join(static_root, name), 'wb') as f:
+                f.write(content)
+
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            self.port = sock.getsockname()[1]
+        process = subprocess.Popen(
+            ['uwsgi', '--ini', f'{UWSGI_INI}:static', '--http', f'127.0.0.1:{self.port}',
+             '--static-map', f'/static={static_root}', '--offload-threads', '1', '--die-on-term'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.addCleanup(process.wait)
+        self.addCleanup(process.terminate)
+
+        deadline = time.monotonic() + 10
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', self.port)).close()
+                break
+            except ConnectionRefusedError:
+                self.assertLess(time.monotonic(), deadline, 'uwsgi did not start')
+                time.sleep(0.05)
+
+    def _get(self, name: str, accept_encoding: str = '') -> tuple[HTTPResponse, bytes]:
+        connection = HTTPConnection('127.0.0.1', self.port, timeout=10)
+        self.addCleanup(connection.close)
+        headers = {'Accept-Encoding': accept_encoding} if accept_encoding else {}
+        connection.request('GET', f'/static/{name}', headers=headers)
+        response = connection.getresponse()
+        return response, response.read()
+
+    def test_gzip(self) -> None:
+        response, body = self._get(self.hashed_name, 'gzip, deflate')
+        self.assertEqual(200, response.status)
+        self.assertEqual('gzip', response.headers['Content-Encoding'])
+        self.assertEqual('text/css', response.headers['Content-Type'])
+        self.assertEqual('Accept-Encoding', response.headers['Vary'])
+        self.assertEqual(CSS, gzip.decompress(body))
+
+        response, body = self._get(self.hashed_name)
+        self.assertIsNone(response.headers['Content-Encoding'])
+        self.assertEqual(CSS, body)
+
+    def test_cache_control(self) -> None:
+        response, _ = self._get(self.hashed_name, 'gzip')
+        self.assertEqual(
+            'public, max-age=31536000, immutable', response.headers['Cache-Control'])
+
+        response, _ = self._get('favicon.ico')
+        self.assertEqual(200, response.status)
+        self.assertIsNone(response.headers['Cache-Control'])
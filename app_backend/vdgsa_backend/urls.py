@@ -25,6 +25,10 @@ from django.urls import include, path
 from django.urls.base import reverse
 from django.urls.conf import re_path
 
+from vdgsa_backend.metrics import metrics_view
+from vdgsa_backend.profiling import ProfileCookieView, ProfileDownloadView, ProfileListView
+from vdgsa_backend.slow_queries import SlowQueryView
+
 
 class VdGSALoginView(LoginView):
     success_url_allowed_hosts = {
@@ -53,6 +57,11 @@ urlpatterns = [
 
     path('login/', VdGSALoginView.as_view(), name='login'),
     path('logout/', logout_view, name='logout'),
+    path('metrics', metrics_view, name='metrics'),
+    path('slow_queries/', SlowQueryView.as_view(), name='slow-queries'),
+    path('profiles/', ProfileListView.as_view(), name='profiles'),
+    path('profiles/cookie/', ProfileCookieView.as_view(), name='profile-cookie'),
+    path('profiles/<str:filename>', ProfileDownloadView.as_view(), name='profile-download'),
     path('', include('django.contrib.auth.urls')),
 
     re_path('^$', lambda request: redirect(reverse('current-user-account'))),